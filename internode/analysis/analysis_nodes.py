@@ -3,8 +3,17 @@
 
 import torch
 import numpy as np
-import torchaudio
 from PIL import Image, ImageDraw
+from .spectral_cache import stft, reduce_stft, num_frames
+from .spectral_inverse import fast_griffin_lim, inverse_stft, match_frames, plan_tiles, split_tiles, stitch_tiles, DEFAULT_MOMENTUM
+from .beat_tracking import detect_beats, trigger_curve
+from .filterbank import filterbank, band_energies, SCALES
+from .analysis_utils import (
+    ema, local_peaks, format_schedule, mono_batch, unbatch, resample_curves, normalize_rows,
+    decimate, scaled_fft_size, ANALYSIS_RATES
+)
+
+ANALYSIS_RATE_INPUT = (ANALYSIS_RATES, {"default": "Full", "tooltip": "Downsample the mono mix before the FFT. Control curves need far less than 48kHz; lower rates are several times faster. Bands above half this rate are cut off."})
 
 class InternodeAudioAnalyzer:
     """
@@ -18,7 +27,8 @@ class InternodeAudioAnalyzer:
                 "audio": ("AUDIO",),
                 "frame_rate": ("INT", {"default": 24, "min": 1, "max": 120}),
                 "smoothness": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 0.99, "step": 0.01}),
-            }
+            },
+            "optional": {"analysis_rate": ANALYSIS_RATE_INPUT},
         }
 
     RETURN_TYPES = ("FLOAT", "FLOAT", "FLOAT", "FLOAT") 
@@ -26,26 +36,28 @@ class InternodeAudioAnalyzer:
     FUNCTION = "analyze"
     CATEGORY = "Internode/Analysis"
 
-    def analyze(self, audio, frame_rate, smoothness):
+    def analyze(self, audio, frame_rate, smoothness, analysis_rate="Full"):
         waveform = audio["waveform"]
         sample_rate = audio["sample_rate"]
         
-        # Handle batch (take first) and stereo (mix to mono)
-        if waveform.dim() == 3: waveform = waveform[0]
-        # Mix to mono for analysis
-        y = waveform.mean(dim=0) # [samples] Tensor
+        # Mix every batch item to mono; all items are analyzed in one pass
+        y = mono_batch(waveform) # [batch, samples] Tensor
 
         # Calculate duration and target frames
-        duration = len(y) / sample_rate
+        duration = y.shape[-1] / sample_rate
         n_frames = int(duration * frame_rate)
         if n_frames < 1: n_frames = 1
         
+        # Optional decimation; the FFT below scales with it so band bins stay put in Hz
+        source_rate = sample_rate
+        y, sample_rate = decimate(y, sample_rate, analysis_rate)
+        
         # 1. Volume (RMS)
         # Use simple windowing
         hop_length = int(sample_rate / frame_rate)
         # Unfold creates sliding windows: [n_windows, window_size]
         # We handle padding to match size
-        pad = hop_length - (len(y) % hop_length)
+        pad = hop_length - (y.shape[-1] % hop_length)
         if pad < hop_length:
             y_pad = torch.nn.functional.pad(y, (0, pad))
         else:
@@ -54,15 +66,8 @@ class InternodeAudioAnalyzer:
         # Reshape roughly to frames (approximation)
         # For exact frame matching with spectrogram, we calculate hop
         
-        # 2. Spectrogram
-        n_fft = 2048
-        spec_transform = torchaudio.transforms.Spectrogram(
-            n_fft=n_fft,
-            hop_length=hop_length,
-            power=2.0
-        ).to(y.device)
-        
-        spectrogram = spec_transform(y) # [freq_bins, time_frames]
+        # 2. Spectrogram (shared with other analysis nodes on the same audio)
+        n_fft = scaled_fft_size(2048, source_rate, sample_rate)
         
         # Spectrogram time frames might differ slightly from n_frames due to padding/centering
         # We will interpolate at the end.
@@ -78,36 +83,30 @@ class InternodeAudioAnalyzer:
         
         # Extract Bands energy (Sum over freq dim)
         # Handle index bounds
-        max_bin = spectrogram.shape[0]
+        max_bin = n_fft // 2 + 1
         
-        bass_energy = spectrogram[b_low:min(b_mid, max_bin), :].mean(dim=0)
-        mid_energy = spectrogram[b_mid:min(b_high, max_bin), :].mean(dim=0)
-        high_energy = spectrogram[b_high:, :].mean(dim=0)
+        def band_energies(spectrogram): # [batch, freq_bins, time_frames] -> [batch, 4, time_frames]
+            return torch.stack([
+                spectrogram[:, b_low:min(b_mid, max_bin), :].mean(dim=1),
+                spectrogram[:, b_mid:min(b_high, max_bin), :].mean(dim=1),
+                spectrogram[:, b_high:, :].mean(dim=1),
+                # RMS Energy from waveform (or spectrogram sum)
+                spectrogram.sum(dim=1),
+            ], dim=1)
         
-        # RMS Energy from waveform (or spectrogram sum)
-        vol_energy = spectrogram.sum(dim=0)
+        # Long files are reduced block by block instead of holding the full spectrogram
+        bass_energy, mid_energy, high_energy, vol_energy = reduce_stft(y, n_fft, hop_length, band_energies, power=2.0).unbind(1)
         
-        # Helper to process to list
+        # Helper to process to list (one curve per batch item)
         def process_curve(energy_tensor, target_len):
             arr = energy_tensor.cpu().numpy()
             # Resample to exact target frames (sync with video)
-            arr = np.interp(
-                np.linspace(0, len(arr), target_len),
-                np.arange(len(arr)),
-                arr
-            )
+            arr = resample_curves(arr, target_len)
             # Normalize
-            m = np.max(arr)
-            if m > 0: arr = arr / m
+            arr = normalize_rows(arr)
             
             # Smooth
-            out = np.zeros_like(arr)
-            curr = 0
-            for i in range(len(arr)):
-                curr = (smoothness * curr) + ((1 - smoothness) * arr[i])
-                out[i] = curr
-                
-            return out.tolist()
+            return unbatch(ema(arr, smoothness).tolist())
 
         bass = process_curve(bass_energy, n_frames)
         mid = process_curve(mid_energy, n_frames)
@@ -116,6 +115,62 @@ class InternodeAudioAnalyzer:
 
         return (bass, mid, high, vol)
 
+class InternodeMultiBandAnalyzer:
+    """
+    Any number of mel or log spaced band curves from one filterbank matmul
+    against the (shared) power spectrogram. 64 bands cost about as much as 3.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "audio": ("AUDIO",),
+                "frame_rate": ("INT", {"default": 24, "min": 1, "max": 120}),
+                "bands": ("INT", {"default": 16, "min": 1, "max": 256}),
+                "scale": (SCALES,),
+                "min_freq": ("FLOAT", {"default": 20.0, "min": 1.0, "max": 20000.0, "step": 1.0}),
+                "max_freq": ("FLOAT", {"default": 16000.0, "min": 10.0, "max": 48000.0, "step": 1.0, "tooltip": "Clamped to half the sample rate."}),
+                "smoothness": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 0.99, "step": 0.01}),
+                "normalize": (["Per Band", "Global"], {"tooltip": "Per Band: every band peaks at 1.0. Global: bands keep their relative loudness."}),
+            }
+        }
+
+    RETURN_TYPES = ("FLOAT", "IMAGE", "INT")
+    RETURN_NAMES = ("band_curves", "band_image", "frame_count")
+    FUNCTION = "analyze"
+    CATEGORY = "Internode/Analysis"
+
+    @classmethod
+    def VALIDATE_INPUTS(s, min_freq, max_freq, **kwargs):
+        if min_freq >= max_freq:
+            return f"min_freq ({min_freq}) must be lower than max_freq ({max_freq})."
+        return True
+
+    def analyze(self, audio, frame_rate, bands, scale, min_freq, max_freq, smoothness, normalize):
+        y = mono_batch(audio["waveform"]) # [batch, samples]
+        sample_rate = audio["sample_rate"]
+        n_frames = max(1, int(y.shape[-1] / sample_rate * frame_rate))
+
+        # Same FFT settings as the Audio Analyzer, so both read one cached spectrogram
+        n_fft = 2048
+        hop_length = int(sample_rate / frame_rate)
+        fb = filterbank(bands, n_fft, sample_rate, min_freq, max_freq, scale, y.device)
+        energy = reduce_stft(y, n_fft, hop_length, lambda s: band_energies(s, fb), power=2.0) # [batch, bands, frames]
+
+        arr = resample_curves(energy.cpu().numpy(), n_frames)
+        if normalize == "Per Band":
+            arr = normalize_rows(arr)
+        else:
+            arr = normalize_rows(arr.reshape(arr.shape[0], -1)).reshape(arr.shape)
+        arr = ema(arr, smoothness) # [batch, bands, frames]
+
+        # Heatmap: bands bottom (low) to top (high), time left to right
+        img = torch.from_numpy(arr[:, ::-1].copy()).float().unsqueeze(1)
+        img = torch.nn.functional.interpolate(img, size=(256, 1024), mode="nearest").squeeze(1)
+        img = img.clamp(0, 1).unsqueeze(-1).repeat(1, 1, 1, 3)
+
+        return (unbatch(arr.tolist()), img, n_frames)
+
 class InternodeAudioToKeyframes:
     """
     Converts audio analysis into control signals for video generation.
@@ -135,7 +190,8 @@ class InternodeAudioToKeyframes:
                 "amp_scale": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 10.0, "step": 0.1}),
                 "y_offset": ("FLOAT", {"default": 0.0, "min": -10.0, "max": 10.0, "step": 0.1}),
                 "beat_threshold": ("FLOAT", {"default": 0.4, "min": 0.01, "max": 1.0, "step": 0.01, "tooltip": "Only used in Beat mode. Threshold to trigger 1.0."}),
-            }
+            },
+            "optional": {"analysis_rate": ANALYSIS_RATE_INPUT},
         }
 
     RETURN_TYPES = ("FLOAT", "STRING", "IMAGE", "INT")
@@ -143,104 +199,89 @@ class InternodeAudioToKeyframes:
     FUNCTION = "generate_keyframes"
     CATEGORY = "Internode/Analysis"
 
-    def generate_keyframes(self, audio, fps, mode, smoothing, amp_scale, y_offset, beat_threshold):
+    def generate_keyframes(self, audio, fps, mode, smoothing, amp_scale, y_offset, beat_threshold, analysis_rate="Full"):
         waveform = audio["waveform"]
         sample_rate = audio["sample_rate"]
         
-        # 1. Preprocess: Mono mix
-        if waveform.dim() == 3: waveform = waveform[0]
-        y = waveform.mean(dim=0)
+        # 1. Preprocess: Mono mix of every batch item
+        y = mono_batch(waveform) # [batch, samples]
+        duration = y.shape[-1] / sample_rate
+        
+        # Optional decimation; the FFT scales with it so band bins stay put in Hz
+        source_rate = sample_rate
+        y, sample_rate = decimate(y, sample_rate, analysis_rate)
         
         # 2. Setup FFT
-        n_fft = 2048
+        n_fft = scaled_fft_size(2048, source_rate, sample_rate)
         hop_length = int(sample_rate / fps) # Align hops with frames
         
-        spec_transform = torchaudio.transforms.Spectrogram(
-            n_fft=n_fft, hop_length=hop_length, power=2.0
-        ).to(y.device)
-        
-        spectrogram = spec_transform(y) # [bins, frames]
-        
         # 3. Frequency Extraction
         def freq_to_bin(f): return int(f * n_fft / sample_rate)
-        max_bin = spectrogram.shape[0]
-        
-        raw_curve = None
+        max_bin = n_fft // 2 + 1
         
         if mode == "RMS (Volume)":
-            raw_curve = spectrogram.sum(dim=0)
+            b0, b1 = None, None
         elif mode == "Low (Bass/Kick)":
             b0 = freq_to_bin(20)
             b1 = freq_to_bin(250)
-            raw_curve = spectrogram[b0:min(b1, max_bin), :].mean(dim=0)
         elif mode == "Mid (Vocals)":
             b0 = freq_to_bin(250)
             b1 = freq_to_bin(4000)
-            raw_curve = spectrogram[b0:min(b1, max_bin), :].mean(dim=0)
         elif mode == "High (Hats)":
             b0 = freq_to_bin(4000)
-            raw_curve = spectrogram[b0:, :].mean(dim=0)
+            b1 = max_bin
         elif mode == "Beat (Trigger)":
             # For beat detection, we use Low band + transient detection
             b0 = freq_to_bin(20)
             b1 = freq_to_bin(200)
-            raw_curve = spectrogram[b0:min(b1, max_bin), :].mean(dim=0)
         
-        # 4. Processing to Numpy
+        def band_curve(spectrogram): # [batch, bins, frames] -> [batch, frames]
+            if b0 is None: return spectrogram.sum(dim=1)
+            return spectrogram[:, b0:min(b1, max_bin), :].mean(dim=1)
+        
+        # Cached per track; long files are reduced block by block
+        raw_curve = reduce_stft(y, n_fft, hop_length, band_curve, power=2.0)
+        
+        # 4. Processing to Numpy ([batch, frames])
         arr = raw_curve.cpu().numpy()
         
-        # Normalize (0.0 - 1.0)
-        mx = np.max(arr)
-        if mx > 1e-6:
-            arr = arr / mx
+        # Normalize (0.0 - 1.0), per batch item
+        arr = normalize_rows(arr, eps=1e-6)
         
         # 5. Beat Detection Logic (Binary Gate)
         if mode == "Beat (Trigger)":
-            # Simple thresholding
-            beat_curve = np.zeros_like(arr)
-            # Find local peaks above threshold
-            # Simple approach: if val > thresh and val > prev_val
-            for i in range(1, len(arr) - 1):
-                if arr[i] > beat_threshold and arr[i] > arr[i-1] and arr[i] > arr[i+1]:
-                    beat_curve[i] = 1.0 # Trigger
-                else:
-                    # Decay or Zero? Request says "1.0 otherwise 0.0"
-                    beat_curve[i] = 0.0
-            arr = beat_curve
+            # Local peaks above threshold trigger 1.0, everything else is 0.0
+            arr = local_peaks(arr, beat_threshold)
         else:
             # 6. Smoothing (EMA)
-            if smoothing > 0:
-                smoothed = np.zeros_like(arr)
-                curr = 0
-                for i in range(len(arr)):
-                    curr = (smoothing * curr) + ((1 - smoothing) * arr[i])
-                    smoothed[i] = curr
-                arr = smoothed
+            arr = ema(arr, smoothing)
         
         # 7. Scaling and Offset
         arr = (arr * amp_scale) + y_offset
         
-        # 8. Align Frame Count exactly to Duration * FPS
-        duration = len(y) / sample_rate
+        # 8. Align Frame Count exactly to Duration * FPS (of the source audio)
         target_frames = int(duration * fps)
         
         # Resample array to exact frame count
-        if len(arr) != target_frames:
-            arr = np.interp(
-                np.linspace(0, len(arr), target_frames),
-                np.arange(len(arr)),
-                arr
-            )
+        if arr.shape[-1] != target_frames:
+            arr = resample_curves(arr, target_frames)
             
-        # 9. Format Outputs
+        # 9. Format Outputs (one per batch item; a single item keeps the plain types)
         
         # A. Schedule String: "0:(0.5), 1:(0.6)..."
-        sched_items = []
-        for i, val in enumerate(arr):
-            sched_items.append(f"{i}:({val:.3f})")
-        sched_str = ",\n".join(sched_items)
+        sched_str = unbatch([format_schedule(row) for row in arr])
+        
+        # B. Curve Image (Visualization), [batch, H, W, 3]
+        vis_tensor = torch.cat([self.draw_curve(row) for row in arr], dim=0)
+        
+        # C. Float output (Batch)
+        # ComfyUI nodes expecting a batch of floats usually handle a list
+        float_out = unbatch(np.asarray(arr, dtype=np.float64).tolist())
         
-        # B. Curve Image (Visualization)
+        return (float_out, sched_str, vis_tensor, target_frames)
+
+    @staticmethod
+    def draw_curve(arr):
         img_w, img_h = 1024, 256
         vis_img = Image.new("RGB", (img_w, img_h), (20, 20, 20))
         draw = ImageDraw.Draw(vis_img)
@@ -252,28 +293,64 @@ class InternodeAudioToKeyframes:
         # We assume typical range 0-1, but scale/offset can shift it
         # Map Y: (val) -> pixels
         # Let's map visual range 0.0 at bottom, 1.0 at top, allowing overflow
-        def val_to_y(v):
-            norm = v # 0..1
-            y_px = img_h - (norm * img_h)
-            return np.clip(y_px, 0, img_h)
-            
-        points = []
-        for i in range(len(arr)):
-            x = (i / len(arr)) * img_w
-            y = val_to_y(arr[i])
-            points.append((x, y))
-            
-        if len(points) > 1:
+        xs = np.arange(len(arr)) / max(len(arr), 1) * img_w
+        ys = np.clip(img_h - (arr * img_h), 0, img_h)
+        # Flat [x0, y0, x1, y1, ...] list, which ImageDraw.line accepts
+        points = np.column_stack([xs, ys]).ravel().tolist()
+
+        if len(arr) > 1:
             draw.line(points, fill=(0, 255, 200), width=2)
             
         # To Tensor [1, H, W, 3]
-        vis_tensor = torch.from_numpy(np.array(vis_img).astype(np.float32) / 255.0).unsqueeze(0)
-        
-        # C. Float output (Batch)
-        # ComfyUI nodes expecting a batch of floats usually handle a list
-        float_out = [float(x) for x in arr]
-        
-        return (float_out, sched_str, vis_tensor, target_frames)
+        return torch.from_numpy(np.array(vis_img).astype(np.float32) / 255.0).unsqueeze(0)
+
+class InternodeBeatDetector:
+    """
+    Native onset / tempo / beat tracker (spectral flux + autocorrelation).
+    Outputs a per-frame trigger curve synced to the detected beats (or raw
+    onsets), the beat times in seconds and the estimated BPM.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "audio": ("AUDIO",),
+                "fps": ("INT", {"default": 24, "min": 1, "max": 120}),
+                "trigger_on": (["Beats", "Onsets"],),
+                "min_bpm": ("FLOAT", {"default": 60.0, "min": 30.0, "max": 300.0, "step": 1.0}),
+                "max_bpm": ("FLOAT", {"default": 200.0, "min": 30.0, "max": 300.0, "step": 1.0}),
+                "onset_threshold": ("FLOAT", {"default": 0.07, "min": 0.0, "max": 1.0, "step": 0.01, "tooltip": "How far a flux peak must rise above its neighbourhood to count as an onset. Lower = more onsets."}),
+                "decay": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 0.99, "step": 0.01, "tooltip": "0 = single-frame pulses. Higher values let each trigger fade out over the following frames."}),
+            }
+        }
+
+    RETURN_TYPES = ("FLOAT_LIST", "FLOAT_LIST", "FLOAT", "STRING", "INT")
+    RETURN_NAMES = ("trigger_curve", "beat_times", "bpm", "schedule_str", "frame_count")
+    FUNCTION = "detect"
+    CATEGORY = "Internode/Analysis"
+
+    @classmethod
+    def VALIDATE_INPUTS(s, min_bpm, max_bpm, **kwargs):
+        if min_bpm >= max_bpm:
+            return f"min_bpm ({min_bpm}) must be lower than max_bpm ({max_bpm})."
+        return True
+
+    def detect(self, audio, fps, trigger_on, min_bpm, max_bpm, onset_threshold, decay):
+        y = mono_batch(audio["waveform"]) # [batch, samples]
+        sample_rate = audio["sample_rate"]
+        target_frames = max(1, int(y.shape[-1] / sample_rate * fps))
+
+        curves, beats, bpms, scheds = [], [], [], []
+        for res in detect_beats(y, sample_rate, min_bpm, max_bpm, onset_threshold):
+            times = res["beat_times"] if trigger_on == "Beats" else res["onset_times"]
+            curve = trigger_curve(times, target_frames, fps, decay)
+            curves.append(curve.tolist())
+            beats.append(res["beat_times"].tolist())
+            bpms.append(round(res["bpm"], 2))
+            scheds.append(format_schedule(curve))
+            print(f"#### Internode: Beat Detector found {len(res['beat_times'])} beats at {res['bpm']:.1f} BPM, {len(res['onset_times'])} onsets.")
+
+        return (unbatch(curves), unbatch(beats), unbatch(bpms), unbatch(scheds), target_frames)
 
 class InternodeSpectrogram:
     """
@@ -286,47 +363,85 @@ class InternodeSpectrogram:
                 "audio": ("AUDIO",),
                 "n_fft": ("INT", {"default": 1024, "min": 64, "max": 4096}),
                 "hop_length": ("INT", {"default": 256, "min": 32, "max": 2048}),
+            },
+            "optional": {
+                "tile_width": ("INT", {"default": 0, "min": 0, "max": 8192, "tooltip": "Split long spectrograms into a batch of tiles this many frames wide (0 = one image per audio item). Spectrogram to Audio stitches them back with tile_info."}),
+                "tile_overlap": ("INT", {"default": 32, "min": 0, "max": 4096, "tooltip": "Frames shared by neighbouring tiles; they are crossfaded on reconstruction."}),
+                "keep_phase": ("BOOLEAN", {"default": False, "tooltip": "Also output spectral_phase for an exact inverse. Holds a float32 phase array as large as one image channel, so leave it off for long audio you won't invert."}),
             }
         }
-    RETURN_TYPES = ("IMAGE",)
+    RETURN_TYPES = ("IMAGE", "SPECTRAL_PHASE", "SPECTRAL_TILES")
+    RETURN_NAMES = ("image", "spectral_phase", "tile_info")
     FUNCTION = "to_spectrogram"
     CATEGORY = "Internode/Spectral"
 
-    def to_spectrogram(self, audio, n_fft, hop_length):
-        waveform = audio["waveform"]
-        if waveform.dim() == 3: waveform = waveform[0] # Take batch 0
-        waveform = waveform.mean(dim=0) # Mono
+    @classmethod
+    def VALIDATE_INPUTS(s, tile_width=0, tile_overlap=32):
+        if tile_width > 0 and (tile_width < 2 or tile_overlap >= tile_width):
+            return f"tile_width ({tile_width}) must be at least 2 and larger than tile_overlap ({tile_overlap}), or 0 to disable tiling."
+        return True
 
-        spectrogram_transform = torchaudio.transforms.Spectrogram(
-            n_fft=n_fft,
-            hop_length=hop_length,
-            power=1.0 # Magnitude
-        ).to(waveform.device)
+    def to_spectrogram(self, audio, n_fft, hop_length, tile_width=0, tile_overlap=32, keep_phase=False):
+        waveform = mono_batch(audio["waveform"]) # [Batch, Samples], mono
+        batch, bins = waveform.shape[0], n_fft // 2 + 1
 
-        spec = spectrogram_transform(waveform)
-        
         # Log magnitude (standard for visual representation)
-        spec = torch.log1p(spec)
-
-        # Normalize 0-1
-        max_val = spec.max()
-        if max_val > 0:
-            spec = spec / max_val
-            
-        # Spec is [Freq, Time]
-        # Image expects [Batch, Height, Width, Channels]
         # We flip Y axis so Low Frequencies are at the bottom (Standard view)
-        spec = torch.flip(spec, [0])
+        # Long files are converted block by block straight into the image, so only the image is held in full
+        # Spec is [Batch, Freq, Time]
+        # Image expects [Batch, Height, Width, Channels]
+        frames = num_frames(waveform.shape[-1], n_fft, hop_length)
+        segments = plan_tiles(frames, tile_width, tile_overlap) if tile_width > 0 else [(0, frames)]
+        tiled = len(segments) > 1
+        if tiled:
+            # Tiles are cut from a one-channel spectrum after global normalization, so they share one scale
+            spec = torch.empty((batch, bins, frames), device=waveform.device)
+        else:
+            img = torch.empty((batch, bins, frames, 3), device=waveform.device)
+            spec = img[..., 0]
+        # The complex spectrum is what gets cached, so Spectrogram to Audio can warm-start its phase from it
+        if keep_phase:
+            phase = torch.empty((batch, bins, frames), device=waveform.device)
+            reduce_stft(waveform, n_fft, hop_length, lambda s: (torch.log1p(s.abs()).flip(-2), s.angle()), power=None, out=(spec, phase))
+        else:
+            # Nothing but the image is held, so streamed conversions stay bounded
+            reduce_stft(waveform, n_fft, hop_length, lambda s: torch.log1p(s.abs()).flip(-2), power=None, out=spec)
+
+        # Normalize 0-1, per batch item
+        max_val = spec.amax(dim=(1, 2), keepdim=True)
+        max_val = torch.where(max_val > 0, max_val, torch.ones_like(max_val))
+        spec.div_(max_val)
+
+        if tiled:
+            # [Batch * Tiles, Freq, tile_width, 3], tiles of each item in order
+            width = segments[0][1] - segments[0][0]
+            img = torch.empty((batch * len(segments), bins, width, 3), device=waveform.device)
+            split_tiles(spec, segments, out=img[..., 0])
+            del spec
+            print(f"#### Internode: Spectrogram split into {len(segments)} tiles of {width} frames per item.")
 
-        img = spec.unsqueeze(0).unsqueeze(-1) # [1, H, W, 1]
         # Expand to 3 channels for compatibility with Standard SD VAE
-        img = img.repeat(1, 1, 1, 3) 
-        
-        return (img,)
+        img[..., 1:] = img[..., :1]
+        
+        # Side channel for an exact inverse: phase (low frequencies first) and the log-magnitude scale
+        spectral_phase = None
+        if keep_phase:
+            spectral_phase = {
+                "phase": phase, "log_max": max_val.reshape(-1),
+                "n_fft": n_fft, "hop_length": hop_length,
+                "sample_rate": audio["sample_rate"], "length": waveform.shape[-1],
+            }
+        # Where each tile sits on the full frame axis (a single full-width tile when not tiling)
+        tile_info = {
+            "segments": segments, "tile_width": segments[0][1] - segments[0][0], "frames": frames,
+            "hop_length": hop_length, "length": waveform.shape[-1], "batch": batch,
+        }
+        return (img, spectral_phase, tile_info)
 
 class InternodeImageToAudio:
     """
-    Converts a spectrogram image back to audio using Griffin-Lim phase reconstruction.
+    Converts a spectrogram image back to audio using Fast Griffin-Lim phase
+    reconstruction (every image in the batch in one pass).
     """
     @classmethod
     def INPUT_TYPES(s):
@@ -334,22 +449,34 @@ class InternodeImageToAudio:
             "required": {
                 "image": ("IMAGE",),
                 "sample_rate": ("INT", {"default": 44100, "min": 8000, "max": 96000}),
-                "n_iter": ("INT", {"default": 32, "min": 1, "max": 256}),
+                "n_iter": ("INT", {"default": 32, "min": 0, "max": 256, "tooltip": "Phase reconstruction passes. With source_audio connected a handful is usually enough (0 = use the source phase as is)."}),
                 "hop_length": ("INT", {"default": 256, "min": 32, "max": 2048}),
                 "amp_scale": ("FLOAT", {"default": 100.0, "min": 1.0, "max": 1000.0, "tooltip": "Boosts volume to recover range lost during 0-1 normalization."}),
+            },
+            "optional": {
+                "momentum": ("FLOAT", {"default": DEFAULT_MOMENTUM, "min": 0.0, "max": 0.999, "step": 0.01, "tooltip": "Fast Griffin-Lim acceleration. 0 = classic Griffin-Lim."}),
+                "source_audio": ("AUDIO", {"tooltip": "The audio the spectrogram was made from. Its phase (from the shared spectrum cache) warm-starts the reconstruction."}),
+                "spectral_phase": ("SPECTRAL_PHASE", {"tooltip": "From Audio to Spectrogram. Inverts exactly with one iSTFT (sample_rate, hop_length and amp_scale come from it)."}),
+                "phase_iters": ("INT", {"default": 0, "min": 0, "max": 256, "tooltip": "With spectral_phase: Griffin-Lim passes starting from the stored phase, to smooth heavily edited regions. 0 = exact inverse."}),
+                "tile_info": ("SPECTRAL_TILES", {"tooltip": "From a tiled Audio to Spectrogram. Each tile is reconstructed on its own and the results are overlap-added back into full-length audio."}),
             }
         }
     RETURN_TYPES = ("AUDIO",)
     FUNCTION = "from_spectrogram"
     CATEGORY = "Internode/Spectral"
 
-    def from_spectrogram(self, image, sample_rate, n_iter, hop_length, amp_scale):
+    def from_spectrogram(self, image, sample_rate, n_iter, hop_length, amp_scale, momentum=DEFAULT_MOMENTUM, source_audio=None, spectral_phase=None, phase_iters=0, tile_info=None):
         # Image: [Batch, H, W, C]
-        # Take batch 0, channel 0 (Greyscale info)
-        img = image[0, :, :, 0] # [H, W]
+        # Channel 0 (Greyscale info) of every image
+        img = image[..., 0] # [B, H, W]
         
         # Unflip (Low freq was at bottom)
-        img = torch.flip(img, [0])
+        img = torch.flip(img, [1])
+        
+        tiles = self.tile_layout(tile_info, img.shape)
+        if spectral_phase is not None:
+            audio = self.from_phase(img, spectral_phase, momentum, phase_iters, tiles)
+            if audio is not None: return (audio,)
         
         # Denormalize (Log -> Linear)
         # We apply amp_scale here to recover dynamic range before exponentiation
@@ -359,19 +486,88 @@ class InternodeImageToAudio:
         # Determine n_fft from image height
         # Spectrogram Height = n_fft // 2 + 1
         # Therefore: n_fft = (Height - 1) * 2
-        height = img.shape[0]
+        batch, height, width = img.shape
         n_fft = (height - 1) * 2
 
-        griffin_lim = torchaudio.transforms.GriffinLim(
-            n_fft=n_fft,
-            hop_length=hop_length,
-            n_iter=n_iter,
-            power=1.0
-        ).to(img.device)
+        init_phase, length = None, None
+        if source_audio is not None:
+            init_phase, length = self.source_phase(source_audio, n_fft, hop_length, batch, width, img.device, tiles)
+        if init_phase is None and n_iter == 0:
+            n_iter = 1
 
-        waveform = griffin_lim(spec)
+        if tiles is not None:
+            # Every tile is reconstructed to its full width, then overlap-added
+            waveform = fast_griffin_lim(spec, n_fft, hop_length, n_iter, momentum, init_phase, width * hop_length)
+            waveform = stitch_tiles(waveform, tiles["segments"], hop_length, self.tiled_length(tiles, hop_length))
+        else:
+            waveform = fast_griffin_lim(spec, n_fft, hop_length, n_iter, momentum, init_phase, length)
         
-        # Reshape for Comfy Audio format [1, Channels, Samples]
-        waveform = waveform.unsqueeze(0).unsqueeze(0)
+        # Reshape for Comfy Audio format [Batch, Channels, Samples]
+        waveform = waveform.unsqueeze(1)
         
-        return ({"waveform": waveform, "sample_rate": sample_rate},)
\ No newline at end of file
+        return ({"waveform": waveform, "sample_rate": sample_rate},)
+
+    @staticmethod
+    def tile_layout(tile_info, shape):
+        """tile_info when the [B, H, W] images are its tiles (B = items * tiles), else None."""
+        if tile_info is None or len(tile_info["segments"]) < 2: return None
+        if shape[0] % len(tile_info["segments"]) or shape[2] != tile_info["tile_width"]:
+            print(f"#### Internode: tile_info ({len(tile_info['segments'])} tiles of {tile_info['tile_width']} frames) does not match the images {tuple(shape)}, treating them as whole spectrograms.")
+            return None
+        return tile_info
+
+    @staticmethod
+    def tiled_length(tiles, hop_length):
+        """Length of the stitched audio: the source length when the hop matches the tiling's."""
+        if tiles["hop_length"] == hop_length: return tiles["length"]
+        return (tiles["frames"] - 1) * hop_length
+
+    @staticmethod
+    def from_phase(img, spectral_phase, momentum, phase_iters, tiles=None):
+        """Inverse using the Spectrogram node's side channel, or None if it doesn't fit the image."""
+        phase = spectral_phase["phase"]
+        batch, height, width = img.shape
+        # With tiles the phase covers the whole item: compare it against the full frame count
+        items, frames = (batch // len(tiles["segments"]), tiles["frames"]) if tiles else (batch, width)
+        if phase.shape[-2] != height or phase.shape[0] not in (1, items):
+            print(f"#### Internode: spectral_phase {tuple(phase.shape)} does not match the image {tuple(img.shape)}, falling back to Griffin-Lim.")
+            return None
+        log_max = spectral_phase["log_max"].to(img.device)
+        if log_max.shape[0] != items: log_max = log_max[:1].expand(items)
+
+        n_fft, hop_length = spectral_phase["n_fft"], spectral_phase["hop_length"]
+        length = spectral_phase["length"] if phase.shape[-1] == frames else None
+        phase = match_frames(torch.polar(torch.ones_like(phase), phase), frames).to(img.device).expand(items, -1, -1)
+        if tiles:
+            phase = split_tiles(phase, tiles["segments"])
+            log_max = log_max.repeat_interleave(len(tiles["segments"]))
+            length, tile_length = length or (frames - 1) * hop_length, width * hop_length
+        else:
+            tile_length = length
+        # Exact inverse of log1p(|X|) / log_max
+        spec = torch.expm1(img * log_max.view(-1, 1, 1))
+
+        if phase_iters > 0:
+            waveform = fast_griffin_lim(spec, n_fft, hop_length, phase_iters, momentum, phase, tile_length)
+        else:
+            waveform = inverse_stft(spec, phase, n_fft, hop_length, tile_length)
+        if tiles:
+            waveform = stitch_tiles(waveform, tiles["segments"], hop_length, length)
+        return {"waveform": waveform.unsqueeze(1), "sample_rate": spectral_phase["sample_rate"]}
+
+    @staticmethod
+    def source_phase(source_audio, n_fft, hop_length, batch, width, device, tiles=None):
+        """
+        Unit phase [batch, bins, width] of the source audio, plus its length
+        when the frames line up. With tiles it is cut to match each tile.
+        """
+        src = mono_batch(source_audio["waveform"])
+        items, frames = (batch // len(tiles["segments"]), tiles["frames"]) if tiles else (batch, width)
+        if src.shape[0] not in (1, items):
+            print(f"#### Internode: source_audio has {src.shape[0]} items for {items} spectrograms, ignoring it.")
+            return None, None
+        spec = stft(src, n_fft, hop_length, power=None) # Cached if the Spectrogram node already ran on it
+        phase = match_frames(spec / spec.abs().clamp(min=1e-16), frames).to(device).expand(items, -1, -1)
+        length = src.shape[-1] if spec.shape[-1] == frames else None
+        if tiles: phase = split_tiles(phase, tiles["segments"])
+        return phase, length
\ No newline at end of file
@@ -0,0 +1,115 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/analysis/analysis_utils.py
+# VERSION: 3.6.0
+#
+# Vectorized curve helpers for the analysis nodes (smoothing, peak picking,
+# schedule formatting). No ComfyUI imports.
+
+import math
+import functools
+import numpy as np
+import torch
+
+SCIPY_AVAILABLE = False
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    pass
+
+
+def mono_batch(waveform):
+    """Mixes an AUDIO waveform ([B, C, N], [C, N] or [N]) down to [B, N]."""
+    if waveform.dim() == 3: return waveform.mean(dim=1)
+    if waveform.dim() == 2: return waveform.mean(dim=0, keepdim=True)
+    return waveform.reshape(1, -1)
+
+
+ANALYSIS_RATES = ["Full", "32000", "22050", "16000", "11025"]
+
+
+@functools.lru_cache(maxsize=16)
+def _resampler(orig_rate, new_rate, device):
+    import torchaudio
+    # Windowed-sinc polyphase kernel, built once per rate pair and device
+    return torchaudio.transforms.Resample(orig_rate, new_rate).to(device)
+
+
+def decimate(y, sample_rate, analysis_rate):
+    """
+    Low-passes and downsamples a [B, N] mono batch to analysis_rate ("Full"
+    or a rate >= sample_rate leaves it untouched). Returns (y, rate).
+    """
+    if analysis_rate == "Full" or int(analysis_rate) >= sample_rate:
+        return y, sample_rate
+    rate = int(analysis_rate)
+    return _resampler(int(sample_rate), rate, str(y.device))(y), rate
+
+
+def scaled_fft_size(n_fft, sample_rate, analysis_rate):
+    """Power-of-two FFT size that keeps roughly the same window duration (and bin width) at analysis_rate."""
+    if analysis_rate >= sample_rate: return n_fft
+    return max(256, 2 ** int(round(math.log2(n_fft * analysis_rate / sample_rate))))
+
+
+def unbatch(items):
+    """Single-item batches keep their plain (pre-batching) output shape."""
+    return items[0] if len(items) == 1 else items
+
+
+def resample_curves(values, target_len):
+    """
+    np.interp(np.linspace(0, L, target_len), np.arange(L), row) for every row
+    of a [..., L] array at once; positions past the end hold the last value.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    length = x.shape[-1]
+    if length == 1: return np.repeat(x, target_len, axis=-1)
+    pos = np.linspace(0, length, target_len)
+    i0 = np.clip(np.floor(pos).astype(np.int64), 0, length - 2)
+    frac = np.clip(pos - i0, 0.0, 1.0)
+    return x[..., i0] * (1.0 - frac) + x[..., i0 + 1] * frac
+
+
+def normalize_rows(values, eps=0.0):
+    """Divides each row (last axis) by its maximum where that exceeds eps."""
+    x = np.asarray(values, dtype=np.float64)
+    m = x.max(axis=-1, keepdims=True) if x.shape[-1] else np.zeros(x.shape[:-1] + (1,))
+    return np.where(m > eps, x / np.where(m > eps, m, 1.0), x)
+
+
+def ema(values, smoothing):
+    """
+    One-pole smoother along the last axis:
+    y[i] = smoothing * y[i-1] + (1 - smoothing) * x[i], starting from 0.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if smoothing <= 0 or x.shape[-1] == 0: return x
+    b, a = [1.0 - smoothing], [1.0, -smoothing]
+    if SCIPY_AVAILABLE:
+        return lfilter(b, a, x, axis=-1)
+    import torchaudio
+    y = torchaudio.functional.lfilter(
+        torch.from_numpy(x), torch.tensor(a, dtype=torch.float64), torch.tensor(b + [0.0], dtype=torch.float64), clamp=False
+    )
+    return y.numpy()
+
+
+def local_peaks(values, threshold):
+    """
+    1.0 at interior samples above threshold that are strictly greater than
+    both neighbours, 0.0 elsewhere (along the last axis).
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.zeros_like(x)
+    if x.shape[-1] < 3: return out
+    mid = x[..., 1:-1]
+    out[..., 1:-1] = (mid > threshold) & (mid > x[..., :-2]) & (mid > x[..., 2:])
+    return out
+
+
+def format_schedule(values, precision=3):
+    """'0:(0.500),\\n1:(0.600),...' keyframe schedule, formatted in one pass."""
+    arr = np.asarray(values, dtype=np.float64).reshape(-1)
+    if arr.size == 0: return ""
+    fmt = ",\n".join([f"%d:(%.{precision}f)"] * arr.size)
+    return fmt % tuple(np.column_stack([np.arange(arr.size), arr]).ravel().tolist())
@@ -0,0 +1,206 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/analysis/beat_tracking.py
+# VERSION: 3.6.0
+#
+# Native onset / tempo / beat engine (replaces bolting librosa onto a graph).
+# Log spectral flux from the shared STFT, adaptive peak picking, tempo from
+# the onset envelope's autocorrelation and a phase-aligned beat grid snapped
+# to nearby onsets. Everything runs on [B, frames] tensors; no ComfyUI imports.
+
+import math
+import functools
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .spectral_cache import reduce_stft
+from ..dsp.audio_utils import moving_average
+
+ONSET_N_FFT = 2048
+ONSET_HOP = 512
+ONSET_BANDS = 128
+LOG_COMPRESSION = 100.0
+TEMPO_PRIOR_BPM = 120.0
+
+
+def onset_envelope(y, sample_rate, n_fft=ONSET_N_FFT, hop_length=ONSET_HOP, bands=ONSET_BANDS):
+    """
+    Half-wave rectified log spectral flux of a [B, N] mono batch, normalized
+    per item to 0..1. Returns ([B, frames] envelope, envelope frame rate).
+    """
+    def log_bands(spec): # [B, bins, t] -> [B, bands, t]
+        b, bins, t = spec.shape
+        logmag = torch.log1p(LOG_COMPRESSION * spec).transpose(1, 2).reshape(b * t, 1, bins)
+        return F.adaptive_avg_pool1d(logmag, bands).reshape(b, t, bands).transpose(1, 2)
+
+    frame_rate = sample_rate / hop_length
+    logspec = reduce_stft(y, n_fft, hop_length, log_bands, power=1.0)
+    flux = torch.relu(logspec[..., 1:] - logspec[..., :-1]).mean(dim=1)
+    flux = F.pad(flux, (1, 0))
+    # Remove the slowly moving part so sustained loud passages don't read as onsets
+    env = torch.relu(flux - moving_average(flux, int(frame_rate * 0.5), edge="replicate"))
+    peak = env.amax(dim=-1, keepdim=True)
+    return torch.where(peak > 0, env / peak.clamp(min=1e-12), env), frame_rate
+
+
+@functools.lru_cache(maxsize=8)
+def onset_latency(sample_rate, n_fft=ONSET_N_FFT, hop_length=ONSET_HOP):
+    """
+    Seconds by which the onset envelope peaks ahead of the transient that
+    caused it: a centered window starts to see a click up to n_fft / 2
+    samples early, and the log compression makes that leading edge count.
+    Measured once per rate on synthetic clicks at several positions
+    between frames.
+    """
+    phases = 8
+    length = max(6 * n_fft, 2 * int(sample_rate))
+    pos = torch.tensor([length // 2 + (i * hop_length) // phases for i in range(phases)])
+    clicks = torch.zeros(phases, length)
+    for i, p in enumerate(pos.tolist()):
+        clicks[i, p:p + 32] = 0.5
+    env, _ = onset_envelope(clicks, sample_rate, n_fft, hop_length)
+    return float((pos.double() - env.argmax(dim=-1).double() * hop_length).mean()) / sample_rate
+
+
+def pick_onsets(env, frame_rate, threshold=0.07, max_window=0.03, avg_window=0.1):
+    """
+    Boolean [B, frames] mask of onsets: local maxima within +/- max_window
+    seconds that exceed the local mean (+/- avg_window seconds) by threshold.
+    """
+    wm = max(1, int(round(max_window * frame_rate)))
+    local_max = F.max_pool1d(F.pad(env.unsqueeze(1), (wm, wm), value=-1.0), 2 * wm + 1, stride=1).squeeze(1)
+    local_mean = moving_average(env, 2 * int(round(avg_window * frame_rate)) + 1, edge="replicate")
+    # Strictly above the previous frame so flat tops only fire once
+    rising = env > F.pad(env[..., :-1], (1, 0), value=-1.0)
+    return (env >= local_max) & rising & (env >= local_mean + threshold) & (env > 0)
+
+
+def estimate_tempo(env, frame_rate, min_bpm=60.0, max_bpm=200.0, prior_bpm=TEMPO_PRIOR_BPM):
+    """
+    Tempo of each item from the autocorrelation of its onset envelope,
+    weighted by a log-normal prior around prior_bpm and kept within
+    [min_bpm, max_bpm]. Returns ([B] bpm, [B] beat period in envelope
+    frames); 0 where the audio is too short or has no onsets at all.
+    """
+    b, n = env.shape
+    lo = max(1, int(math.ceil(60.0 * frame_rate / max_bpm)))
+    hi = min(n - 2, int(math.floor(60.0 * frame_rate / min_bpm)))
+    if hi <= lo:
+        zeros = torch.zeros(b, dtype=torch.float64)
+        return zeros, zeros.clone()
+
+    x = (env - env.mean(dim=-1, keepdim=True)).double()
+    spec = torch.fft.rfft(x, n=2 * n)
+    ac = torch.fft.irfft(spec.real.square() + spec.imag.square(), n=2 * n)[..., :n]
+    lags = torch.arange(lo, hi + 1, dtype=torch.float64, device=env.device)
+    prior = torch.exp(-0.5 * torch.log2(60.0 * frame_rate / lags / prior_bpm).square())
+    score = ac[..., lo:hi + 1] * prior
+    best = score.argmax(dim=-1)
+
+    # Parabolic refinement between neighbouring lags for a sub-frame period
+    left = score.gather(-1, (best - 1).clamp(min=0).unsqueeze(-1)).squeeze(-1)
+    mid = score.gather(-1, best.unsqueeze(-1)).squeeze(-1)
+    right = score.gather(-1, (best + 1).clamp(max=score.shape[-1] - 1).unsqueeze(-1)).squeeze(-1)
+    denom = left - 2 * mid + right
+    shift = torch.where(denom < 0, 0.5 * (left - right) / denom.clamp(max=-1e-12), torch.zeros_like(mid)).clamp(-0.5, 0.5)
+    period = lags[best] + shift
+    bpm = (60.0 * frame_rate / period).clamp(min_bpm, max_bpm)
+    # Silence (or a constant envelope) has no tempo, whatever the argmax says
+    active = x.abs().amax(dim=-1) > 0
+    bpm = torch.where(active, bpm, torch.zeros_like(bpm)).cpu()
+    period = torch.where(active, 60.0 * frame_rate / bpm.clamp(min=1e-9).to(period.device), torch.zeros_like(period)).cpu()
+    return bpm, period
+
+
+def _snap(env, grid, w):
+    """Moves each grid frame to the strongest envelope frame within +/- w."""
+    n = env.shape[-1]
+    window = (grid[:, None] + torch.arange(-w, w + 1)[None, :]).clamp(0, n - 1)
+    return window.gather(1, env[window].argmax(dim=1, keepdim=True)).squeeze(1)
+
+
+def track_beats(env, period, onsets=None, snap=0.1, refine_steps=3):
+    """
+    Beat frames of one [frames] envelope: the constant-period grid phase
+    with the highest mean onset strength, refined by a weighted line fit
+    through the onsets it snaps to (so small tempo errors don't drift), with
+    each beat finally snapped to the strongest frame within snap * period.
+    When an onset mask is given, beats before the first / after the last
+    beat that lands on an onset are dropped. Returns (beat frames, refined
+    period in frames).
+    """
+    n = env.shape[-1]
+    if period <= 0 or n == 0: return torch.zeros(0, dtype=torch.long), period
+    env = env.double().cpu()
+    phases = torch.arange(int(math.ceil(period)), dtype=torch.float64)
+    steps = torch.arange(int(n / period) + 1, dtype=torch.float64) * period
+    pos = (phases[:, None] + steps[None, :]).round().long()
+    valid = pos < n
+    strength = torch.where(valid, env[pos.clamp(max=n - 1)], torch.zeros(())).sum(dim=1) / valid.sum(dim=1).clamp(min=1)
+    phase = float(phases[strength.argmax()])
+
+    w = max(1, int(round(period * snap)))
+    for step in range(refine_steps + 1):
+        k = torch.arange(math.ceil(-phase / period), math.floor((n - 1 - phase) / period) + 1, dtype=torch.float64)
+        if len(k) < 2: break
+        ideal = phase + k * period
+        snapped = _snap(env, ideal.round().long().clamp(0, n - 1), w)
+        if step == refine_steps: break
+        # Weighted least squares fit of snapped = phase + k * period
+        weight = env[snapped]
+        sw = weight.sum()
+        if sw <= 0: break
+        km, sm = (weight * k).sum() / sw, (weight * snapped).sum() / sw
+        var = (weight * (k - km).square()).sum()
+        if var <= 0: break
+        period = float((weight * (k - km) * (snapped - sm)).sum() / var)
+        phase = float(sm - period * km)
+    grid = torch.unique(snapped)
+
+    if onsets is not None:
+        # Onset count within +/- w of each beat, from a cumulative sum
+        cs = F.pad(torch.cumsum(onsets.cpu().long(), dim=0), (1, 0))
+        near = cs[(grid + w + 1).clamp(max=n)] - cs[(grid - w).clamp(min=0)]
+        on_beat = torch.nonzero(near > 0).squeeze(-1)
+        if len(on_beat) == 0: return torch.zeros(0, dtype=torch.long), period
+        grid = grid[on_beat[0]:on_beat[-1] + 1]
+    return grid, period
+
+
+def detect_beats(y, sample_rate, min_bpm=60.0, max_bpm=200.0, onset_threshold=0.07):
+    """
+    Runs the whole engine on a [B, N] mono batch. Returns one dict per item:
+    {"bpm", "beat_times", "onset_times", "onset_envelope", "frame_rate"};
+    times are in seconds (numpy float64 arrays), corrected for the
+    envelope's onset_latency(). Silent items get bpm 0 and no beats.
+    """
+    env, frame_rate = onset_envelope(y, sample_rate)
+    onsets = pick_onsets(env, frame_rate, onset_threshold)
+    _, period = estimate_tempo(env, frame_rate, min_bpm, max_bpm)
+    latency = onset_latency(int(sample_rate))
+    results = []
+    for i in range(env.shape[0]):
+        beats, beat_period = track_beats(env[i], float(period[i]), onsets[i])
+        bpm = min(max(60.0 * frame_rate / beat_period, min_bpm), max_bpm) if beat_period > 0 else 0.0
+        results.append({
+            "bpm": bpm,
+            "beat_times": beats.numpy().astype(np.float64) / frame_rate + latency,
+            "onset_times": torch.nonzero(onsets[i]).squeeze(-1).cpu().numpy().astype(np.float64) / frame_rate + latency,
+            "onset_envelope": env[i].cpu().numpy(),
+            "frame_rate": frame_rate,
+        })
+    return results
+
+
+def trigger_curve(times, num_frames, fps, decay=0.0):
+    """
+    Per-frame FLOAT_LIST values: 1.0 on the frame of each event, then
+    decay ** frames_since_event (decay = 0 gives single-frame pulses).
+    """
+    frames = np.unique(np.round(np.asarray(times, dtype=np.float64) * fps).astype(np.int64))
+    frames = frames[(frames >= 0) & (frames < num_frames)]
+    idx = np.arange(num_frames)
+    last = np.searchsorted(frames, idx, side="right") - 1
+    if len(frames) == 0: return np.zeros(num_frames)
+    since = idx - frames[np.maximum(last, 0)]
+    curve = np.power(decay, since) if decay > 0 else (since == 0).astype(np.float64)
+    return np.where(last >= 0, curve, 0.0)
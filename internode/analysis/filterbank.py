@@ -0,0 +1,65 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/analysis/filterbank.py
+# VERSION: 3.6.0
+#
+# Triangular band filterbanks (mel or log spaced) as [bands, bins] matrices,
+# so any number of band curves comes out of one matmul against a spectrum.
+# Matrices are cached per configuration and device. Torch only.
+
+import math
+import functools
+import torch
+
+SCALES = ["Mel", "Log"]
+
+
+def hz_to_mel(f):
+    return 2595.0 * math.log10(1.0 + f / 700.0)
+
+
+def mel_to_hz(m):
+    return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+
+def band_edges(n_bands, fmin, fmax, scale="Mel"):
+    """n_bands + 2 corner frequencies (Hz): band k spans edges[k]..edges[k + 2]."""
+    if scale == "Mel":
+        mels = torch.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_bands + 2, dtype=torch.float64)
+        return mel_to_hz(mels)
+    if scale == "Log":
+        return torch.logspace(math.log10(max(fmin, 1.0)), math.log10(fmax), n_bands + 2, dtype=torch.float64)
+    raise ValueError(f"Unknown band scale '{scale}'. Use one of: {', '.join(SCALES)}")
+
+
+@functools.lru_cache(maxsize=32)
+def _filterbank(n_bands, n_fft, sample_rate, fmin, fmax, scale, device):
+    fmax = min(fmax, sample_rate / 2.0)
+    edges = band_edges(n_bands, fmin, fmax, scale)
+    freqs = torch.linspace(0.0, sample_rate / 2.0, n_fft // 2 + 1, dtype=torch.float64)
+    lo, center, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    up = (freqs[None, :] - lo) / (center - lo).clamp(min=1e-9)
+    down = (hi - freqs[None, :]) / (hi - center).clamp(min=1e-9)
+    fb = torch.clamp(torch.minimum(up, down), min=0.0)
+
+    # Bands narrower than one FFT bin would be empty: give them their nearest bin
+    empty = fb.sum(dim=1) == 0
+    if empty.any():
+        nearest = (center[empty, 0] / (sample_rate / n_fft)).round().long().clamp(0, n_fft // 2)
+        fb[empty.nonzero().squeeze(1), nearest] = 1.0
+    # Rows sum to 1, so each band is a weighted mean of its bins
+    fb = fb / fb.sum(dim=1, keepdim=True)
+    return fb.to(dtype=torch.float32, device=device)
+
+
+def filterbank(n_bands, n_fft, sample_rate, fmin=20.0, fmax=20000.0, scale="Mel", device="cpu"):
+    """
+    Cached [n_bands, n_fft // 2 + 1] triangular filterbank. Shared between
+    callers: treat it as read-only.
+    """
+    if fmin >= min(fmax, sample_rate / 2.0):
+        raise ValueError(f"fmin ({fmin} Hz) must be below fmax ({fmax} Hz) and Nyquist ({sample_rate / 2.0} Hz).")
+    return _filterbank(int(n_bands), int(n_fft), int(sample_rate), float(fmin), float(fmax), scale, str(device))
+
+
+def band_energies(spec, fb):
+    """[..., bins, frames] spectrum -> [..., bands, frames] in one matmul."""
+    return torch.matmul(fb, spec)
@@ -0,0 +1,199 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/analysis/spectral_cache.py
+# VERSION: 3.6.0
+#
+# Process-wide STFT cache shared by the analysis and spectral nodes. Several
+# nodes wired to the same track (bass, mid, hats, beat...) then pay for one
+# FFT per configuration instead of one each. Entries are keyed by a hash of
+# the signal's contents plus (n_fft, hop, window, power) and evicted LRU.
+# Spectra too large to hold are streamed in blocks of frames instead (see
+# reduce_stft). Torch only, no ComfyUI imports.
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import torch
+
+MAX_CACHED_SPECTRA = 16
+MAX_CACHE_BYTES = int(os.environ.get("INTERNODE_STFT_CACHE_MB", "1024")) * (1 << 20)
+# Spectra above this size are reduced block by block instead of materialized
+STREAM_THRESHOLD_BYTES = int(os.environ.get("INTERNODE_STFT_STREAM_MB", "256")) * (1 << 20)
+STREAM_BLOCK_BYTES = 32 * (1 << 20)
+WINDOWS = {
+    "hann": torch.hann_window,
+    "hamming": torch.hamming_window,
+    "blackman": torch.blackman_window,
+}
+
+_CACHE = OrderedDict()
+_CACHE_BYTES = 0
+_CACHE_LOCK = threading.Lock()
+
+
+def content_hash(signal):
+    """Digest of a tensor's shape, dtype and values (device independent)."""
+    data = signal.detach().contiguous().cpu()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((tuple(data.shape), str(data.dtype))).encode())
+    h.update(data.view(torch.uint8).reshape(-1).numpy() if data.numel() else b"")
+    return h.hexdigest()
+
+
+def get_window(name, n_fft, device=None):
+    if name not in WINDOWS:
+        raise ValueError(f"Unknown STFT window '{name}'. Use one of: {', '.join(WINDOWS)}")
+    return WINDOWS[name](n_fft, device=device)
+
+
+def compute_stft(signal, n_fft, hop_length, window="hann", power=2.0):
+    """
+    Uncached STFT of [..., N] with torchaudio.transforms.Spectrogram's
+    conventions (centered, reflect padding, onesided). power=None returns the
+    complex spectrum, otherwise |X| ** power. Output is [..., n_fft // 2 + 1, frames].
+    """
+    shape = signal.shape
+    x = signal.reshape(-1, shape[-1])
+    spec = torch.stft(
+        x, n_fft=n_fft, hop_length=hop_length, window=get_window(window, n_fft, x.device),
+        center=True, pad_mode="reflect", onesided=True, return_complex=True,
+    )
+    spec = spec.reshape(shape[:-1] + spec.shape[-2:])
+    return spec if power is None else _apply_power(spec, power)
+
+
+def _apply_power(spec, power):
+    mag = spec.abs()
+    if power == 1.0: return mag
+    if power == 2.0: return mag.square()
+    return mag.pow(power)
+
+
+def _nbytes(t):
+    return t.numel() * t.element_size()
+
+
+def _lookup(key):
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    return None
+
+
+def _store(key, spec):
+    global _CACHE_BYTES
+    size = _nbytes(spec)
+    if size > MAX_CACHE_BYTES: return
+    with _CACHE_LOCK:
+        if key in _CACHE: return
+        _CACHE[key] = spec
+        _CACHE_BYTES += size
+        while len(_CACHE) > MAX_CACHED_SPECTRA or _CACHE_BYTES > MAX_CACHE_BYTES:
+            _, old = _CACHE.popitem(last=False)
+            _CACHE_BYTES -= _nbytes(old)
+
+
+def stft(signal, n_fft, hop_length, window="hann", power=2.0):
+    """
+    Cached compute_stft(). The result is shared between callers, so treat it
+    as read-only (clone before editing in place). A cached complex spectrum
+    also serves magnitude/power requests for the same configuration.
+    """
+    base = (content_hash(signal), str(signal.device), int(n_fft), int(hop_length), window)
+    key = base + (power,)
+    spec = _lookup(key)
+    if spec is not None: return spec
+
+    complex_spec = _lookup(base + (None,)) if power is not None else None
+    if complex_spec is not None:
+        spec = _apply_power(complex_spec, power)
+    else:
+        spec = compute_stft(signal, n_fft, hop_length, window, power)
+    _store(key, spec)
+    return spec
+
+
+def num_frames(length, n_fft, hop_length):
+    """Frame count of a centered STFT over `length` samples."""
+    return 1 + (length + 2 * (n_fft // 2) - n_fft) // hop_length
+
+
+def _padded_segment(x, start, stop, pad):
+    """
+    Samples [start, stop) of x ([R, N]) reflect-padded by `pad` on both
+    sides, without padding (copying) the whole signal.
+    """
+    n = x.shape[-1]
+    if start >= pad and stop <= n + pad:
+        return x[:, start - pad:stop - pad]
+    idx = (torch.arange(start, stop, device=x.device) - pad).abs()
+    idx = torch.where(idx >= n, 2 * (n - 1) - idx, idx)
+    return x[:, idx]
+
+
+def iter_stft(signal, n_fft, hop_length, window="hann", power=2.0, block_frames=None):
+    """
+    Yields (first_frame, spectrum block) pairs that tile compute_stft()'s
+    frame axis exactly; only one block of frames is in memory at a time.
+    block_frames defaults to roughly STREAM_BLOCK_BYTES of complex output.
+    """
+    shape = signal.shape
+    x = signal.reshape(-1, shape[-1])
+    pad = n_fft // 2
+    if x.shape[-1] <= pad:
+        raise ValueError(f"Audio is too short ({x.shape[-1]} samples) for n_fft={n_fft}.")
+    total = num_frames(x.shape[-1], n_fft, hop_length)
+    if block_frames is None:
+        block_frames = STREAM_BLOCK_BYTES // (8 * x.shape[0] * (n_fft // 2 + 1))
+    block_frames = max(1, int(block_frames))
+    win = get_window(window, n_fft, x.device)
+
+    for f0 in range(0, total, block_frames):
+        f1 = min(total, f0 + block_frames)
+        seg = _padded_segment(x, f0 * hop_length, (f1 - 1) * hop_length + n_fft, pad)
+        spec = torch.stft(seg, n_fft=n_fft, hop_length=hop_length, window=win, center=False, onesided=True, return_complex=True)
+        spec = spec.reshape(shape[:-1] + spec.shape[-2:])
+        yield f0, (spec if power is None else _apply_power(spec, power))
+
+
+def reduce_stft(signal, n_fft, hop_length, reduce, window="hann", power=2.0, block_frames=None, out=None):
+    """
+    reduce(spectrum) for a framewise `reduce` (its output's last axis must
+    be the frame axis). Small spectra come from the shared cache; above
+    INTERNODE_STFT_STREAM_MB the STFT is walked in blocks and each block is
+    reduced into a preallocated output, so memory is bounded by the block
+    size rather than the audio length. `out` may be given to receive the
+    result (any writable view of the right shape). A reduce that returns a
+    tuple produces a tuple of outputs (and takes a tuple `out`).
+    """
+    rows = signal.numel() // max(signal.shape[-1], 1)
+    total = num_frames(signal.shape[-1], n_fft, hop_length)
+    itemsize = 8 if power is None else 4
+    if rows * (n_fft // 2 + 1) * total * itemsize <= STREAM_THRESHOLD_BYTES:
+        result = reduce(stft(signal, n_fft, hop_length, window, power))
+        if out is None: return result
+        for dst, part in zip(_as_tuple(out), _as_tuple(result)):
+            dst.copy_(part)
+        return out
+
+    multi = None
+    for f0, block in iter_stft(signal, n_fft, hop_length, window, power, block_frames):
+        parts = reduce(block)
+        multi = isinstance(parts, tuple)
+        parts = _as_tuple(parts)
+        if out is None:
+            out = tuple(p.new_empty(p.shape[:-1] + (total,)) for p in parts)
+        for dst, part in zip(_as_tuple(out), parts):
+            dst[..., f0:f0 + part.shape[-1]] = part
+    return out if multi or not isinstance(out, tuple) else out[0]
+
+
+def _as_tuple(x):
+    return x if isinstance(x, tuple) else (x,)
+
+
+def clear_cache():
+    global _CACHE_BYTES
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _CACHE_BYTES = 0
@@ -0,0 +1,117 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/analysis/spectral_inverse.py
+# VERSION: 3.6.0
+#
+# Spectrogram -> waveform reconstruction for the spectral nodes. Batched
+# Fast Griffin-Lim (momentum, optional warm-start phase) using the same STFT
+# conventions as spectral_cache, plus fixed-width tiling of long spectra
+# with overlap-add stitching. Torch only, no ComfyUI imports.
+
+import math
+import torch
+
+from .spectral_cache import get_window
+from ..dsp.audio_utils import plan_segments, crossfade_stitch
+
+DEFAULT_MOMENTUM = 0.99
+
+
+def _istft(spec, n_fft, hop_length, win, length):
+    return torch.istft(spec, n_fft=n_fft, hop_length=hop_length, window=win, center=True, length=length)
+
+
+def _stft(x, n_fft, hop_length, win):
+    return torch.stft(x, n_fft=n_fft, hop_length=hop_length, window=win, center=True, pad_mode="reflect", onesided=True, return_complex=True)
+
+
+def random_phase(shape, device=None, generator=None):
+    """Unit-magnitude complex tensor with uniformly random angles."""
+    angles = torch.rand(shape, device=device, generator=generator) * (2 * math.pi)
+    return torch.polar(torch.ones_like(angles), angles)
+
+
+def inverse_stft(magnitude, phase, n_fft, hop_length, length=None, window="hann"):
+    """Single iSTFT of magnitude * phase ([..., bins, frames], phase unit complex)."""
+    shape = magnitude.shape
+    spec = (magnitude * phase).reshape(-1, *shape[-2:])
+    wave = _istft(spec, n_fft, hop_length, get_window(window, n_fft, spec.device), length)
+    return wave.reshape(shape[:-2] + wave.shape[-1:])
+
+
+def fast_griffin_lim(magnitude, n_fft, hop_length, n_iter=32, momentum=DEFAULT_MOMENTUM, init_phase=None, length=None, window="hann"):
+    """
+    Fast Griffin-Lim (Perraudin et al.) on a [..., bins, frames] magnitude
+    batch, all items in the same FFT calls. init_phase (unit complex, same
+    shape) warm-starts the iteration; otherwise phases start random. With
+    momentum = 0 this is plain Griffin-Lim. Returns [..., samples].
+    """
+    shape = magnitude.shape
+    mag = magnitude.reshape(-1, *shape[-2:])
+    win = get_window(window, n_fft, mag.device)
+    if init_phase is None:
+        angles = random_phase(mag.shape, mag.device)
+    else:
+        angles = init_phase.reshape(mag.shape).to(mag.device)
+        angles = angles / angles.abs().clamp(min=1e-16)
+
+    # Accelerated projection: extrapolate from the previous estimate by momentum / (1 + momentum)
+    alpha = momentum / (1.0 + momentum)
+    prev = None
+    for _ in range(int(n_iter)):
+        # A length past the last frame (e.g. a full-width tile) re-analyses to extra frames: drop them
+        rebuilt = _stft(_istft(mag * angles, n_fft, hop_length, win, length), n_fft, hop_length, win)[..., :mag.shape[-1]]
+        angles = rebuilt if prev is None or alpha == 0 else rebuilt - alpha * prev
+        angles = angles / angles.abs().clamp(min=1e-16)
+        prev = rebuilt
+
+    wave = _istft(mag * angles, n_fft, hop_length, win, length)
+    return wave.reshape(shape[:-2] + wave.shape[-1:])
+
+
+def match_frames(phase, frames):
+    """Crops a [..., bins, t] phase to `frames`, or pads it with random phase."""
+    t = phase.shape[-1]
+    if t >= frames: return phase[..., :frames]
+    extra = random_phase(phase.shape[:-1] + (frames - t,), phase.device)
+    return torch.cat([phase, extra], dim=-1)
+
+
+def plan_tiles(frames, tile_width, overlap):
+    """
+    (start, end) frame ranges of tile_width-wide tiles, each overlapping the
+    previous one by at least `overlap` frames. The last tile is shifted back
+    to end on the last frame, so every tile is full width (no zero frames,
+    which would skew the iSTFT window normalization). frames <= tile_width
+    gives one tile covering everything.
+    """
+    if tile_width < 2 or not 0 <= overlap < tile_width:
+        raise ValueError(f"Tiles must be at least 2 frames wide and overlap by less than their width (got tile_width={tile_width}, overlap={overlap}).")
+    segments = plan_segments(frames, tile_width, overlap)
+    if len(segments) > 1 and segments[-1][1] - segments[-1][0] < tile_width:
+        segments[-1] = (frames - tile_width, frames)
+    return segments
+
+
+def split_tiles(x, segments, out=None):
+    """
+    Cuts [B, ..., frames] into [B * tiles, ..., width] (item-major) along the
+    (equal width) segments. `out` may be a preallocated, writable view.
+    """
+    nt, width = len(segments), segments[0][1] - segments[0][0]
+    if out is None:
+        out = x.new_empty((x.shape[0] * nt,) + x.shape[1:-1] + (width,))
+    grid = out.unflatten(0, (x.shape[0], nt))
+    for i, (start, end) in enumerate(segments):
+        grid[:, i] = x[..., start:end]
+    return out
+
+
+def stitch_tiles(waves, segments, hop_length, length):
+    """
+    Overlap-adds [B * tiles, samples] per-tile reconstructions (tile k
+    starting at frame segments[k][0]) into [B, length], crossfading each
+    overlap with complementary ramps.
+    """
+    nt = len(segments)
+    waves = waves.reshape(-1, nt, waves.shape[-1])
+    spans = [(start * hop_length, min(end * hop_length, length)) for start, end in segments]
+    return crossfade_stitch([waves[:, i] for i in range(nt)], spans, length)
@@ -2,6 +2,8 @@ import math
 import numpy as np
 import re
 
+from ..vst.midi_events import events_from_midi, NOTE_ON, CONTROL_CHANGE, PITCHWHEEL
+
 class InternodeLFO:
     @classmethod
     def INPUT_TYPES(s):
@@ -272,16 +274,84 @@ class InternodeStringSequencer:
         
         return (out_current, output_list)
 
+class InternodeMidiToCurve:
+    """
+    Turns a MIDI performance into a per-frame FLOAT_LIST. Events are binned
+    into frames with bincount/searchsorted, so file size barely matters.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "mode": (["CC Lane", "Note Velocity", "Note Density", "Pitch Bend"],),
+                "fps": ("FLOAT", {"default": 24.0, "min": 1.0, "max": 240.0, "step": 1.0}),
+                "total_frames": ("INT", {"default": 0, "min": 0, "max": 1000000, "tooltip": "0 = length of the MIDI file."}),
+                "channel": ("INT", {"default": -1, "min": -1, "max": 15, "tooltip": "-1 = all channels."}),
+                "cc_number": ("INT", {"default": 1, "min": 0, "max": 127, "tooltip": "Controller for CC Lane mode (1 = Mod Wheel, 7 = Volume, 11 = Expression)."}),
+                "note_min": ("INT", {"default": 0, "min": 0, "max": 127}),
+                "note_max": ("INT", {"default": 127, "min": 0, "max": 127}),
+                "normalize": ("BOOLEAN", {"default": True, "tooltip": "Note Density: scale so the busiest frame is 1.0 (otherwise notes per frame)."}),
+            },
+            "optional": {
+                "midi_data": ("MIDI_DATA",),
+                "midi_events": ("MIDI_EVENTS",),
+            }
+        }
+
+    RETURN_TYPES = ("FLOAT_LIST", "INT")
+    RETURN_NAMES = ("float_curve", "frame_count")
+    FUNCTION = "convert"
+    CATEGORY = "Internode/Control"
+
+    def convert(self, mode, fps, total_frames, channel, cc_number, note_min, note_max, normalize, midi_data=None, midi_events=None):
+        if midi_events is None:
+            if midi_data is None: raise ValueError("Connect midi_data or midi_events.")
+            midi_events = events_from_midi(midi_data)
+        ev = midi_events["events"]
+        if total_frames <= 0:
+            total_frames = max(1, int(math.ceil(midi_events["length"] * fps)) + 1)
+
+        mask = np.ones(len(ev), dtype=bool) if channel < 0 else ev["channel"] == channel
+        if mode == "CC Lane":
+            ev = ev[mask & (ev["type"] == CONTROL_CHANGE) & (ev["cc"] == cc_number)]
+            values = ev["value"] / 127.0
+        elif mode == "Pitch Bend":
+            ev = ev[mask & (ev["type"] == PITCHWHEEL)]
+            values = ev["value"] / 8192.0
+        else:
+            ev = ev[mask & (ev["type"] == NOTE_ON) & (ev["note"] >= note_min) & (ev["note"] <= note_max)]
+            values = ev["velocity"] / 127.0
+
+        frames = np.floor(ev["seconds"] * fps).astype(np.int64)
+        if mode in ("CC Lane", "Pitch Bend"):
+            # Controllers hold their last value: latest event at or before each frame
+            idx = np.searchsorted(frames, np.arange(total_frames), side="right") - 1
+            curve = np.where(idx >= 0, values[np.maximum(idx, 0)] if len(values) else 0.0, 0.0)
+        else:
+            inside = (frames >= 0) & (frames < total_frames)
+            frames, values = frames[inside], values[inside]
+            counts = np.bincount(frames, minlength=total_frames).astype(np.float64)
+            if mode == "Note Velocity":
+                # Mean onset velocity per frame, 0 where nothing starts
+                sums = np.bincount(frames, weights=values, minlength=total_frames)
+                curve = np.divide(sums, counts, out=np.zeros(total_frames), where=counts > 0)
+            else:
+                curve = counts / counts.max() if normalize and counts.max() > 0 else counts
+
+        return (curve.astype(np.float64).tolist(), total_frames)
+
 NODE_CLASS_MAPPINGS = {
     "InternodeLFO": InternodeLFO,
     "InternodeADSR": InternodeADSR,
     "InternodeParamRemap": InternodeParamRemap,
-    "InternodeStringSequencer": InternodeStringSequencer
+    "InternodeStringSequencer": InternodeStringSequencer,
+    "InternodeMidiToCurve": InternodeMidiToCurve
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "InternodeLFO": "LFO Generator (Internode)",
     "InternodeADSR": "ADSR Envelope (Internode)",
     "InternodeParamRemap": "Parameter Remapper (Internode)",
-    "InternodeStringSequencer": "String Sequencer (Internode)"
+    "InternodeStringSequencer": "String Sequencer (Internode)",
+    "InternodeMidiToCurve": "MIDI to Curve (Internode)"
 }
\ No newline at end of file
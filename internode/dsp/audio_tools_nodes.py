@@ -4,8 +4,30 @@
 import torch
 import numpy as np
 import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import folder_paths
 
+from .audio_utils import moving_average, upsample_blocks, plan_segments, crossfade_stitch, detect_active_regions
+
+# Envelope follower rate for the sidechain key (Hz)
+SIDECHAIN_CONTROL_RATE = 1000
+
+# Segment-parallel Demucs (seconds). Forked workers share the loaded model;
+# spawn isn't usable inside ComfyUI (every child would re-run its main.py).
+DEMUCS_SEGMENT_OVERLAP = 2
+DEMUCS_MIN_SEGMENT = 20
+FORK_AVAILABLE = sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods()
+
+def fork_is_safe():
+    """
+    Whether forked Demucs workers can run here. CUDA state never survives a
+    fork, so once CUDA is initialized the parallel path is off. Workers also
+    run single-threaded so they never touch the parent's OpenMP pool.
+    """
+    return FORK_AVAILABLE and not torch.cuda.is_initialized()
+
 # Try importing Demucs
 DEMUCS_AVAILABLE = False
 try:
@@ -40,11 +62,12 @@ class InternodeSidechain:
 
     def apply_sidechain(self, music, voice, threshold, ratio, attack, release, makeup_gain):
         music_wav = music["waveform"] 
-        voice_wav = voice["waveform"]
+        voice_wav = voice["waveform"].to(music_wav.device)
         sr = music["sample_rate"]
 
         if music_wav.shape[0] != voice_wav.shape[0]:
-            voice_wav = voice_wav[0].repeat(music_wav.shape[0], 1, 1)
+            # View, not a copy: every music item is keyed by the first voice item
+            voice_wav = voice_wav[:1].expand(music_wav.shape[0], -1, -1)
 
         target_len = music_wav.shape[-1]
         voice_len = voice_wav.shape[-1]
@@ -55,57 +78,40 @@ class InternodeSidechain:
         elif voice_len > target_len:
             voice_wav = voice_wav[..., :target_len]
 
-        output_batch = []
+        # Key signal for the whole batch: [B, N]
+        control = torch.mean(torch.abs(voice_wav), dim=1)
+
+        # Decimate to control rate (block means). Envelopes at 1 kHz are far
+        # below any audible modulation, and every later step is O(N / hop).
+        hop = max(1, sr // SIDECHAIN_CONTROL_RATE)
+        n_blocks = -(-target_len // hop)
+        control = torch.nn.functional.pad(control, (0, n_blocks * hop - target_len))
+        control = control.view(control.shape[0], n_blocks, hop).mean(dim=-1)
+
+        # Envelope (attack window)
+        envelope = moving_average(control, round(sr * attack / hop))
+
+        # Ducking
+        compression = (envelope - threshold) * (1.0 - (1.0 / ratio))
+        gain_map = torch.where(envelope > threshold, 1.0 - (compression * 2.0), torch.ones_like(envelope))
+        gain_map = torch.clamp(gain_map, 0.0, 1.0)
         
-        for b in range(music_wav.shape[0]):
-            m_track = music_wav[b]
-            v_track = voice_wav[b]
-            
-            control = torch.mean(torch.abs(v_track), dim=0) 
-            
-            # Envelope
-            kernel_size = int(sr * attack)
-            if kernel_size % 2 == 0: kernel_size += 1
-            if kernel_size > 1:
-                envelope = torch.nn.functional.avg_pool1d(
-                    control.unsqueeze(0).unsqueeze(0), 
-                    kernel_size=kernel_size, 
-                    stride=1, 
-                    padding=kernel_size//2
-                ).squeeze()
-                envelope = envelope[:target_len]
-            else:
-                envelope = control
-
-            # Ducking
-            gain_map = torch.ones_like(envelope)
-            over_thresh = envelope > threshold
-            
-            compression = (envelope[over_thresh] - threshold) * (1.0 - (1.0 / ratio))
-            gain_map[over_thresh] = 1.0 - (compression * 2.0)
-            
-            gain_map = torch.clamp(gain_map, 0.0, 1.0)
-            
-            if release > 0:
-                rel_k = int(sr * release * 0.5) 
-                if rel_k % 2 == 0: rel_k += 1
-                gain_map = torch.nn.functional.avg_pool1d(
-                    gain_map.unsqueeze(0).unsqueeze(0),
-                    kernel_size=rel_k,
-                    stride=1,
-                    padding=rel_k//2
-                ).squeeze()[:target_len]
-
-            gain_map_expanded = gain_map.unsqueeze(0).repeat(m_track.shape[0], 1)
-            out_track = m_track * gain_map_expanded * makeup_gain
-            output_batch.append(out_track)
-
-        return ({"waveform": torch.stack(output_batch), "sample_rate": sr},)
+        if release > 0:
+            gain_map = moving_average(gain_map, round(sr * release * 0.5 / hop), edge="replicate")
+
+        # Back to audio rate, then broadcast across channels
+        if makeup_gain != 1.0: gain_map = gain_map * makeup_gain
+        gain_map = upsample_blocks(gain_map, hop, target_len)
+        out = music_wav * gain_map.unsqueeze(1)
+
+        return ({"waveform": out, "sample_rate": sr},)
 
 
 class InternodeStemSplitter:
     """
     Splits audio using Demucs. Phase 2 Fix: Added progress logs.
+    Batch items are separated together, and on CPU long tracks can be split
+    into overlapping segments rendered by a pool of worker processes.
     """
     @classmethod
     def INPUT_TYPES(s):
@@ -114,6 +120,12 @@ class InternodeStemSplitter:
                 "audio": ("AUDIO",),
                 "model_name": (["htdemucs", "htdemucs_ft", "hdemucs_mmi", "mdx_extra"], {"default": "htdemucs"}),
                 "device": (["auto", "cuda", "cpu"],),
+            },
+            "optional": {
+                "batch_size": ("INT", {"default": 4, "min": 1, "max": 64, "tooltip": "Batch items separated per Demucs call. Lower this if VRAM runs out."}),
+                "cpu_workers": ("INT", {"default": 1, "min": 0, "max": 256, "tooltip": "CPU only, Linux, and only while CUDA is unused in this ComfyUI session. >1 renders overlapping segments of long tracks in parallel single-threaded processes. 0 = one worker per core."}),
+                "skip_silence": ("BOOLEAN", {"default": False, "tooltip": "Only separate the parts of the track above silence_threshold_db. Silent stretches come out as digital silence."}),
+                "silence_threshold_db": ("FLOAT", {"default": -50.0, "min": -100.0, "max": 0.0, "step": 1.0}),
             }
         }
 
@@ -122,7 +134,46 @@ class InternodeStemSplitter:
     FUNCTION = "split"
     CATEGORY = "Internode/AudioFX"
 
-    def split(self, audio, model_name, device):
+    def _separate_batched(self, model, mix, device, batch_size):
+        # mix: [B, C, N] -> sources [B, S, C, N]
+        out = []
+        for i in range(0, mix.shape[0], batch_size):
+            chunk = mix[i:i + batch_size]
+            print(f"#### Internode: Demucs Splitting tracks {i+1}-{i+chunk.shape[0]}/{mix.shape[0]}...")
+            with torch.no_grad():
+                # apply_model usually has its own progress bar if 'progress=True' is set,
+                # which prints to stdout.
+                out.append(apply_model(model, chunk.to(device), shifts=0, split=True, overlap=0.25, progress=True).cpu())
+        return torch.cat(out)
+
+    def _separate_parallel(self, model, mix, sr, workers):
+        segments = plan_segments(mix.shape[-1], -(-mix.shape[-1] // workers) + DEMUCS_SEGMENT_OVERLAP * sr, DEMUCS_SEGMENT_OVERLAP * sr)
+        print(f"#### Internode: Demucs Splitting {len(segments)} segments on {workers} single-threaded CPU workers...")
+
+        # Forked workers inherit the loaded model instead of unpickling it
+        global _worker_model
+        _worker_model = model
+        try:
+            ctx = multiprocessing.get_context("fork")
+            # One thread per child, as torch's own DataLoader workers do after fork
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=torch.set_num_threads, initargs=(1,)) as pool:
+                chunks = list(pool.map(_demucs_separate_segment, [mix[..., a:b].numpy() for a, b in segments]))
+        finally:
+            _worker_model = None
+
+        return crossfade_stitch([torch.from_numpy(c) for c in chunks], segments, mix.shape[-1])
+
+    def _separate(self, model, mix, sr, device, batch_size, workers):
+        parallel = (
+            device == "cpu" and workers > 1 and fork_is_safe()
+            and mix.shape[-1] > 2 * DEMUCS_MIN_SEGMENT * sr
+        )
+        if parallel:
+            workers = min(workers, int(mix.shape[-1] // (DEMUCS_MIN_SEGMENT * sr)))
+            return self._separate_parallel(model, mix, sr, workers)
+        return self._separate_batched(model, mix, device, batch_size)
+
+    def split(self, audio, model_name, device, batch_size=4, cpu_workers=1, skip_silence=False, silence_threshold_db=-50.0):
         if not DEMUCS_AVAILABLE:
             blank = {"waveform": torch.zeros_like(audio["waveform"]), "sample_rate": audio["sample_rate"]}
             return (blank, blank, blank, blank)
@@ -141,37 +192,45 @@ class InternodeStemSplitter:
             print(f"#### Internode Error: Could not load Demucs model: {e}")
             return (audio, audio, audio, audio)
 
-        batch_drums = []
-        batch_bass = []
-        batch_vocal = []
-        batch_other = []
-
-        # Process Batch
-        for i in range(waveform.shape[0]):
-            print(f"#### Internode: Demucs Splitting track {i+1}/{waveform.shape[0]}...")
-            wav = waveform[i]
-            
-            # Normalize input
-            ref = wav.mean(0)
-            wav = (wav - ref.mean()) / (ref.std() + 1e-8)
-            
-            with torch.no_grad():
-                # apply_model usually has its own progress bar if 'progress=True' is set,
-                # which prints to stdout.
-                sources = apply_model(model, wav.unsqueeze(0).to(device), shifts=0, split=True, overlap=0.25, progress=True)[0]
-
-            src_map = {}
-            for idx, name in enumerate(model.sources):
-                src_map[name] = sources[idx].cpu()
-
-            batch_drums.append(src_map.get("drums", torch.zeros_like(wav.cpu())))
-            batch_bass.append(src_map.get("bass", torch.zeros_like(wav.cpu())))
-            batch_vocal.append(src_map.get("vocals", torch.zeros_like(wav.cpu())))
-            batch_other.append(src_map.get("other", torch.zeros_like(wav.cpu())))
-
-        return (
-            {"waveform": torch.stack(batch_drums), "sample_rate": sr},
-            {"waveform": torch.stack(batch_bass), "sample_rate": sr},
-            {"waveform": torch.stack(batch_vocal), "sample_rate": sr},
-            {"waveform": torch.stack(batch_other), "sample_rate": sr},
-        )
\ No newline at end of file
+        # Normalize input (per batch item)
+        ref = waveform.cpu().mean(1)
+        ref_mean = ref.mean(-1).view(-1, 1, 1)
+        ref_std = ref.std(-1).view(-1, 1, 1) + 1e-8
+        mix = (waveform.cpu() - ref_mean) / ref_std
+
+        workers = cpu_workers if cpu_workers > 0 else (os.cpu_count() or 1)
+        if device == "cpu" and workers > 1 and not fork_is_safe():
+            reason = "CUDA is already initialized in this process" if FORK_AVAILABLE else "it needs fork()"
+            print(f"#### Internode: Parallel Demucs is off because {reason}; falling back to a single process.")
+
+        if skip_silence:
+            regions = detect_active_regions(waveform, sr, silence_threshold_db)
+            active = sum(b - a for a, b in regions)
+            print(f"#### Internode: Demucs skipping silence, {active / max(1, mix.shape[-1]):.0%} of the track is active.")
+            sources = torch.zeros((mix.shape[0], len(model.sources)) + tuple(mix.shape[1:]))
+            for a, b in regions:
+                # Undo the input normalization: [B, S, C, N]
+                sources[..., a:b] = self._separate(model, mix[..., a:b], sr, device, batch_size, workers) * ref_std.unsqueeze(1) + ref_mean.unsqueeze(1)
+        else:
+            sources = self._separate(model, mix, sr, device, batch_size, workers)
+            # Undo the input normalization: [B, S, C, N]
+            sources = sources * ref_std.unsqueeze(1) + ref_mean.unsqueeze(1)
+
+        outputs = []
+        for name in ("drums", "bass", "vocals", "other"):
+            if name in model.sources:
+                stem = sources[:, model.sources.index(name)]
+            else:
+                stem = torch.zeros_like(waveform.cpu())
+            outputs.append({"waveform": stem, "sample_rate": sr})
+
+        return tuple(outputs)
+
+
+# --- Worker-process entry point (must live at module level to be picklable) ---
+_worker_model = None
+
+def _demucs_separate_segment(segment):
+    with torch.no_grad():
+        out = apply_model(_worker_model, torch.from_numpy(segment), shifts=0, split=True, overlap=0.25, progress=False)
+    return out.numpy()
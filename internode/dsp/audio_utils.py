@@ -0,0 +1,141 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/dsp/audio_utils.py
+# VERSION: 3.6.0
+#
+# Shared tensor helpers for the DSP nodes. No ComfyUI imports here so the
+# functions can be reused from any category.
+
+import torch
+
+
+def curve_to_audio_rate(curve, num_samples, sample_rate=44100, fps=0.0, device=None):
+    """
+    Upsamples a per-frame FLOAT_LIST curve to one value per audio sample.
+    fps <= 0 stretches the curve over the whole buffer, otherwise frame k lands
+    at k / fps seconds and the last value is held until the end.
+    """
+    values = torch.as_tensor(curve, dtype=torch.float32, device=device).reshape(-1)
+    if values.numel() == 0:
+        raise ValueError("Automation curve is empty.")
+    if values.numel() == 1 or num_samples <= 1:
+        return values[:1].expand(num_samples).clone()
+
+    span = num_samples
+    if fps > 0:
+        span = min(num_samples, int(round((values.numel() - 1) * sample_rate / fps)) + 1)
+        span = max(span, 2)
+
+    # Linear interpolation in one kernel call (align_corners pins both endpoints)
+    out = torch.nn.functional.interpolate(
+        values.view(1, 1, -1), size=span, mode="linear", align_corners=True
+    ).view(-1)
+
+    if span < num_samples:
+        out = torch.nn.functional.pad(out.view(1, 1, -1), (0, num_samples - span), mode="replicate").view(-1)
+    return out
+
+
+def pan_gains(pan):
+    """Linear balance law used by the mixer. Works on floats or tensors."""
+    if torch.is_tensor(pan):
+        return 1.0 - pan.clamp(min=0), 1.0 + pan.clamp(max=0)
+    return 1.0 - max(0, pan), 1.0 + min(0, pan)
+
+
+def moving_average(x, kernel_size, edge="zeros"):
+    """
+    Centered box filter along the last axis of a [B, N] tensor in O(N) via a
+    cumulative sum, independent of kernel_size. edge="zeros" matches
+    avg_pool1d(count_include_pad=True); edge="replicate" holds the end values.
+    """
+    k = int(kernel_size)
+    if k <= 1: return x
+    if k % 2 == 0: k += 1
+    half = k // 2
+    mode = "constant" if edge == "zeros" else "replicate"
+    padded = torch.nn.functional.pad(x.unsqueeze(1), (half, half), mode=mode).squeeze(1)
+    # float64 keeps the running sum exact enough for hour-long control signals
+    cs = torch.nn.functional.pad(torch.cumsum(padded.double(), dim=-1), (1, 0))
+    return ((cs[..., k:] - cs[..., :-k]) / k).to(x.dtype)
+
+
+def upsample_blocks(values, hop, length):
+    """
+    Expands a [B, M] control-rate signal (one value per `hop` samples) back to
+    [B, length] by ramping linearly from each block value to the next.
+    Cheaper than interpolate() because it is a single broadcast multiply-add.
+    """
+    nxt = torch.cat([values[:, 1:], values[:, -1:]], dim=1)
+    ramp = torch.arange(hop, device=values.device, dtype=values.dtype) / hop
+    out = torch.addcmul(values.unsqueeze(-1), (nxt - values).unsqueeze(-1), ramp)
+    return out.reshape(values.shape[0], -1)[:, :length]
+
+
+def plan_segments(length, segment_len, overlap):
+    """
+    Splits [0, length) into (start, end) windows of about segment_len samples
+    where each window overlaps the previous one by `overlap` samples.
+    """
+    segment_len = max(int(segment_len), overlap + 1)
+    if length <= segment_len: return [(0, length)]
+    step = segment_len - overlap
+    count = -(-(length - overlap) // step)
+    return [(i * step, min(i * step + segment_len, length)) for i in range(count)]
+
+
+def crossfade_stitch(chunks, segments, length):
+    """
+    Reassembles per-segment results (tensors shaped [..., end - start]) into one
+    [..., length] tensor, blending each overlap with linear ramps. The sum is
+    divided by the summed ramp weights, so samples covered by three or more
+    segments (overlap above half a segment) are still weighted to exactly 1.
+    """
+    out = torch.zeros(chunks[0].shape[:-1] + (length,), dtype=chunks[0].dtype, device=chunks[0].device)
+    norm = torch.zeros(length, dtype=chunks[0].dtype, device=chunks[0].device)
+    for i, (chunk, (start, end)) in enumerate(zip(chunks, segments)):
+        weight = torch.ones(end - start, dtype=chunk.dtype, device=chunk.device)
+        if i > 0:
+            ov = segments[i - 1][1] - start
+            if ov > 0: weight[:ov] = (torch.arange(ov, dtype=chunk.dtype, device=chunk.device) + 0.5) / ov
+        if i < len(segments) - 1:
+            ov = end - segments[i + 1][0]
+            if ov > 0: weight[-ov:] = 1.0 - (torch.arange(ov, dtype=chunk.dtype, device=chunk.device) + 0.5) / ov
+        out[..., start:end] += chunk[..., :end - start] * weight
+        norm[start:end] += weight
+    return torch.where(norm > 0, out / norm.clamp(min=1e-12), out)
+
+
+def detect_active_regions(waveform, sample_rate, threshold_db=-50.0, block_ms=20.0, pad_ms=250.0):
+    """
+    Finds the non-silent parts of a [..., N] waveform (all leading dims are
+    pooled). Block RMS is compared against threshold_db, then every active
+    block is widened by pad_ms on both sides, which also merges short gaps.
+    Returns a sorted list of (start, end) sample ranges.
+    """
+    n = waveform.shape[-1]
+    if n == 0: return []
+    hop = max(1, int(sample_rate * block_ms / 1000.0))
+    n_blocks = -(-n // hop)
+
+    power = waveform.reshape(-1, n).float().pow(2).mean(dim=0)
+    power = torch.nn.functional.pad(power, (0, n_blocks * hop - n))
+    rms = power.view(n_blocks, hop).mean(dim=-1).sqrt()
+    active = (rms > 10.0 ** (threshold_db / 20.0)).float()
+
+    pad_blocks = int(-(-pad_ms // block_ms))
+    if pad_blocks > 0:
+        active = torch.nn.functional.max_pool1d(
+            active.view(1, 1, -1), kernel_size=2 * pad_blocks + 1, stride=1, padding=pad_blocks
+        ).view(-1)
+
+    edges = torch.diff(torch.nn.functional.pad(active, (1, 1)))
+    starts = torch.nonzero(edges > 0).view(-1).tolist()
+    ends = torch.nonzero(edges < 0).view(-1).tolist()
+    return [(s * hop, min(e * hop, n)) for s, e in zip(starts, ends)]
+
+
+def regions_to_mask(regions, length, device=None):
+    """Boolean [length] mask that is True inside the given (start, end) ranges."""
+    mask = torch.zeros(length, dtype=torch.bool, device=device)
+    for start, end in regions:
+        mask[start:end] = True
+    return mask
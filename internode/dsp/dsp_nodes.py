@@ -11,6 +11,8 @@ from PIL import Image, ImageOps
 import shutil
 import sys
 
+from .audio_utils import curve_to_audio_rate, pan_gains
+
 # --- Optional Dependency Imports ---
 
 SCIPY_AVAILABLE = False
@@ -391,6 +393,7 @@ class InternodeAudioMixer:
     def INPUT_TYPES(s):
         inputs = { "required": { "master_vol": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.01}), "master_gate": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_comp": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_eq_high": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_eq_mid": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_eq_low": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_balance": ("FLOAT", {"default": 0.0, "min": -1.0, "max": 1.0, "step": 0.01}), "master_width": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.01}), "master_drive": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_locut": ("FLOAT", {"default": 20.0, "min": 20.0, "max": 200.0, "step": 1.0}), "master_hicut": ("FLOAT", {"default": 20000.0, "min": 8000.0, "max": 20000.0, "step": 100.0}), "master_ceil": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 1.0, "step": 0.01}) }, "optional": {} }
         for i in range(1, 5): s._add_channel_inputs(inputs, i)
+        s._add_master_automation(inputs)
         return inputs
     
     @classmethod
@@ -409,6 +412,14 @@ class InternodeAudioMixer:
         inputs["required"][f"mute_{i}"] = ("BOOLEAN", {"default": False})
         inputs["required"][f"solo_{i}"] = ("BOOLEAN", {"default": False})
         inputs["optional"][f"track_{i}"] = ("AUDIO",)
+        inputs["optional"][f"vol_curve_{i}"] = ("FLOAT_LIST", {"tooltip": "Per-frame volume automation. Overrides vol_%d." % i})
+        inputs["optional"][f"pan_curve_{i}"] = ("FLOAT_LIST", {"tooltip": "Per-frame pan automation (-1..1). Overrides pan_%d." % i})
+
+    @classmethod
+    def _add_master_automation(cls, inputs):
+        inputs["optional"]["master_vol_curve"] = ("FLOAT_LIST", {"tooltip": "Per-frame master volume automation. Overrides master_vol."})
+        inputs["optional"]["master_balance_curve"] = ("FLOAT_LIST", {"tooltip": "Per-frame master balance automation. Overrides master_balance."})
+        inputs["optional"]["automation_fps"] = ("FLOAT", {"default": 0.0, "min": 0.0, "max": 240.0, "step": 1.0, "tooltip": "Frame rate of the automation curves. 0 = stretch each curve over the full mix."})
 
     RETURN_TYPES = ("AUDIO",)
     FUNCTION = "mix_tracks"
@@ -425,8 +436,14 @@ class InternodeAudioMixer:
                 'dyn': (kwargs.get(f"gate_{i}", 0.0), kwargs.get(f"comp_{i}", 0.0)),
                 'delay': (kwargs.get(f"d_time_{i}", 0.35), kwargs.get(f"d_fb_{i}", 0.4), kwargs.get(f"d_mix_{i}", 0.0), kwargs.get(f"d_echo_{i}", 4)),
                 'mute': kwargs.get(f"mute_{i}", False), 'solo': kwargs.get(f"solo_{i}", False),
+                'vol_curve': kwargs.get(f"vol_curve_{i}"), 'pan_curve': kwargs.get(f"pan_curve_{i}"),
             })
-        return self._process_mix(tracks, master_vol, master_gate, master_comp, (master_eq_low, master_eq_mid, master_eq_high), master_balance, master_width, (master_drive, master_locut, master_hicut, master_ceil))
+        automation = {
+            'master_vol': kwargs.get("master_vol_curve"),
+            'master_balance': kwargs.get("master_balance_curve"),
+            'fps': kwargs.get("automation_fps", 0.0),
+        }
+        return self._process_mix(tracks, master_vol, master_gate, master_comp, (master_eq_low, master_eq_mid, master_eq_high), master_balance, master_width, (master_drive, master_locut, master_hicut, master_ceil), automation)
 
     def _apply_eq(self, w, sr, l, m, h):
         if l == 1.0 and m == 1.0 and h == 1.0: return w
@@ -518,7 +535,15 @@ class InternodeAudioMixer:
         if ceil < 1.0: w = torch.clamp(w, -ceil, ceil)
         return w
 
-    def _process_mix(self, tracks, master_vol, master_gate, master_comp, eq_cfg, balance, width, color_cfg):
+    def _automate(self, curve, value, length, sr, fps, dev):
+        # Scalars stay scalars so un-automated channels cost nothing extra
+        # Curves arrive as lists, numpy arrays or tensors: test the length, not the truth value
+        if curve is None or len(curve) == 0: return value
+        return curve_to_audio_rate(curve, length, sr, fps, dev)
+
+    def _process_mix(self, tracks, master_vol, master_gate, master_comp, eq_cfg, balance, width, color_cfg, automation=None):
+        automation = automation or {}
+        fps = automation.get('fps') or 0.0
         max_len, sr, dev = 0, 44100, None
         active = []
         any_solo = any(t['solo'] for t in tracks)
@@ -540,16 +565,23 @@ class InternodeAudioMixer:
             w = self._apply_delay(w, sr, t['delay'][0], t['delay'][1], t['delay'][2], t['delay'][3])
             if w.shape[1] == 1: w = w.repeat(1, 2, 1)
             final_len = max(final_len, w.shape[-1])
-            processed_tracks.append((w, t['vol'], t['pan']))
+            processed_tracks.append((w, t))
             
         mix_buf = torch.zeros((1, 2, final_len), device=dev)
-        for w, vol, pan in processed_tracks:
+        for w, t in processed_tracks:
             curr = w.shape[-1]
             if curr < final_len: w = torch.nn.functional.pad(w, (0, final_len - curr))
-            lg = 1.0 - max(0, pan)
-            rg = 1.0 + min(0, pan)
-            mix_buf[:, 0, :] += w[:, 0, :] * vol * lg
-            mix_buf[:, 1, :] += w[:, 1, :] * vol * rg
+            vol = self._automate(t['vol_curve'], t['vol'], final_len, sr, fps, dev)
+            pan = self._automate(t['pan_curve'], t['pan'], final_len, sr, fps, dev)
+            lg, rg = pan_gains(pan)
+            if torch.is_tensor(vol) or torch.is_tensor(pan):
+                # [2, L] gain lanes, applied in a single fused multiply-add
+                gains = torch.stack(torch.broadcast_tensors(torch.as_tensor(lg * vol, device=dev), torch.as_tensor(rg * vol, device=dev)))
+                if gains.dim() == 1: gains = gains.unsqueeze(-1)
+                mix_buf.addcmul_(w[:, :2, :], gains)
+            else:
+                mix_buf[:, 0, :] += w[:, 0, :] * vol * lg
+                mix_buf[:, 1, :] += w[:, 1, :] * vol * rg
             
         mix_buf = self._apply_master_color(mix_buf, sr, color_cfg[0], color_cfg[1], color_cfg[2], color_cfg[3])
         mix_buf = self._apply_dynamics(mix_buf, master_gate, master_comp)
@@ -560,8 +592,9 @@ class InternodeAudioMixer:
             side *= width
             mix_buf[:, 0, :] = mid + side
             mix_buf[:, 1, :] = mid - side
-        bal_lg = 1.0 - max(0, balance)
-        bal_rg = 1.0 + min(0, balance)
+        balance = self._automate(automation.get('master_balance'), balance, final_len, sr, fps, dev)
+        master_vol = self._automate(automation.get('master_vol'), master_vol, final_len, sr, fps, dev)
+        bal_lg, bal_rg = pan_gains(balance)
         mix_buf[:, 0, :] *= bal_lg
         mix_buf[:, 1, :] *= bal_rg
         mix_buf = torch.clamp(mix_buf * master_vol, -1.0, 1.0)
@@ -572,4 +605,5 @@ class InternodeAudioMixer8(InternodeAudioMixer):
     def INPUT_TYPES(s):
         inputs = { "required": { "master_vol": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.01}), "master_gate": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_comp": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_eq_high": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_eq_mid": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_eq_low": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0, "step": 0.1}), "master_balance": ("FLOAT", {"default": 0.0, "min": -1.0, "max": 1.0, "step": 0.01}), "master_width": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0, "step": 0.01}), "master_drive": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.01}), "master_locut": ("FLOAT", {"default": 20.0, "min": 20.0, "max": 200.0, "step": 1.0}), "master_hicut": ("FLOAT", {"default": 20000.0, "min": 8000.0, "max": 20000.0, "step": 100.0}), "master_ceil": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 1.0, "step": 0.01}) }, "optional": {} }
         for i in range(1, 9): s._add_channel_inputs(inputs, i)
+        s._add_master_automation(inputs)
         return inputs
\ No newline at end of file
@@ -5,6 +5,9 @@ import torch
 import numpy as np
 import random
 
+from ..dsp.audio_utils import detect_active_regions, regions_to_mask
+from ..vst.midi_events import events_from_midi, NOTE_ON, NOTE_OFF
+
 # Note: In a real deployment, we would import heavy libs like 'audiocraft' or 'diffusers' here.
 # For this implementation, we assume the user has standard ComfyUI audio dependencies 
 # or we provide lightweight implementations where possible.
@@ -114,6 +117,10 @@ class InternodeAudioStyleTransferDSP:
                 "target_audio": ("AUDIO",),
                 "reference_audio": ("AUDIO",),
                 "amount": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 1.0}),
+            },
+            "optional": {
+                "skip_silence": ("BOOLEAN", {"default": False, "tooltip": "Measure and process only the non-silent parts. Silent stretches of the target are zero-filled."}),
+                "silence_threshold_db": ("FLOAT", {"default": -60.0, "min": -120.0, "max": 0.0, "step": 1.0}),
             }
         }
 
@@ -121,7 +128,7 @@ class InternodeAudioStyleTransferDSP:
     FUNCTION = "transfer"
     CATEGORY = "Internode/Generative Audio"
 
-    def transfer(self, target_audio, reference_audio, amount):
+    def transfer(self, target_audio, reference_audio, amount, skip_silence=False, silence_threshold_db=-60.0):
         # 1. Calculate spectrum of Reference
         # 2. Apply EQ curve to Target to match Reference
         
@@ -132,13 +139,183 @@ class InternodeAudioStyleTransferDSP:
         tgt_wav = target_audio["waveform"]
         ref_wav = reference_audio["waveform"]
         
-        tgt_rms = torch.sqrt(torch.mean(tgt_wav**2))
-        ref_rms = torch.sqrt(torch.mean(ref_wav**2))
+        if skip_silence:
+            # Silence would drag both RMS readings down, so only measure active audio
+            tgt_mask = regions_to_mask(detect_active_regions(tgt_wav, target_audio["sample_rate"], silence_threshold_db), tgt_wav.shape[-1], tgt_wav.device)
+            ref_mask = regions_to_mask(detect_active_regions(ref_wav, reference_audio["sample_rate"], silence_threshold_db), ref_wav.shape[-1], ref_wav.device)
+            tgt_active = tgt_wav[..., tgt_mask]
+            ref_active = ref_wav[..., ref_mask]
+            tgt_rms = torch.sqrt(torch.mean(tgt_active**2)) if tgt_active.numel() else torch.tensor(0.0)
+            ref_rms = torch.sqrt(torch.mean(ref_active**2)) if ref_active.numel() else torch.tensor(0.0)
+        else:
+            tgt_rms = torch.sqrt(torch.mean(tgt_wav**2))
+            ref_rms = torch.sqrt(torch.mean(ref_wav**2))
         
         # Gain Match
-        matched = tgt_wav * (ref_rms / (tgt_tgt_rms + 1e-6))
+        matched = tgt_wav * (ref_rms / (tgt_rms + 1e-6))
         
         # Blend
         result = (matched * amount) + (tgt_wav * (1.0 - amount))
+        if skip_silence:
+            result = result * tgt_mask
         
-        return ({"waveform": result, "sample_rate": target_audio["sample_rate"]},)
\ No newline at end of file
+        return ({"waveform": result, "sample_rate": target_audio["sample_rate"]},)
+
+
+# --- WAVETABLE SYNTH ---
+WAVETABLE_SIZE = 2048
+WAVETABLE_HARMONICS = 48
+# One band-limited table per MIDI octave (pitch // 12), mip-map style
+WAVETABLE_OCTAVES = 11
+# Voice samples rendered per scatter pass; bounds memory for long or dense files
+SYNTH_CHUNK_SAMPLES = 1 << 22
+
+def build_wavetable(shape, size=WAVETABLE_SIZE, harmonics=WAVETABLE_HARMONICS):
+    """One cycle of a band-limited waveform as a [size + 1] tensor (last sample wraps for interpolation)."""
+    phase = torch.arange(size + 1, dtype=torch.float64) / size * 2 * np.pi
+    k = torch.arange(1, harmonics + 1, dtype=torch.float64)
+    if shape == "Sine":
+        table = torch.sin(phase)
+    else:
+        if shape == "Saw":
+            amps = 1.0 / k
+        elif shape == "Square":
+            amps = torch.where(k % 2 == 1, 1.0 / k, torch.zeros_like(k))
+        else: # Triangle
+            amps = torch.where(k % 2 == 1, ((-1.0) ** ((k - 1) / 2)) / k**2, torch.zeros_like(k))
+        # All harmonics summed at once: [harmonics, size + 1] -> [size + 1]
+        table = (amps[:, None] * torch.sin(k[:, None] * phase[None, :])).sum(dim=0)
+    return (table / table.abs().max()).float()
+
+def octave_harmonics(sr, max_harmonics=WAVETABLE_HARMONICS):
+    """Harmonic count per MIDI octave so the octave's highest note stays below Nyquist."""
+    top = 440.0 * 2.0 ** ((np.arange(WAVETABLE_OCTAVES) * 12 + 11 - 69) / 12.0)
+    return np.clip(np.floor(sr / 2.0 / top), 1, max_harmonics).astype(np.int64)
+
+def build_wavetables(shape, sr, size=WAVETABLE_SIZE):
+    """[WAVETABLE_OCTAVES, size + 1] band-limited tables; row o plays the notes of MIDI octave o."""
+    return torch.stack([build_wavetable(shape, size, int(h)) for h in octave_harmonics(sr)])
+
+def midi_notes(events, end_of_song):
+    """
+    Pairs note-ons with the next note-on/off of the same channel and pitch.
+    At equal ticks a note-off ends the sounding note before a new note-on
+    starts, unless nothing is sounding yet, in which case it closes the
+    note-on of that same tick (a zero-length hit).
+    Returns (start_seconds, duration_seconds, pitch, velocity) arrays.
+    """
+    ev = events[(events["type"] == NOTE_ON) | (events["type"] == NOTE_OFF)]
+    key = ev["channel"].astype(np.int64) * 128 + ev["note"]
+    is_on = ev["type"] == NOTE_ON
+    # Group by key, then tick; offs before ons at the same tick
+    rank = is_on.astype(np.int64)
+    order = np.lexsort((rank, ev["tick"], key))
+    # An off with no note to end (first of its key, or after another off at an
+    # earlier tick) belongs to an on at its own tick, so it moves after the ons
+    prev = order[:-1]
+    cur = order[1:]
+    orphan = np.zeros(len(ev), dtype=bool)
+    if len(order):
+        orphan[order[0]] = not is_on[order[0]]
+    orphan[cur] = ~is_on[cur] & ((key[prev] != key[cur]) | (~is_on[prev] & (ev["tick"][prev] < ev["tick"][cur])))
+    rank[orphan] = 2
+    order = np.lexsort((rank, ev["tick"], key))
+
+    ev, key = ev[order], key[order]
+    on_idx = np.flatnonzero(ev["type"] == NOTE_ON)
+    nxt = on_idx + 1
+    has_end = nxt < len(ev)
+    has_end[has_end] = key[nxt[has_end]] == key[on_idx[has_end]]
+    ends = np.full(len(on_idx), end_of_song)
+    ends[has_end] = ev["seconds"][nxt[has_end]]
+    starts = ev["seconds"][on_idx]
+    return starts, np.maximum(ends - starts, 0.0), ev["note"][on_idx].astype(np.int64), ev["velocity"][on_idx].astype(np.float64)
+
+class InternodeWavetableSynth:
+    """
+    Renders MIDI without a VST. Every note becomes one voice; all voices are
+    synthesized together as flat tensors (wavetable lookup + ADSR) and
+    scatter-added into the output with index_add_.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "waveform": (["Saw", "Square", "Triangle", "Sine"],),
+                "sample_rate": (["44100", "48000"],),
+                "attack": ("FLOAT", {"default": 0.01, "min": 0.0, "max": 10.0, "step": 0.001}),
+                "decay": ("FLOAT", {"default": 0.2, "min": 0.0, "max": 10.0, "step": 0.01}),
+                "sustain": ("FLOAT", {"default": 0.7, "min": 0.0, "max": 1.0, "step": 0.01}),
+                "release": ("FLOAT", {"default": 0.3, "min": 0.0, "max": 10.0, "step": 0.01}),
+                "gain": ("FLOAT", {"default": 0.25, "min": 0.0, "max": 2.0, "step": 0.01}),
+            },
+            "optional": {
+                "midi_data": ("MIDI_DATA",),
+                "midi_events": ("MIDI_EVENTS",),
+            }
+        }
+
+    RETURN_TYPES = ("AUDIO",)
+    FUNCTION = "render"
+    CATEGORY = "Internode/Generative Audio"
+
+    def _envelope(self, t, dur, attack, decay, sustain, release):
+        """ADSR level at time t (seconds into the voice) for notes held for dur seconds."""
+        def held(x):
+            a = x / attack if attack > 0 else torch.ones_like(x)
+            d = 1.0 - (1.0 - sustain) * (x - attack) / decay if decay > 0 else torch.full_like(x, sustain)
+            return torch.where(x < attack, a, torch.where(x < attack + decay, d, torch.full_like(x, sustain)))
+        level = held(torch.minimum(t, dur))
+        if release > 0:
+            level = level * (1.0 - (t - dur) / release).clamp(0.0, 1.0)
+        else:
+            level = level * (t < dur)
+        return level
+
+    def render(self, waveform, sample_rate, attack, decay, sustain, release, gain, midi_data=None, midi_events=None):
+        if midi_events is None:
+            if midi_data is None: raise ValueError("Connect midi_data or midi_events.")
+            midi_events = events_from_midi(midi_data)
+
+        sr = int(sample_rate)
+        starts, durs, pitch, vel = midi_notes(midi_events["events"], midi_events["length"])
+        total = int(np.ceil((midi_events["length"] + release) * sr)) + 1
+        out = torch.zeros(total, dtype=torch.float32)
+        if len(starts) == 0:
+            return ({"waveform": out.view(1, 1, -1).repeat(1, 2, 1), "sample_rate": sr},)
+
+        # Flattened mip-map; each voice reads the table of its own octave
+        table = build_wavetables(waveform, sr).flatten()
+        table_base = torch.from_numpy((pitch // 12).clip(0, WAVETABLE_OCTAVES - 1) * (WAVETABLE_SIZE + 1))
+        start_idx = torch.from_numpy(np.round(starts * sr).astype(np.int64))
+        lengths = torch.from_numpy(np.ceil((durs + release) * sr).astype(np.int64)).clamp(min=1)
+        lengths = torch.minimum(lengths, total - start_idx)
+        # Cycles per sample in table units
+        step = torch.from_numpy(440.0 * 2.0 ** ((pitch - 69) / 12.0) / sr * WAVETABLE_SIZE)
+        amp = torch.from_numpy(vel / 127.0 * gain).float()
+        dur_t = torch.from_numpy(durs).float()
+
+        # Voices are rendered in chunks of whole notes so the flat buffers stay bounded
+        cum = np.cumsum(lengths.numpy())
+        lo = 0
+        while lo < len(starts):
+            done = cum[lo - 1] if lo else 0
+            hi = max(lo + 1, int(np.searchsorted(cum, done + SYNTH_CHUNK_SAMPLES, side="right")))
+            v_len = lengths[lo:hi]
+            voice = torch.repeat_interleave(torch.arange(lo, hi), v_len)
+            # Sample index within each voice: global arange minus each voice's first flat index
+            first = torch.repeat_interleave(torch.cumsum(v_len, 0) - v_len, v_len)
+            t = torch.arange(voice.numel()) - first
+
+            phase = torch.remainder(t.double() * step[voice], WAVETABLE_SIZE)
+            i0 = phase.long()
+            frac = (phase - i0).float()
+            i0 = i0 + table_base[voice]
+            osc = torch.lerp(table[i0], table[i0 + 1], frac)
+
+            env = self._envelope(t.float() / sr, dur_t[voice], attack, decay, sustain, release)
+            out.index_add_(0, start_idx[voice] + t, osc * env * amp[voice])
+            lo = hi
+
+        return ({"waveform": out.view(1, 1, -1).repeat(1, 2, 1), "sample_rate": sr},)
+
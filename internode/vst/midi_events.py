@@ -0,0 +1,218 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/midi_events.py
+# VERSION: 3.6.0
+#
+# MIDI_EVENTS: a compact, array-backed view of a MIDI file. Every channel
+# message becomes one row of a numpy structured array with its absolute tick
+# and tempo-mapped time in seconds, so consumers can filter, bin and render
+# with vectorized numpy instead of iterating mido message objects.
+#
+# MIDI_EVENTS = {
+#     "events": structured array (EVENT_DTYPE), sorted by time,
+#     "ticks_per_beat": int,
+#     "tempos": structured array (TEMPO_DTYPE), the merged tempo map,
+#     "length": float seconds (end of the last event),
+# }
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MIDO_AVAILABLE = False
+try:
+    import mido
+    MIDO_AVAILABLE = True
+except ImportError:
+    pass
+
+NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PROGRAM_CHANGE, PITCHWHEEL, AFTERTOUCH, POLYTOUCH = range(1, 8)
+EVENT_TYPES = {
+    "note_on": NOTE_ON, "note_off": NOTE_OFF, "control_change": CONTROL_CHANGE,
+    "program_change": PROGRAM_CHANGE, "pitchwheel": PITCHWHEEL,
+    "aftertouch": AFTERTOUCH, "polytouch": POLYTOUCH,
+}
+
+# `value` holds the CC value, program, pitch bend (-8192..8191) or pressure
+EVENT_DTYPE = np.dtype([
+    ("tick", np.int64), ("seconds", np.float64), ("type", np.uint8), ("channel", np.uint8),
+    ("note", np.uint8), ("velocity", np.uint8), ("cc", np.uint8), ("value", np.int32), ("track", np.uint16),
+])
+TEMPO_DTYPE = np.dtype([("tick", np.int64), ("seconds", np.float64), ("tempo", np.int64)])
+DEFAULT_TEMPO = 500000
+
+# Status byte (before the channel is or-ed in) and message size per event type
+STATUS_BYTES = np.array([0, 0x90, 0x80, 0xB0, 0xC0, 0xE0, 0xD0, 0xA0], dtype=np.uint8)
+MESSAGE_SIZES = np.array([0, 3, 3, 3, 2, 3, 2, 3], dtype=np.int64)
+
+MAX_CACHED_FILES = 16
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _row(msg):
+    kind = EVENT_TYPES.get(msg.type)
+    if kind is None: return None
+    note = getattr(msg, "note", 0)
+    velocity = getattr(msg, "velocity", 0)
+    if kind == NOTE_ON and velocity == 0:
+        kind = NOTE_OFF
+    if kind == CONTROL_CHANGE:
+        return (kind, msg.channel, 0, 0, msg.control, msg.value)
+    if kind == PROGRAM_CHANGE:
+        return (kind, msg.channel, 0, 0, 0, msg.program)
+    if kind == PITCHWHEEL:
+        return (kind, msg.channel, 0, 0, 0, msg.pitch)
+    if kind == AFTERTOUCH:
+        return (kind, msg.channel, 0, 0, 0, msg.value)
+    if kind == POLYTOUCH:
+        return (kind, msg.channel, note, 0, 0, msg.value)
+    return (kind, msg.channel, note, velocity, 0, 0)
+
+
+def tempo_map(tempo_ticks, tempo_values, ticks_per_beat):
+    """Builds the TEMPO_DTYPE map (with the seconds of each change) from raw set_tempo events."""
+    order = np.argsort(tempo_ticks, kind="stable")
+    ticks = np.concatenate([[0], np.asarray(tempo_ticks, dtype=np.int64)[order]])
+    tempos = np.concatenate([[DEFAULT_TEMPO], np.asarray(tempo_values, dtype=np.int64)[order]])
+    # Later changes at the same tick win
+    keep = np.append(ticks[1:] != ticks[:-1], True)
+    ticks, tempos = ticks[keep], tempos[keep]
+    seconds = np.concatenate([[0.0], np.cumsum(np.diff(ticks) * tempos[:-1] / (ticks_per_beat * 1e6))])
+    out = np.empty(len(ticks), dtype=TEMPO_DTYPE)
+    out["tick"], out["seconds"], out["tempo"] = ticks, seconds, tempos
+    return out
+
+
+def ticks_to_seconds(ticks, tempos, ticks_per_beat):
+    idx = np.searchsorted(tempos["tick"], ticks, side="right") - 1
+    return tempos["seconds"][idx] + (ticks - tempos["tick"][idx]) * tempos["tempo"][idx] / (ticks_per_beat * 1e6)
+
+
+def events_from_midi(mid):
+    """Converts a mido.MidiFile into MIDI_EVENTS (one pass over the messages)."""
+    rows, ticks, tracks = [], [], []
+    tempo_ticks, tempo_values = [], []
+    for t, track in enumerate(mid.tracks):
+        deltas = np.fromiter((msg.time for msg in track), dtype=np.int64, count=len(track))
+        abs_ticks = np.cumsum(deltas)
+        for msg, tick in zip(track, abs_ticks.tolist()):
+            if msg.type == "set_tempo":
+                tempo_ticks.append(tick)
+                tempo_values.append(msg.tempo)
+                continue
+            row = _row(msg)
+            if row is None: continue
+            rows.append(row)
+            ticks.append(tick)
+            tracks.append(t)
+
+    tpb = mid.ticks_per_beat
+    tempos = tempo_map(tempo_ticks, tempo_values, tpb)
+    events = np.zeros(len(rows), dtype=EVENT_DTYPE)
+    if rows:
+        cols = np.array(rows, dtype=np.int64)
+        events["tick"] = ticks
+        events["type"], events["channel"], events["note"] = cols[:, 0], cols[:, 1], cols[:, 2]
+        events["velocity"], events["cc"], events["value"] = cols[:, 3], cols[:, 4], cols[:, 5]
+        events["track"] = tracks
+        events["seconds"] = ticks_to_seconds(events["tick"], tempos, tpb)
+        # Stable sort keeps per-track order for simultaneous events
+        events = events[np.argsort(events["tick"], kind="stable")]
+    events.flags.writeable = False
+    return {
+        "events": events,
+        "ticks_per_beat": tpb,
+        "tempos": tempos,
+        "length": float(events["seconds"][-1]) if len(events) else 0.0,
+    }
+
+
+def midi_messages(midi_events):
+    """
+    (times_seconds, [raw_bytes, ...]) sorted by time, as the render loops
+    take them, built from the packed columns instead of mido objects.
+    Matches vst_render.midi_to_events() on the source file, except that a
+    note_on with velocity 0 comes back as the equivalent note_off.
+    """
+    ev = midi_events["events"]
+    kind = ev["type"]
+    value = ev["value"].astype(np.int64)
+    bend = value + 8192
+    is_note = (kind == NOTE_ON) | (kind == NOTE_OFF)
+    packed = np.empty((len(ev), 3), dtype=np.uint8)
+    packed[:, 0] = STATUS_BYTES[kind] | ev["channel"]
+    packed[:, 1] = np.select(
+        [is_note | (kind == POLYTOUCH), kind == CONTROL_CHANGE, kind == PITCHWHEEL],
+        [ev["note"], ev["cc"], bend & 0x7F], value & 0x7F,
+    )
+    packed[:, 2] = np.select(
+        [is_note, kind == PITCHWHEEL],
+        [ev["velocity"], (bend >> 7) & 0x7F], value & 0x7F,
+    )
+    blob = packed.tobytes()
+    payloads = [blob[i:i + n] for i, n in zip(range(0, len(blob), 3), MESSAGE_SIZES[kind].tolist())]
+    return np.asarray(ev["seconds"], dtype=np.float64), payloads
+
+
+def load_midi_events(path):
+    """
+    Parses a .mid file into (mido.MidiFile, MIDI_EVENTS), cached per
+    (path, mtime) so unchanged files are never parsed twice. Treat both
+    results as read-only; they are shared between callers.
+    """
+    if not MIDO_AVAILABLE:
+        raise ImportError("mido not installed. Run install.py")
+    key = (os.path.normpath(path), os.path.getmtime(path))
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+
+    mid = mido.MidiFile(path)
+    entry = (mid, events_from_midi(mid))
+    with _CACHE_LOCK:
+        # Drop older versions of the same file first
+        for old in [k for k in _CACHE if k[0] == key[0]]:
+            del _CACHE[old]
+        _CACHE[key] = entry
+        while len(_CACHE) > MAX_CACHED_FILES:
+            _CACHE.popitem(last=False)
+    return entry
+
+
+def events_to_midi(midi_events):
+    """Rebuilds a single-track mido.MidiFile (tempo map included) from MIDI_EVENTS."""
+    if not MIDO_AVAILABLE:
+        raise ImportError("mido not installed. Run install.py")
+    ev, tempos = midi_events["events"], midi_events["tempos"]
+    mid = mido.MidiFile(ticks_per_beat=midi_events["ticks_per_beat"])
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+
+    # Merge tempo changes and channel events on one tick axis; tempos go first at equal ticks
+    ticks = np.concatenate([tempos["tick"], ev["tick"]])
+    order = np.lexsort((np.r_[np.zeros(len(tempos)), np.ones(len(ev))], ticks))
+    deltas = np.diff(np.concatenate([[0], ticks[order]])).tolist()
+    n_tempo = len(tempos)
+    for i, dt in zip(order.tolist(), deltas):
+        if i < n_tempo:
+            track.append(mido.MetaMessage("set_tempo", tempo=int(tempos["tempo"][i]), time=dt))
+            continue
+        e = ev[i - n_tempo]
+        kind, ch = int(e["type"]), int(e["channel"])
+        if kind == NOTE_ON:
+            msg = mido.Message("note_on", channel=ch, note=int(e["note"]), velocity=int(e["velocity"]), time=dt)
+        elif kind == NOTE_OFF:
+            msg = mido.Message("note_off", channel=ch, note=int(e["note"]), velocity=int(e["velocity"]), time=dt)
+        elif kind == CONTROL_CHANGE:
+            msg = mido.Message("control_change", channel=ch, control=int(e["cc"]), value=int(e["value"]), time=dt)
+        elif kind == PROGRAM_CHANGE:
+            msg = mido.Message("program_change", channel=ch, program=int(e["value"]), time=dt)
+        elif kind == PITCHWHEEL:
+            msg = mido.Message("pitchwheel", channel=ch, pitch=int(e["value"]), time=dt)
+        elif kind == AFTERTOUCH:
+            msg = mido.Message("aftertouch", channel=ch, value=int(e["value"]), time=dt)
+        else:
+            msg = mido.Message("polytouch", channel=ch, note=int(e["note"]), value=int(e["value"]), time=dt)
+        track.append(msg)
+    return mid
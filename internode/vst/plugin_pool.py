@@ -0,0 +1,179 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/plugin_pool.py
+# VERSION: 3.6.0
+#
+# Pool of live plugin instances shared by the VST3 nodes. Loading a heavy
+# instrument takes seconds, so instances are kept warm and handed out one
+# caller at a time. Pure Python (no pedalboard import) so it can be reused
+# by any host process.
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+DEFAULT_POOL_SIZE = int(os.environ.get("INTERNODE_VST_POOL_SIZE", "4"))
+
+
+def bundle_mtime(path):
+    """
+    Newest mtime of a plugin file or anything inside a bundle folder.
+    Replacing the binary under Contents/ seldom touches the folder itself.
+    """
+    newest = os.path.getmtime(path)
+    if os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            for name in dirnames + filenames:
+                try:
+                    newest = max(newest, os.path.getmtime(os.path.join(dirpath, name)))
+                except OSError:
+                    pass
+    return newest
+
+
+class PooledPlugin:
+    """A live plugin instance plus the state it had right after loading."""
+
+    def __init__(self, key, plugin):
+        self.key = key
+        self.plugin = plugin
+        self.lock = threading.Lock()
+        self.default_state = None
+        self.default_params = {}
+        try:
+            self.default_state = plugin.raw_state
+        except Exception:
+            pass
+        try:
+            self.default_params = {name: p.raw_value for name, p in plugin.parameters.items()}
+        except Exception:
+            pass
+
+    def restore(self):
+        """Clears buffers/tails and puts every knob back where loading left it."""
+        try:
+            self.plugin.reset()
+        except Exception:
+            pass
+        if self.default_state is not None:
+            try:
+                self.plugin.raw_state = self.default_state
+                return
+            except Exception:
+                pass
+        for name, value in self.default_params.items():
+            try:
+                self.plugin.parameters[name].raw_value = value
+            except Exception:
+                pass
+
+
+class VSTPluginPool:
+    """
+    Instances are keyed by (path, bundle_mtime, sample_rate): editing or
+    replacing a plugin bundle invalidates its instances, and a plugin prepared
+    for one rate is never handed to a caller rendering at another.
+    """
+
+    def __init__(self, factory, max_instances=DEFAULT_POOL_SIZE):
+        self._factory = factory
+        self.max_instances = max(1, int(max_instances))
+        self._cond = threading.Condition()
+        self._idle = {}
+        self._count = {}
+        # Newest build seen per bundle path
+        self._latest = {}
+        self._stats = {"hits": 0, "instantiations": 0, "failures": 0, "waits": 0, "load_seconds": 0.0}
+
+    def configure(self, max_instances):
+        with self._cond:
+            self.max_instances = max(1, int(max_instances))
+            self._cond.notify_all()
+
+    def _make_key(self, path, sample_rate):
+        path = os.path.normpath(path)
+        return (path, bundle_mtime(path), sample_rate)
+
+    def _drop_stale(self, key):
+        # Called with the condition held. A newer mtime for the same bundle
+        # means idle instances of the old build will never be used again;
+        # checked-out ones are dropped when released.
+        self._latest[key[0]] = key[1]
+        for old in [k for k in self._idle if k[0] == key[0] and k[1] != key[1]]:
+            self._count[old] = self._count.get(old, 0) - len(self._idle.pop(old))
+
+    def acquire(self, path, sample_rate=None):
+        """Returns a PooledPlugin (its lock held) or None if loading failed."""
+        if not os.path.exists(path):
+            print(f"#### Internode VST Error: File not found {path}")
+            return None
+
+        key = self._make_key(path, sample_rate)
+        with self._cond:
+            self._drop_stale(key)
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    entry = idle.pop()
+                    self._stats["hits"] += 1
+                    entry.lock.acquire()
+                    return entry
+                if self._count.get(key, 0) < self.max_instances:
+                    # Reserve the slot, then load outside the lock
+                    self._count[key] = self._count.get(key, 0) + 1
+                    break
+                self._stats["waits"] += 1
+                self._cond.wait()
+
+        start = time.perf_counter()
+        plugin = self._factory(path)
+        elapsed = time.perf_counter() - start
+
+        with self._cond:
+            if plugin is None:
+                self._count[key] -= 1
+                self._stats["failures"] += 1
+                self._cond.notify()
+                return None
+            self._stats["instantiations"] += 1
+            self._stats["load_seconds"] += elapsed
+
+        entry = PooledPlugin(key, plugin)
+        entry.lock.acquire()
+        return entry
+
+    def release(self, entry):
+        entry.restore()
+        entry.lock.release()
+        with self._cond:
+            stale = self._latest.get(entry.key[0], entry.key[1]) != entry.key[1]
+            if stale or self._count.get(entry.key, 0) > self.max_instances:
+                # Bundle was rebuilt, or the pool was shrunk, while this instance was out
+                self._count[entry.key] -= 1
+            else:
+                self._idle.setdefault(entry.key, []).append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, path, sample_rate=None):
+        """with pool.checkout(path, sr) as plugin: ... (plugin is None on failure)"""
+        entry = self.acquire(path, sample_rate)
+        try:
+            yield entry.plugin if entry else None
+        finally:
+            if entry: self.release(entry)
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._stats)
+            out["instances"] = sum(self._count.values())
+            out["idle"] = sum(len(v) for v in self._idle.values())
+            out["max_instances"] = self.max_instances
+        lookups = out["hits"] + out["instantiations"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        return out
+
+    def clear(self):
+        with self._cond:
+            for key, idle in self._idle.items():
+                self._count[key] = self._count.get(key, 0) - len(idle)
+            self._idle.clear()
@@ -0,0 +1,197 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/plugin_scanner.py
+# VERSION: 3.6.0
+#
+# Background VST3 scanner with an on-disk index, so listing plugins and their
+# parameters never needs a live instance. Pure Python: the function that
+# loads and describes a bundle is injected by the caller (the nodes run it in
+# an out-of-process host so a bad plugin can't take ComfyUI down).
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+if __package__:
+    from .plugin_pool import bundle_mtime
+else:
+    from plugin_pool import bundle_mtime
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = os.environ.get(
+    "INTERNODE_VST3_INDEX", os.path.join(os.path.dirname(os.path.abspath(__file__)), "vst3_index.json")
+)
+
+
+def default_search_paths():
+    """Standard VST3 folders for this OS plus INTERNODE_VST3_PATHS (os.pathsep separated)."""
+    if sys.platform == "win32":
+        paths = [
+            os.path.join(os.environ.get("COMMONPROGRAMFILES", r"C:\Program Files\Common Files"), "VST3"),
+            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Programs", "Common", "VST3"),
+        ]
+    elif sys.platform == "darwin":
+        paths = ["/Library/Audio/Plug-Ins/VST3", os.path.expanduser("~/Library/Audio/Plug-Ins/VST3")]
+    else:
+        paths = [os.path.expanduser("~/.vst3"), "/usr/lib/vst3", "/usr/local/lib/vst3"]
+    extra = os.environ.get("INTERNODE_VST3_PATHS", "")
+    paths += [p for p in extra.split(os.pathsep) if p]
+    return [p for p in paths if os.path.isdir(p)]
+
+
+def find_bundles(search_paths):
+    """All *.vst3 bundles below the search paths (bundles are not descended into)."""
+    found = []
+    for root in search_paths:
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in dirnames + filenames:
+                if name.lower().endswith(".vst3"):
+                    found.append(os.path.normpath(os.path.join(dirpath, name)))
+            dirnames[:] = [d for d in dirnames if not d.lower().endswith(".vst3")]
+    return sorted(set(found))
+
+
+class ScanCrash(RuntimeError):
+    """Raised by a describe function when the plugin took its host process down."""
+
+
+def describe_plugin(plugin):
+    """Name, category and parameter ranges of a live plugin instance."""
+    params = {}
+    for name, p in plugin.parameters.items():
+        info = {"raw_value": float(p.raw_value)}
+        for attr in ("min_value", "max_value", "label", "units"):
+            val = getattr(p, attr, None)
+            if isinstance(val, (int, float, str)) and not isinstance(val, bool):
+                info[attr] = val
+        params[name] = info
+    return {
+        "name": getattr(plugin, "name", ""),
+        "category": getattr(plugin, "category", ""),
+        "parameters": params,
+    }
+
+
+class VST3Scanner:
+    """
+    Index entries are keyed by normalized bundle path and only trusted while
+    the newest mtime inside the bundle matches, so updated plugins are
+    re-scanned.
+    describe(path) returns describe_plugin()'s dict for a bundle or raises
+    (ScanCrash when an isolated host died on it). Unless describe is
+    isolated, each bundle is marked in the index before it is loaded; a mark
+    left by a process that never finished is only a reason to scan again,
+    since the process may have been stopped for reasons of its own.
+    """
+
+    def __init__(self, describe, index_path=DEFAULT_INDEX_PATH, search_paths=None, isolated=False):
+        self._describe = describe
+        self.index_path = index_path
+        self.search_paths = search_paths
+        self.isolated = isolated
+        self._lock = threading.Lock()
+        # Held for a whole snapshot + write + replace, so saves land in order
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._entries = {}
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self._entries = data.get("plugins", {})
+        except (OSError, ValueError):
+            pass
+        # Still marked as scanning: the previous process stopped mid-scan, so scan it again
+        self._entries = {p: e for p, e in self._entries.items() if not e.get("scanning")}
+
+    def _save_index(self):
+        with self._write_lock:
+            with self._lock:
+                data = {"version": INDEX_VERSION, "plugins": dict(self._entries)}
+            tmp = None
+            try:
+                fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.index_path) + ".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.index_path)))
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp, self.index_path)
+            except OSError as e:
+                print(f"#### Internode VST Scanner: could not write index: {e}")
+                if tmp and os.path.exists(tmp):
+                    try: os.remove(tmp)
+                    except OSError: pass
+
+    def get(self, path):
+        """Index entry for a bundle, or None if unknown or stale."""
+        path = os.path.normpath(path)
+        try:
+            mtime = bundle_mtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+        return entry if entry and entry.get("mtime") == mtime else None
+
+    def plugin_paths(self):
+        """Indexed bundles that loaded successfully."""
+        with self._lock:
+            return sorted(p for p, e in self._entries.items() if not e.get("error"))
+
+    def record(self, path, plugin, load_seconds):
+        """Stores the description of an already-loaded instance."""
+        return self._store(path, describe_plugin(plugin), load_seconds)
+
+    def _store(self, path, entry, load_seconds):
+        path = os.path.normpath(path)
+        entry = dict(entry, mtime=bundle_mtime(path), load_seconds=round(load_seconds, 3))
+        with self._lock:
+            self._entries[path] = entry
+        self._save_index()
+        return entry
+
+    def _mark(self, path, **fields):
+        with self._lock:
+            self._entries[path] = dict(fields, mtime=bundle_mtime(path))
+        self._save_index()
+
+    def scan(self):
+        """Describes every new or changed bundle once and prunes removed ones."""
+        bundles = find_bundles(self.search_paths if self.search_paths is not None else default_search_paths())
+        with self._lock:
+            for gone in [p for p in self._entries if not os.path.exists(p)]:
+                del self._entries[gone]
+        pending = [p for p in bundles if self.get(p) is None]
+        for path in pending:
+            if not self.isolated:
+                # Saved before loading; see _load_index
+                self._mark(path, scanning=True)
+            start = time.perf_counter()
+            try:
+                entry = self._describe(path)
+            except ScanCrash as e:
+                self._mark(path, error=str(e), crashed=True)
+            except Exception as e:
+                self._mark(path, error=str(e) or type(e).__name__)
+            else:
+                if entry is None: self._mark(path, error="Load failed.")
+                else: self._store(path, entry, time.perf_counter() - start)
+        self._save_index()
+        if pending:
+            print(f"#### Internode VST Scanner: indexed {len(pending)} new/changed plugin(s), {len(bundles)} total.")
+        return len(pending)
+
+    def start_background(self):
+        """Starts one daemon scan thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive(): return self._thread
+        self._thread = threading.Thread(target=self._scan_safely, name="InternodeVST3Scanner", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _scan_safely(self):
+        try:
+            self.scan()
+        except Exception as e:
+            print(f"#### Internode VST Scanner Error: {e}")
@@ -0,0 +1,213 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/vst_host.py
+# VERSION: 3.6.0
+#
+# Out-of-process VST hosting. Each worker is a separate Python process that
+# owns its own plugin instances, so a crashing plugin only kills its worker
+# and plugins holding internal locks no longer serialize the whole server.
+# Requests are small pickles over the worker's stdin/stdout; audio travels
+# through multiprocessing.shared_memory blocks. Numpy + stdlib only so the
+# worker can import the shared-memory helpers too.
+
+import os
+import sys
+import queue
+import atexit
+import pickle
+import threading
+import subprocess
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+DEFAULT_HOST_WORKERS = int(os.environ.get("INTERNODE_VST_HOST_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Seconds a single request may take before its worker is killed (0 = no limit)
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("INTERNODE_VST_HOST_TIMEOUT", "1800"))
+# Loading a plugin to index it should never take this long
+DESCRIBE_TIMEOUT = 120.0
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vst_host_worker.py")
+
+
+# --- SHARED MEMORY ---
+
+def _untrack(shm):
+    # Only the process that unlinks a block should track it, otherwise the
+    # other side's resource tracker would destroy it (or warn) at exit
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def share_array(array):
+    """Copies an array into a new shared block. Returns (shm, descriptor)."""
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=np.float32, buffer=shm.buf)[...] = array
+    return shm, {"name": shm.name, "shape": array.shape}
+
+
+def empty_shared(shape):
+    """New zero-filled shared block for an output buffer. Returns (shm, array, descriptor)."""
+    nbytes = int(np.prod(shape)) * 4
+    shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+    arr = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    arr[...] = 0.0
+    return shm, arr, {"name": shm.name, "shape": tuple(shape)}
+
+
+def attach_array(desc):
+    """Maps a block created by the other process. Returns (shm, array view)."""
+    shm = shared_memory.SharedMemory(name=desc["name"])
+    _untrack(shm)
+    return shm, np.ndarray(desc["shape"], dtype=np.float32, buffer=shm.buf)
+
+
+def take_array(desc):
+    """Copies a block created by the other process out and frees it."""
+    shm = shared_memory.SharedMemory(name=desc["name"])
+    try:
+        return np.ndarray(desc["shape"], dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# --- WORKER PROCESSES ---
+
+class HostWorkerCrashed(RuntimeError):
+    pass
+
+
+class HostWorkerTimeout(HostWorkerCrashed):
+    pass
+
+
+class HostWorker:
+    """One worker process; callers must hold it exclusively (see VSTHostPool)."""
+
+    def __init__(self):
+        self.proc = None
+        self._expired = False
+
+    def _spawn(self):
+        # stderr is inherited so plugin and worker messages show up in the console
+        self.proc = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _expire(self, proc):
+        # Watchdog: killing the process unblocks the pending read in request()
+        self._expired = True
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+    def request(self, msg, timeout=None):
+        if not self.alive(): self._spawn()
+        self._expired = False
+        watchdog = None
+        if timeout and timeout > 0:
+            watchdog = threading.Timer(timeout, self._expire, args=(self.proc,))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            pickle.dump(msg, self.proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            self.proc.stdin.flush()
+            reply = pickle.load(self.proc.stdout)
+        except (EOFError, OSError, pickle.UnpicklingError) as e:
+            code = self.proc.poll()
+            self.stop()
+            if self._expired:
+                raise HostWorkerTimeout(f"VST host process did not answer within {timeout:g}s and was killed.")
+            raise HostWorkerCrashed(f"VST host process died (exit code {code}): {e}")
+        finally:
+            if watchdog: watchdog.cancel()
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def stop(self):
+        if self.proc is None: return
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        self.proc = None
+
+
+class VSTHostPool:
+    """
+    Fixed set of lazily started workers. Each request takes a free worker,
+    so concurrent nodes (or batch items) run in parallel on separate cores.
+    """
+
+    def __init__(self, size=DEFAULT_HOST_WORKERS, timeout=DEFAULT_REQUEST_TIMEOUT):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        for _ in range(self.size):
+            self._idle.put(HostWorker())
+        self._lock = threading.Lock()
+        self.crashes = 0
+        atexit.register(self.shutdown)
+
+    def _call(self, msg, timeout=None):
+        worker = self._idle.get()
+        try:
+            return worker.request(msg, self.timeout if timeout is None else timeout)
+        except HostWorkerCrashed:
+            with self._lock: self.crashes += 1
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def render_effect(self, chain, sample_rate, audio, regions=None, automation=None, offset=0, total_frames=None):
+        """Wet signal of a chain of {"path", "params"} links over a [C, N] array."""
+        shm, desc = share_array(audio)
+        try:
+            reply = self._call({
+                "op": "effect", "chain": chain, "sample_rate": sample_rate, "audio": desc,
+                "regions": regions, "automation": automation, "offset": offset, "total_frames": total_frames,
+            })
+        finally:
+            shm.close()
+            shm.unlink()
+        return take_array(reply["audio"])
+
+    def render_instrument(self, path, params, events, sample_rate, num_frames, block_size, num_channels=2, automation=None, wav_path=None):
+        """
+        Renders MIDI events into a [num_channels, num_frames] array, or into
+        the data section of an existing float WAV (see open_float_wav) when
+        wav_path is given, in which case None is returned.
+        """
+        msg = {
+            "op": "instrument", "path": path, "params": params, "events": events,
+            "sample_rate": sample_rate, "num_frames": num_frames, "block_size": block_size,
+            "num_channels": num_channels, "automation": automation, "wav_path": wav_path,
+        }
+        if wav_path:
+            self._call(msg)
+            return None
+        shm, out, msg["out"] = empty_shared((num_channels, num_frames))
+        try:
+            self._call(msg)
+            return out.copy()
+        finally:
+            del out
+            shm.close()
+            shm.unlink()
+
+    def describe(self, path, timeout=DESCRIBE_TIMEOUT):
+        """describe_plugin() of a freshly loaded instance, loaded inside a worker."""
+        return self._call({"op": "describe", "path": path}, timeout)["plugin"]
+
+    def shutdown(self):
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
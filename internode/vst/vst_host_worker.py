@@ -0,0 +1,133 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/vst_host_worker.py
+# VERSION: 3.6.0
+#
+# Entry point of an out-of-process VST host (started by vst_host.HostWorker).
+# Reads pickled requests from stdin and answers on a private copy of the
+# stdout pipe. Keeps its own plugin pool so instances stay warm between
+# requests.
+
+import os
+import sys
+import pickle
+from contextlib import ExitStack
+
+if __package__:
+    from .plugin_pool import VSTPluginPool
+    from .plugin_scanner import describe_plugin
+    from .vst_host import attach_array, share_array, _untrack
+    from .vst_render import render_effect, render_instrument, map_float_wav
+else:
+    # Started as a script: the package name isn't importable, the folder is
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from plugin_pool import VSTPluginPool
+    from plugin_scanner import describe_plugin
+    from vst_host import attach_array, share_array, _untrack
+    from vst_render import render_effect, render_instrument, map_float_wav
+
+from pedalboard import Pedalboard, load_plugin
+
+
+def _load(path):
+    try:
+        return load_plugin(path)
+    except Exception as e:
+        print(f"#### Internode VST Host Load Error: {e}", file=sys.stderr)
+        return None
+
+
+POOL = VSTPluginPool(_load)
+
+
+def _checkout(stack, path, sample_rate, params):
+    plugin = stack.enter_context(POOL.checkout(path, sample_rate))
+    if plugin is None:
+        raise RuntimeError(f"VST Load Failed: {path}")
+    for name, value in params.items():
+        if name in plugin.parameters:
+            plugin.parameters[name].raw_value = value
+    return plugin
+
+
+def handle_effect(msg):
+    sr = msg["sample_rate"]
+    with ExitStack() as stack:
+        plugins = [_checkout(stack, link["path"], sr, link["params"]) for link in msg["chain"]]
+        # A single plugin is used directly so its parameters can be automated
+        processor = plugins[0] if len(plugins) == 1 else Pedalboard(plugins)
+        shm, audio = attach_array(msg["audio"])
+        try:
+            wet = render_effect(processor, audio, sr, msg["regions"], msg["automation"], msg["offset"], msg["total_frames"])
+        finally:
+            del audio
+            shm.close()
+    out_shm, desc = share_array(wet)
+    # The parent copies and unlinks the block
+    _untrack(out_shm)
+    out_shm.close()
+    return {"audio": desc}
+
+
+def handle_instrument(msg):
+    sr, n, channels = msg["sample_rate"], msg["num_frames"], msg["num_channels"]
+    with ExitStack() as stack:
+        plugin = _checkout(stack, msg["path"], sr, msg["params"])
+        if msg["wav_path"]:
+            out = map_float_wav(msg["wav_path"], channels, n)
+            render_instrument(plugin, msg["events"], sr, n, out, msg["block_size"], channels, msg["automation"])
+            out.flush()
+            del out
+        else:
+            shm, buf = attach_array(msg["out"])
+            try:
+                render_instrument(plugin, msg["events"], sr, n, buf.T, msg["block_size"], channels, msg["automation"])
+            finally:
+                del buf
+                shm.close()
+    return {}
+
+
+def handle_describe(msg):
+    # A fresh instance, dropped right away: scanning shouldn't fill the pool
+    plugin = _load(msg["path"])
+    if plugin is None:
+        raise RuntimeError(f"VST Load Failed: {msg['path']}")
+    try:
+        return {"plugin": describe_plugin(plugin)}
+    finally:
+        del plugin
+
+
+HANDLERS = {"effect": handle_effect, "instrument": handle_instrument, "describe": handle_describe}
+
+
+def reply_stream():
+    """
+    Moves the reply pipe off fd 1 and points fd 1 at stderr. Plugins print
+    from native code (printf, std::cout) straight to fd 1, so swapping
+    sys.stdout alone would let them corrupt the pickled replies.
+    """
+    sys.stdout.flush()
+    stream = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return stream
+
+
+def main():
+    # Must run before any plugin is loaded
+    stdin, stdout = sys.stdin.buffer, reply_stream()
+    while True:
+        try:
+            msg = pickle.load(stdin)
+        except EOFError:
+            break
+        try:
+            reply = HANDLERS[msg["op"]](msg)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        pickle.dump(reply, stdout, protocol=pickle.HIGHEST_PROTOCOL)
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,22 @@
 import torch
 import numpy as np
 import os
+import time
+import difflib
 import folder_paths
-import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+
+from ..dsp.audio_utils import detect_active_regions, plan_segments, crossfade_stitch
+from .plugin_pool import VSTPluginPool
+from .plugin_scanner import VST3Scanner, ScanCrash
+from .vst_render import (
+    DEFAULT_BLOCK_SIZE, DEFAULT_AUTOMATION_TOLERANCE,
+    midi_to_events, open_float_wav, map_float_wav, render_instrument, render_effect, measure_tail,
+)
+from .vst_host import VSTHostPool, HostWorkerCrashed
+from .midi_events import load_midi_events, midi_messages
 
 # Dependency Checks
 PEDALBOARD_AVAILABLE = False
@@ -23,24 +37,213 @@ try:
 except ImportError:
     pass
 
-# --- CACHE ---
-_plugin_cache = {}
-_cache_lock = threading.Lock()
-
 def load_vst_plugin(path):
-    """Thread-safe VST loading/caching"""
+    """Loads a fresh, un-pooled plugin instance. Nodes should use PLUGIN_POOL."""
     if not os.path.exists(path):
         print(f"#### Internode VST Error: File not found {path}")
         return None
+    entry = SCANNER.get(path)
+    if entry and entry.get("crashed"):
+        # Never bring a plugin that killed its scan host into the ComfyUI process
+        print(f"#### Internode VST Error: {path} crashed while being scanned, not loading it in-process. Use host_mode out_of_process, or update the plugin so it is re-scanned.")
+        return None
         
-    # Pedalboard objects aren't strictly thread-safe for processing, 
-    # but we cache the *plugin definition* if possible, or just new instances.
     try:
-        return load_plugin(path)
+        start = time.perf_counter()
+        plugin = load_plugin(path)
     except Exception as e:
         print(f"#### Internode VST Load Error: {e}")
         return None
 
+    # Plugins loaded outside the background scan still end up in the index
+    if entry is None:
+        SCANNER.record(path, plugin, time.perf_counter() - start)
+    return plugin
+
+def describe_in_host(path):
+    """Scanner callback: loads the bundle in a host worker, never in this process."""
+    try:
+        return HOST_POOL.describe(path)
+    except HostWorkerCrashed as e:
+        raise ScanCrash(str(e))
+
+# --- PLUGIN INDEX ---
+# Scanning loads every bundle once, each in an out-of-process host worker.
+# It is opt-in (INTERNODE_VST3_SCAN=1) and started below, once HOST_POOL exists.
+SCANNER = VST3Scanner(describe_in_host, isolated=True)
+
+NO_PLUGIN = "none"
+
+def installed_plugin_input():
+    return ([NO_PLUGIN] + SCANNER.plugin_paths(), {"tooltip": "Plugins found by the VST3 scan. Overrides vst_path."})
+
+def resolve_vst_path(vst_path, installed_plugin=NO_PLUGIN):
+    return installed_plugin if installed_plugin and installed_plugin != NO_PLUGIN else vst_path
+
+def validate_vst_path(vst_path=None, installed_plugin=NO_PLUGIN):
+    """
+    VALIDATE_INPUTS body. Declaring installed_plugin keeps saved workflows
+    valid when their plugin is no longer in the dropdown. A missing or broken
+    bundle is only warned about: the node still runs and passes the audio
+    through unchanged, as it always has.
+    """
+    path = resolve_vst_path(vst_path, installed_plugin)
+    if path is None: return True # Linked input, checked at run time
+    entry = SCANNER.get(path)
+    if not os.path.exists(path):
+        print(f"#### Internode VST Warning: {path} not found, audio will pass through unprocessed.")
+    elif entry and entry.get("error"):
+        print(f"#### Internode VST Warning: {path} failed when indexed ({entry['error']}).")
+    return True
+
+def check_param_names(vst_path, names):
+    """
+    Warns about parameter names the index doesn't know, with the closest
+    matches. Returns False when the plugin isn't indexed yet.
+    """
+    entry = SCANNER.get(vst_path)
+    if not entry or entry.get("error"): return False
+    for name in names:
+        if name not in entry["parameters"]:
+            close = difflib.get_close_matches(name, list(entry["parameters"]), n=3)
+            hint = f" Did you mean: {', '.join(close)}?" if close else ""
+            print(f"#### Internode Warning: Param '{name}' not found in {entry['name']}.{hint}")
+    return True
+
+# --- INSTANCE POOL ---
+# Pedalboard objects aren't thread-safe for processing, so each live instance
+# is checked out by one node at a time and reset before the next user.
+PLUGIN_POOL = VSTPluginPool(load_vst_plugin)
+
+def format_pool_stats():
+    st = PLUGIN_POOL.stats()
+    return (
+        f"Pool: {st['instances']} instances ({st['idle']} idle, max {st['max_instances']} per plugin), "
+        f"{st['hits']} hits / {st['instantiations']} loads ({st['hit_rate']:.0%} hit rate), "
+        f"{st['load_seconds']:.2f}s spent loading, {st['waits']} waits, {st['failures']} failures"
+    )
+
+def active_regions(audio_np, sr, threshold_db, tail_seconds):
+    """Non-silent (start, end) ranges of a [C, N] array, each extended by the effect tail."""
+    n = audio_np.shape[-1]
+    tail = int(tail_seconds * sr)
+    merged = []
+    for a, b in detect_active_regions(torch.from_numpy(audio_np), sr, threshold_db):
+        b = min(n, b + tail)
+        if merged and a <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+    return merged
+
+def apply_params(plugin, params, warn=False):
+    """Sets {name: raw_value} on a plugin, skipping names it does not have."""
+    for name, val in params.items():
+        if name in plugin.parameters:
+            plugin.parameters[name].raw_value = val
+        elif warn:
+            print(f"#### Internode Warning: Param '{name}' not found in VST.")
+
+def collect_params(kwargs):
+    """Gathers the VST_PARAM dicts from param_N inputs into {name: value}."""
+    params = {}
+    for k, v in kwargs.items():
+        if isinstance(v, dict) and "name" in v:
+            params[v["name"]] = v["value"]
+    return params
+
+def collect_automation(kwargs):
+    """Gathers the curve-carrying VST_PARAMs as (name, curve, fps, tolerance) tuples."""
+    automation = []
+    for k, v in kwargs.items():
+        if isinstance(v, dict) and v.get("curve") is not None:
+            automation.append((v["name"], np.asarray(v["curve"], dtype=np.float64), v.get("fps", 0.0), v.get("tolerance", DEFAULT_AUTOMATION_TOLERANCE)))
+    return automation
+
+@contextmanager
+def open_plugin(vst_path, sr, params):
+    with PLUGIN_POOL.checkout(vst_path, sr) as plugin:
+        if plugin: apply_params(plugin, params)
+        yield plugin
+
+@contextmanager
+def open_chain(chain, sr):
+    """Checks out every plugin of a VST_CHAIN and wraps them in one Pedalboard."""
+    with ExitStack() as stack:
+        plugins = []
+        for link in chain:
+            plugin = stack.enter_context(open_plugin(link["path"], sr, link["params"]))
+            if plugin is None:
+                yield None
+                return
+            plugins.append(plugin)
+        yield Pedalboard(plugins)
+
+# --- OUT-OF-PROCESS HOST ---
+# Worker processes start on first use; INTERNODE_VST_HOST_WORKERS sets how many.
+HOST_POOL = VSTHostPool()
+HOST_MODES = ["in_process", "out_of_process"]
+
+if PEDALBOARD_AVAILABLE and os.environ.get("INTERNODE_VST3_SCAN", "0") == "1":
+    SCANNER.start_background()
+
+def host_mode_input():
+    return (HOST_MODES, {"tooltip": "out_of_process renders in separate worker processes: a crashing plugin can't take down ComfyUI, and concurrent renders use separate cores."})
+
+@contextmanager
+def local_renderer(open_processor, sr):
+    """Wraps a pooled plugin/Pedalboard as render(audio, regions, automation); None on load failure."""
+    with open_processor() as processor:
+        if processor is None:
+            yield None
+        else:
+            yield lambda audio, regions, automation, offset=0, total_frames=None: render_effect(processor, audio, sr, regions, automation, offset, total_frames)
+
+@contextmanager
+def host_renderer(chain, sr):
+    """Same interface as local_renderer, rendered by an out-of-process host worker."""
+    yield lambda audio, regions, automation, offset=0, total_frames=None: HOST_POOL.render_effect(chain, sr, audio, regions, automation, offset, total_frames)
+
+# --- SEGMENT-PARALLEL RENDERING ---
+SEGMENT_CROSSFADE_SECONDS = 0.05
+
+@contextmanager
+def segmented_renderer(open_renderer, sr, segment_seconds, preroll, max_workers):
+    """
+    render() with the same interface that splits one long item into
+    overlapping segments, renders them concurrently on separate instances
+    and crossfades them back together. Each segment is pre-rolled by the
+    effect's tail so its state is warm when its own audio starts.
+    `preroll` is a one-item list holding samples, or None to measure the
+    tail from an impulse response on first use (shared across batch items).
+    """
+
+    def render(audio, regions, automation, offset=0, total_frames=None):
+        n = audio.shape[1]
+        if preroll[0] is None:
+            with open_renderer() as r:
+                if r is None: raise RuntimeError("VST Load Failed")
+                preroll[0] = measure_tail(lambda x: r(x, None, None), sr, audio.shape[0])
+            print(f"#### Internode: Measured VST tail {preroll[0] / sr:.2f}s")
+
+        xfade = int(SEGMENT_CROSSFADE_SECONDS * sr)
+        segments = plan_segments(n, int(segment_seconds * sr) + xfade, xfade)
+
+        def run(seg):
+            a, b = seg
+            start = max(0, a - preroll[0])
+            with open_renderer() as r:
+                if r is None: raise RuntimeError("VST Load Failed")
+                wet = r(audio[:, start:b], None, automation, offset + start, total_frames or offset + n)
+            # Drop the pre-roll; only [a, b) is kept
+            return torch.from_numpy(np.ascontiguousarray(wet[:, a - start:b - start]))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments)))) as pool:
+            chunks = list(pool.map(run, segments))
+        return crossfade_stitch(chunks, segments, n).numpy()
+
+    yield render
+
 # --- HELPER NODES ---
 
 class InternodeVST3Info:
@@ -53,35 +256,50 @@ class InternodeVST3Info:
         return {
             "required": {
                 "vst_path": ("STRING", {"default": r"C:\Program Files\Common Files\VST3\Plugin.vst3"}),
+            },
+            "optional": {
+                "installed_plugin": installed_plugin_input(),
             }
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("parameter_list",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("parameter_list", "pool_stats")
     FUNCTION = "get_info"
     CATEGORY = "Internode/VST3"
 
-    def get_info(self, vst_path):
-        if not PEDALBOARD_AVAILABLE: return ("Pedalboard not installed.",)
-        
-        plugin = load_vst_plugin(vst_path)
-        if not plugin: return ("Failed to load plugin.",)
+    @classmethod
+    def VALIDATE_INPUTS(s, vst_path=None, installed_plugin=NO_PLUGIN):
+        return validate_vst_path(vst_path, installed_plugin)
+
+    def get_info(self, vst_path, installed_plugin=NO_PLUGIN):
+        if not PEDALBOARD_AVAILABLE: return ("Pedalboard not installed.", "")
+        vst_path = resolve_vst_path(vst_path, installed_plugin)
+
+        # Indexed plugins are described without loading them
+        entry = SCANNER.get(vst_path)
+        if entry and not entry.get("error"):
+            info = [f"Plugin: {entry['name']}", f"Category: {entry['category']}", f"Load time: {entry['load_seconds']:.2f}s (from index)", "-" * 20]
+            info += [f"{name}: {p['raw_value']:.4f}" for name, p in entry["parameters"].items()]
+            return ("\n".join(info), format_pool_stats())
         
         info = []
-        try:
-            info.append(f"Plugin: {plugin.name}")
-            info.append(f"Category: {plugin.category}")
-            info.append("-" * 20)
-            for name, param in plugin.parameters.items():
-                info.append(f"{name}: {param.raw_value:.4f}")
-        except:
-            info.append("Could not iterate parameters.")
+        with PLUGIN_POOL.checkout(vst_path) as plugin:
+            if not plugin: return ("Failed to load plugin.", format_pool_stats())
+            try:
+                info.append(f"Plugin: {plugin.name}")
+                info.append(f"Category: {plugin.category}")
+                info.append("-" * 20)
+                for name, param in plugin.parameters.items():
+                    info.append(f"{name}: {param.raw_value:.4f}")
+            except:
+                info.append("Could not iterate parameters.")
             
-        return ("\n".join(info),)
+        return ("\n".join(info), format_pool_stats())
 
 class InternodeMidiLoader:
     """
-    Loads a .mid file and returns the raw MIDI object (Mido).
+    Loads a .mid file and returns the raw MIDI object (Mido) plus the
+    array-backed MIDI_EVENTS view. Both are cached per file and mtime.
     """
     @classmethod
     def INPUT_TYPES(s):
@@ -91,7 +309,8 @@ class InternodeMidiLoader:
             }
         }
 
-    RETURN_TYPES = ("MIDI_DATA",)
+    RETURN_TYPES = ("MIDI_DATA", "MIDI_EVENTS")
+    RETURN_NAMES = ("midi_data", "midi_events")
     FUNCTION = "load_midi"
     CATEGORY = "Internode/Loaders"
 
@@ -103,12 +322,13 @@ class InternodeMidiLoader:
         if not os.path.exists(path):
             raise FileNotFoundError(f"MIDI file not found: {midi_file}")
             
-        mid = mido.MidiFile(path)
-        return (mid,)
+        mid, events = load_midi_events(path)
+        return (mid, events)
 
 class InternodeVST3Param:
     """
     Defines a parameter automation to be passed to a VST node.
+    A connected curve (LFO, ADSR, Audio To Keyframes...) overrides the static value.
     """
     @classmethod
     def INPUT_TYPES(s):
@@ -116,6 +336,11 @@ class InternodeVST3Param:
             "required": {
                 "param_name": ("STRING", {"default": "Cutoff"}),
                 "value": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01}),
+            },
+            "optional": {
+                "curve": ("FLOAT_LIST", {"tooltip": "Per-frame automation (0..1). Overrides value."}),
+                "curve_fps": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 240.0, "tooltip": "Frame rate of the curve. 0 stretches it over the whole render."}),
+                "tolerance": ("FLOAT", {"default": DEFAULT_AUTOMATION_TOLERANCE, "min": 0.0001, "max": 0.1, "step": 0.0001, "tooltip": "Smallest change that triggers a new render block."}),
             }
         }
 
@@ -123,7 +348,10 @@ class InternodeVST3Param:
     FUNCTION = "create_param"
     CATEGORY = "Internode/VST3"
 
-    def create_param(self, param_name, value):
+    def create_param(self, param_name, value, curve=None, curve_fps=0.0, tolerance=DEFAULT_AUTOMATION_TOLERANCE):
+        if curve is not None and len(curve) > 0:
+            # Static value = start of the curve, for consumers that can't automate
+            return ({"name": param_name, "value": float(min(max(curve[0], 0.0), 1.0)), "curve": list(curve), "fps": curve_fps, "tolerance": tolerance},)
         return ({"name": param_name, "value": value},)
 
 # --- PROCESSORS ---
@@ -131,21 +359,30 @@ class InternodeVST3Param:
 class InternodeVST3Instrument:
     """
     Renders audio from a VST3 Instrument using a MIDI file.
-    Optimized: Uses C++ bulk processing instead of Python loops.
+    MIDI is streamed into the plugin block by block; with render_to_disk the
+    blocks go straight into a float WAV so memory stays flat for long songs.
     """
+    def __init__(self): self.output_dir = folder_paths.get_output_directory()
+
     @classmethod
     def INPUT_TYPES(s):
         return {
             "required": {
-                "midi_data": ("MIDI_DATA",),
                 "vst_path": ("STRING", {"default": r"C:\Program Files\Common Files\VST3\Synth.vst3"}),
                 "sample_rate": (["44100", "48000"],),
                 "duration_padding": ("FLOAT", {"default": 2.0, "min": 0.0, "max": 10.0, "tooltip": "Seconds of silence to add at end (for reverb tails)."}),
             },
             "optional": {
+                "midi_data": ("MIDI_DATA",),
+                "midi_events": ("MIDI_EVENTS", {"tooltip": "Used instead of midi_data when connected; skips walking the mido messages."}),
                 "param_1": ("VST_PARAM",),
                 "param_2": ("VST_PARAM",),
                 "param_3": ("VST_PARAM",),
+                "block_size": ("INT", {"default": DEFAULT_BLOCK_SIZE, "min": 64, "max": 65536, "tooltip": "Samples rendered per plugin call. MIDI timing stays sample-accurate at any size."}),
+                "render_to_disk": ("BOOLEAN", {"default": False, "tooltip": "Write blocks into a float WAV in the output folder as they render. The returned audio is a copy-on-write map of that file: changes made downstream stay in memory and never alter the WAV, but the file stays open while the audio is in use."}),
+                "filename_prefix": ("STRING", {"default": "vst_render"}),
+                "installed_plugin": installed_plugin_input(),
+                "host_mode": host_mode_input(),
             }
         }
 
@@ -153,39 +390,68 @@ class InternodeVST3Instrument:
     FUNCTION = "render"
     CATEGORY = "Internode/VST3"
 
-    def render(self, midi_data, vst_path, sample_rate, duration_padding, **kwargs):
+    @classmethod
+    def VALIDATE_INPUTS(s, vst_path=None, installed_plugin=NO_PLUGIN):
+        return validate_vst_path(vst_path, installed_plugin)
+
+    def render(self, vst_path, sample_rate, duration_padding, midi_data=None, midi_events=None, block_size=DEFAULT_BLOCK_SIZE, render_to_disk=False, filename_prefix="vst_render", installed_plugin=NO_PLUGIN, host_mode="in_process", **kwargs):
         if not PEDALBOARD_AVAILABLE: raise ImportError("Pedalboard missing.")
+        if midi_data is None and midi_events is None: raise ValueError("Connect midi_data or midi_events.")
+        vst_path = resolve_vst_path(vst_path, installed_plugin)
         
         sr = int(sample_rate)
-        plugin = load_vst_plugin(vst_path)
-        if not plugin: raise RuntimeError("VST Load Failed")
-        
-        # Apply static parameter overrides
-        for k, v in kwargs.items():
-            if v and "name" in v:
-                if v["name"] in plugin.parameters:
-                    plugin.parameters[v["name"]].raw_value = v["value"]
-                else:
-                    print(f"#### Internode Warning: Param '{v['name']}' not found in VST.")
-
-        # Calculate Duration from MIDI
-        midi_len = midi_data.length
-        total_duration = midi_len + duration_padding
-        total_samples = int(total_duration * sr)
-        
-        print("#### Internode: Rendering VST Instrument (Batch Mode)...")
-        
-        # Create full silence buffer
-        input_audio = np.zeros((2, total_samples), dtype=np.float32)
-        
-        try:
-            # Process entire buffer in C++ (Fastest)
-            output_audio = plugin.process(input_audio, sr)
-        except Exception as e:
-            print(f"#### Internode VST Render Error: {e}")
-            output_audio = input_audio
-
-        tensor = torch.from_numpy(output_audio).unsqueeze(0) # [1, 2, Samples]
+        channels = 2
+        params = collect_params(kwargs)
+        params_checked = check_param_names(vst_path, params)
+        automation = collect_automation(kwargs)
+        if midi_events is not None:
+            events, length = midi_messages(midi_events), midi_events["length"]
+        else:
+            events, length = midi_to_events(midi_data), midi_data.length
+        total_samples = int((length + duration_padding) * sr)
+
+        full = None
+        if render_to_disk:
+            path, fname, cnt, _, _ = folder_paths.get_save_image_path(filename_prefix, self.output_dir)
+            full = os.path.join(path, f"{fname}_{cnt:05d}.wav")
+            out = open_float_wav(full, channels, total_samples, sr)
+            print(f"#### Internode: Rendering VST Instrument to {full}...")
+        elif host_mode == "out_of_process":
+            buf = None # The host worker renders into its own shared buffer
+            print("#### Internode: Rendering VST Instrument (Out of Process)...")
+        else:
+            # [C, N] buffer written through its [N, C] view
+            buf = np.zeros((channels, total_samples), dtype=np.float32)
+            out = buf.T
+            print("#### Internode: Rendering VST Instrument (Streaming)...")
+
+        if host_mode == "out_of_process":
+            # The worker writes straight into the WAV file, or returns a copy of its shared buffer
+            try:
+                buf = HOST_POOL.render_instrument(vst_path, params, events, sr, total_samples, block_size, channels, automation, wav_path=full)
+            except Exception as e:
+                print(f"#### Internode VST Render Error: {e}")
+            if buf is None and not render_to_disk:
+                buf = np.zeros((channels, total_samples), dtype=np.float32)
+        else:
+            with PLUGIN_POOL.checkout(vst_path, sr) as plugin:
+                if not plugin: raise RuntimeError("VST Load Failed")
+                
+                # Apply static parameter overrides
+                apply_params(plugin, params, warn=not params_checked)
+
+                try:
+                    render_instrument(plugin, events, sr, total_samples, out, block_size=block_size, num_channels=channels, automation=automation)
+                except Exception as e:
+                    print(f"#### Internode VST Render Error: {e}")
+
+        if render_to_disk:
+            out.flush()
+            del out
+            # Copy-on-write: in-place ops downstream must not rewrite the saved file
+            tensor = torch.from_numpy(map_float_wav(full, channels, total_samples, mode="c").T).unsqueeze(0) # [1, 2, Samples], backed by the file
+        else:
+            tensor = torch.from_numpy(buf).unsqueeze(0) # [1, 2, Samples]
         return ({"waveform": tensor, "sample_rate": sr},)
 
 
@@ -207,6 +473,14 @@ class InternodeVST3Effect:
                 "param_2": ("VST_PARAM",),
                 "param_3": ("VST_PARAM",),
                 "param_4": ("VST_PARAM",),
+                "max_workers": ("INT", {"default": 4, "min": 1, "max": 64, "tooltip": "Batch items rendered concurrently, each on its own pooled plugin instance. Also bounded by INTERNODE_VST_POOL_SIZE."}),
+                "skip_silence": ("BOOLEAN", {"default": False, "tooltip": "Only run the plugin over non-silent regions (plus tail_seconds). Everything else is silent on the wet path."}),
+                "silence_threshold_db": ("FLOAT", {"default": -60.0, "min": -120.0, "max": 0.0, "step": 1.0}),
+                "tail_seconds": ("FLOAT", {"default": 2.0, "min": 0.0, "max": 30.0, "step": 0.1, "tooltip": "Extra audio rendered after each active region so reverb/delay tails ring out."}),
+                "segment_seconds": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 3600.0, "step": 1.0, "tooltip": "0 = off. Splits each item into segments of this length and renders them in parallel (max_workers instances). For effects with a bounded tail: EQs, saturators, compressors, short reverbs."}),
+                "segment_preroll_seconds": ("FLOAT", {"default": -1.0, "min": -1.0, "max": 60.0, "step": 0.1, "tooltip": "Audio rendered before each segment to warm up plugin state. Should cover the effect's tail. -1 measures it from an impulse response."}),
+                "installed_plugin": installed_plugin_input(),
+                "host_mode": host_mode_input(),
             }
         }
 
@@ -214,60 +488,191 @@ class InternodeVST3Effect:
     FUNCTION = "process_fx"
     CATEGORY = "Internode/VST3"
 
-    def process_fx(self, audio, vst_path, dry_wet, **kwargs):
+    @classmethod
+    def VALIDATE_INPUTS(s, vst_path=None, installed_plugin=NO_PLUGIN):
+        return validate_vst_path(vst_path, installed_plugin)
+
+    def process_fx(self, audio, vst_path, dry_wet, skip_silence=False, silence_threshold_db=-60.0, tail_seconds=2.0, max_workers=4, segment_seconds=0.0, segment_preroll_seconds=-1.0, installed_plugin=NO_PLUGIN, host_mode="in_process", **kwargs):
         if not PEDALBOARD_AVAILABLE: return (audio,)
+        vst_path = resolve_vst_path(vst_path, installed_plugin)
         
         waveform = audio["waveform"]
         sr = audio["sample_rate"]
         
-        plugin = load_vst_plugin(vst_path)
-        if not plugin: return (audio,)
-
-        # Collect automations
-        automations = {}
-        for k, v in kwargs.items():
-            if v and "name" in v:
-                automations[v["name"]] = v["value"]
-
-        # Apply Automation (Static for now, per batch)
-        for name, val in automations.items():
-            if name in plugin.parameters:
-                plugin.parameters[name].raw_value = val
-
-        batch_out = []
-        for i in range(waveform.shape[0]):
-            audio_np = waveform[i].cpu().numpy() # [Channels, Samples]
-            
-            # Ensure stereo for Pedalboard
-            if audio_np.shape[0] == 1:
-                audio_np = np.repeat(audio_np, 2, axis=0)
+        # Static values are set once per instance; curves are applied while rendering
+        automations = collect_params(kwargs)
+        curves = collect_automation(kwargs)
+        check_param_names(vst_path, automations)
+
+        if host_mode == "out_of_process":
+            link = [{"path": vst_path, "params": automations}]
+            open_renderer = lambda: host_renderer(link, sr)
+        else:
+            open_renderer = lambda: local_renderer(lambda: open_plugin(vst_path, sr, automations), sr)
+
+        open_renderer, max_workers = self._segmenting(open_renderer, sr, max_workers, skip_silence, segment_seconds, segment_preroll_seconds)
+        batch_out = self._render_batch(
+            waveform, sr, open_renderer, max_workers,
+            dry_wet, skip_silence, silence_threshold_db, tail_seconds, curves,
+        )
+        if batch_out is None: return (audio,)
+        return ({"waveform": torch.stack(batch_out), "sample_rate": sr},)
 
-            try:
-                # OPTIMIZATION: Process entire track at once.
-                # Pedalboard handles buffering internally in C++.
-                processed = plugin.process(audio_np, sr)
-            except Exception as e:
-                print(f"#### Internode VST Process Error: {e}")
-                processed = audio_np
-
-            # Dry/Wet
-            if dry_wet < 1.0:
-                # Handle channel expansion (Mono in -> Stereo out)
-                if processed.shape[0] != audio_np.shape[0]:
-                    if audio_np.shape[0] == 1: 
-                        audio_np = np.repeat(audio_np, processed.shape[0], axis=0)
-                    elif processed.shape[0] == 1:
-                        processed = np.repeat(processed, audio_np.shape[0], axis=0)
-                
-                # Length mismatch check
-                min_len = min(processed.shape[1], audio_np.shape[1])
-                processed = processed[:, :min_len]
-                audio_np = audio_np[:, :min_len]
-                
-                processed = (processed * dry_wet) + (audio_np * (1.0 - dry_wet))
+    def _segmenting(self, open_renderer, sr, max_workers, skip_silence, segment_seconds, preroll_seconds):
+        """Swaps in the segment-parallel renderer; items then run one at a time and workers go to segments."""
+        if segment_seconds <= 0 or skip_silence:
+            # skip_silence already renders regions independently
+            return open_renderer, max_workers
+        preroll = [None if preroll_seconds < 0 else int(preroll_seconds * sr)]
+        return (lambda: segmented_renderer(open_renderer, sr, segment_seconds, preroll, max_workers)), 1
+
+    def _render_batch(self, waveform, sr, open_renderer, max_workers, *item_args):
+        """Renders every batch item through its own renderer from open_renderer(); None on load failure."""
+        def run(wav):
+            # Every worker checks out its own instance(s) carrying the same parameter state
+            with open_renderer() as render:
+                if render is None: return None
+                return self._process_item(render, wav, sr, *item_args)
+
+        items = [waveform[i] for i in range(waveform.shape[0])]
+        workers = max(1, min(max_workers, len(items)))
+        if workers == 1:
+            batch_out = [run(wav) for wav in items]
+        else:
+            # Pedalboard releases the GIL while rendering, so threads scale across cores.
+            # map() yields results in submission order.
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                batch_out = list(pool.map(run, items))
+
+        if any(out is None for out in batch_out): return None
+        return batch_out
+
+    def _process_item(self, render, wav, sr, dry_wet, skip_silence, silence_threshold_db, tail_seconds, automation=None):
+        audio_np = wav.cpu().numpy() # [Channels, Samples]
+        
+        # Ensure stereo for Pedalboard
+        if audio_np.shape[0] == 1:
+            audio_np = np.repeat(audio_np, 2, axis=0)
+
+        try:
+            regions = active_regions(audio_np, sr, silence_threshold_db, tail_seconds) if skip_silence else None
+            processed = render(audio_np, regions, automation)
+        except Exception as e:
+            print(f"#### Internode VST Process Error: {e}")
+            processed = audio_np
+
+        # Dry/Wet
+        if dry_wet < 1.0:
+            # Handle channel expansion (Mono in -> Stereo out)
+            if processed.shape[0] != audio_np.shape[0]:
+                if audio_np.shape[0] == 1: 
+                    audio_np = np.repeat(audio_np, processed.shape[0], axis=0)
+                elif processed.shape[0] == 1:
+                    processed = np.repeat(processed, audio_np.shape[0], axis=0)
+            
+            # Length mismatch check
+            min_len = min(processed.shape[1], audio_np.shape[1])
+            processed = processed[:, :min_len]
+            audio_np = audio_np[:, :min_len]
             
-            batch_out.append(torch.from_numpy(processed))
+            processed = (processed * dry_wet) + (audio_np * (1.0 - dry_wet))
+        
+        return torch.from_numpy(processed)
+
+class InternodeVST3ChainLink:
+    """
+    Appends one plugin (and its parameter set) to a VST_CHAIN.
+    Link several of these, then render the whole chain with InternodeVST3Chain.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "vst_path": ("STRING", {"default": r"C:\Program Files\Common Files\VST3\Effect.vst3"}),
+            },
+            "optional": {
+                "chain": ("VST_CHAIN",),
+                "param_1": ("VST_PARAM",),
+                "param_2": ("VST_PARAM",),
+                "param_3": ("VST_PARAM",),
+                "param_4": ("VST_PARAM",),
+                "installed_plugin": installed_plugin_input(),
+            }
+        }
+
+    RETURN_TYPES = ("VST_CHAIN",)
+    FUNCTION = "add_link"
+    CATEGORY = "Internode/VST3"
 
+    @classmethod
+    def VALIDATE_INPUTS(s, vst_path=None, installed_plugin=NO_PLUGIN):
+        return validate_vst_path(vst_path, installed_plugin)
+
+    def add_link(self, vst_path, chain=None, installed_plugin=NO_PLUGIN, **kwargs):
+        vst_path = resolve_vst_path(vst_path, installed_plugin)
+        params = collect_params(kwargs)
+        check_param_names(vst_path, params)
+        return ((chain or []) + [{"path": vst_path, "params": params}],)
+
+
+class InternodeVST3Chain(InternodeVST3Effect):
+    """
+    Renders an ordered VST_CHAIN as a single Pedalboard: one tensor/numpy
+    conversion, one stereo expansion and one dry/wet stage for the whole
+    chain instead of one per plugin.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "audio": ("AUDIO",),
+                "chain": ("VST_CHAIN",),
+                "dry_wet": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 1.0, "step": 0.01}),
+            },
+            "optional": {
+                "max_workers": ("INT", {"default": 4, "min": 1, "max": 64, "tooltip": "Batch items rendered concurrently, each on its own set of pooled instances."}),
+                "skip_silence": ("BOOLEAN", {"default": False}),
+                "silence_threshold_db": ("FLOAT", {"default": -60.0, "min": -120.0, "max": 0.0, "step": 1.0}),
+                "tail_seconds": ("FLOAT", {"default": 2.0, "min": 0.0, "max": 30.0, "step": 0.1}),
+                "segment_seconds": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 3600.0, "step": 1.0, "tooltip": "0 = off. Renders segments of each item in parallel, e.g. for mastering long mixes."}),
+                "segment_preroll_seconds": ("FLOAT", {"default": -1.0, "min": -1.0, "max": 60.0, "step": 0.1, "tooltip": "-1 measures the chain's tail from an impulse response."}),
+                "host_mode": host_mode_input(),
+            }
+        }
+
+    RETURN_TYPES = ("AUDIO",)
+    FUNCTION = "process_chain"
+    CATEGORY = "Internode/VST3"
+
+    @classmethod
+    def VALIDATE_INPUTS(s):
+        # Each link already validated its own path
+        return True
+
+    def process_chain(self, audio, chain, dry_wet, max_workers=4, skip_silence=False, silence_threshold_db=-60.0, tail_seconds=2.0, segment_seconds=0.0, segment_preroll_seconds=-1.0, host_mode="in_process"):
+        if not PEDALBOARD_AVAILABLE or not chain: return (audio,)
+
+        # A worker holds every instance of its chain at once, so keep the
+        # concurrent demand within the pool or workers would wait on each other
+        per_plugin = max(Counter(link["path"] for link in chain).values())
+        if per_plugin > PLUGIN_POOL.max_instances:
+            raise RuntimeError(f"Chain uses one plugin {per_plugin} times but INTERNODE_VST_POOL_SIZE is {PLUGIN_POOL.max_instances}.")
+
+        sr = audio["sample_rate"]
+        if host_mode == "out_of_process":
+            # Each host process has its own pool, so only the process count limits concurrency
+            max_workers = max(1, min(max_workers, HOST_POOL.size))
+            open_renderer = lambda: host_renderer(chain, sr)
+        else:
+            max_workers = max(1, min(max_workers, PLUGIN_POOL.max_instances // per_plugin))
+            open_renderer = lambda: local_renderer(lambda: open_chain(chain, sr), sr)
+
+        open_renderer, max_workers = self._segmenting(open_renderer, sr, max_workers, skip_silence, segment_seconds, segment_preroll_seconds)
+        batch_out = self._render_batch(
+            audio["waveform"], sr, open_renderer, max_workers,
+            dry_wet, skip_silence, silence_threshold_db, tail_seconds,
+        )
+        if batch_out is None: return (audio,)
         return ({"waveform": torch.stack(batch_out), "sample_rate": sr},)
 
 # --- BACKWARD COMPATIBILITY NODE ---
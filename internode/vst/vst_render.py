@@ -0,0 +1,218 @@
+# ComfyUI/custom_nodes/ComfyUI-Internode/internode/vst/vst_render.py
+# VERSION: 3.6.0
+#
+# Block-streaming render loops for pedalboard plugins. Numpy only (no torch,
+# no ComfyUI) so the same code can run inside any host process.
+
+import struct
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 8192
+# RIFF/RF64 header + ds64 (or JUNK) + fmt + fact + data chunk headers
+WAV_HEADER_BYTES = 94
+# Automation curves are evaluated on this sample grid (~0.7ms at 44.1kHz)
+AUTOMATION_RESOLUTION = 32
+DEFAULT_AUTOMATION_TOLERANCE = 0.002
+# Longest impulse response measure_tail() will look for
+MAX_MEASURED_TAIL_SECONDS = 10.0
+
+
+def midi_to_events(midi_data):
+    """
+    Flattens a mido.MidiFile into (times_seconds, [raw_bytes, ...]) sorted by
+    time. Iterating a MidiFile already applies the tempo map; meta messages
+    are dropped because plugins never see them.
+    """
+    times, payloads = [], []
+    now = 0.0
+    for msg in midi_data:
+        now += msg.time
+        if msg.is_meta: continue
+        times.append(now)
+        payloads.append(bytes(msg.bytes()))
+    return np.asarray(times, dtype=np.float64), payloads
+
+
+def open_float_wav(path, num_channels, num_frames, sample_rate):
+    """
+    Creates a 32-bit float WAV of the final size and returns its data section
+    as a writable [num_frames, num_channels] memmap. The header is complete
+    from the start, so the file is readable while it is still being filled.
+    Files over 4 GB are written as RF64; smaller ones keep a JUNK chunk
+    where the ds64 chunk would go, so the data always starts at
+    WAV_HEADER_BYTES.
+    """
+    block_align = 4 * num_channels
+    data_bytes = block_align * num_frames
+    riff_bytes = WAV_HEADER_BYTES - 8 + data_bytes
+    rf64 = riff_bytes > 0xFFFFFFFF
+    if rf64:
+        head = [b"RF64", struct.pack("<I", 0xFFFFFFFF), b"WAVE", b"ds64", struct.pack("<IQQQI", 28, riff_bytes, data_bytes, num_frames, 0)]
+    else:
+        head = [b"RIFF", struct.pack("<I", riff_bytes), b"WAVE", b"JUNK", struct.pack("<I", 28), bytes(28)]
+    header = b"".join(head + [
+        # WAVE_FORMAT_IEEE_FLOAT takes the 18-byte fmt (cbSize = 0) and a fact chunk
+        b"fmt ", struct.pack("<IHHIIHHH", 18, 3, num_channels, sample_rate, sample_rate * block_align, block_align, 32, 0),
+        b"fact", struct.pack("<II", 4, min(num_frames, 0xFFFFFFFF)),
+        b"data", struct.pack("<I", 0xFFFFFFFF if rf64 else data_bytes),
+    ])
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(WAV_HEADER_BYTES + data_bytes)
+    return map_float_wav(path, num_channels, num_frames)
+
+
+def map_float_wav(path, num_channels, num_frames, mode="r+"):
+    """Maps the data section of a WAV written by open_float_wav as [num_frames, num_channels]."""
+    return np.memmap(path, dtype=np.float32, mode=mode, offset=WAV_HEADER_BYTES, shape=(num_frames, num_channels))
+
+
+def curve_at(curve, fps, positions, total_frames, sample_rate):
+    """
+    Linearly interpolates a per-frame curve at the given sample positions.
+    fps <= 0 stretches the curve over total_frames, otherwise frame k lands
+    at k / fps seconds; both ends are held.
+    """
+    curve = np.asarray(curve, dtype=np.float64).reshape(-1)
+    if curve.size == 1: return np.full(len(positions), curve[0])
+    if fps > 0:
+        x = np.arange(curve.size) * (sample_rate / fps)
+    else:
+        x = np.linspace(0, max(total_frames - 1, 1), curve.size)
+    return np.interp(positions, x, curve)
+
+
+def automation_plan(automation, start, end, total_frames, sample_rate, resolution=AUTOMATION_RESOLUTION):
+    """
+    Splits [start, end) into blocks that only break where some parameter
+    moves by more than its tolerance. `automation` is a list of
+    (name, curve, fps, tolerance). Returns the block start positions and a
+    [num_params, num_blocks] array of the values to apply at each start.
+    """
+    grid = np.arange(start, end, max(1, int(resolution)))
+    values = np.stack([np.clip(curve_at(c, fps, grid, total_frames, sample_rate), 0.0, 1.0) for _, c, fps, _ in automation])
+    tol = np.array([max(t, 1e-6) for *_, t in automation])[:, None]
+    # A block starts wherever any quantized parameter differs from the previous grid point
+    q = np.round(values / tol)
+    starts = np.concatenate([[0], np.flatnonzero(np.any(q[:, 1:] != q[:, :-1], axis=0)) + 1])
+    return grid[starts], values[:, starts]
+
+
+def set_param_values(plugin, names, values):
+    for name, value in zip(names, values):
+        plugin.parameters[name].raw_value = float(value)
+
+
+def render_automated(plugin, audio, sample_rate, automation, offset=0, total_frames=None, resolution=AUTOMATION_RESOLUTION):
+    """
+    Processes a [C, N] block of audio (starting at `offset` within the full
+    track of total_frames samples) with parameter changes applied between
+    sub-blocks. Flat stretches of automation render as one long call.
+    """
+    n = audio.shape[1]
+    total_frames = total_frames or offset + n
+    names = [a[0] for a in automation]
+    starts, values = automation_plan(automation, offset, offset + n, total_frames, sample_rate, resolution)
+    bounds = np.append(starts - offset, n)
+
+    out = None
+    for i in range(len(starts)):
+        a, b = bounds[i], bounds[i + 1]
+        set_param_values(plugin, names, values[:, i])
+        wet = plugin.process(audio[:, a:b], sample_rate, reset=(i == 0))
+        if out is None:
+            out = np.zeros((wet.shape[0], n), dtype=np.float32)
+        out[:, a:a + wet.shape[1]] = wet[:, :b - a]
+    return out
+
+
+def supported_automation(processor, automation):
+    """Drops curves for parameters the processor does not expose (e.g. a whole Pedalboard)."""
+    known = getattr(processor, "parameters", None) or {}
+    return [a for a in (automation or []) if a[0] in known]
+
+
+def render_regions(processor, audio, sample_rate, regions, automation=None):
+    """
+    Processes only the given (start, end) ranges of a [C, N] array; the
+    rest of the output is silent. Each region starts from a clean state.
+    """
+    out = None
+    for a, b in regions:
+        if automation:
+            wet = render_automated(processor, audio[:, a:b], sample_rate, automation, offset=a, total_frames=audio.shape[1])
+        else:
+            wet = processor.process(audio[:, a:b], sample_rate, reset=True)
+        if out is None:
+            out = np.zeros((wet.shape[0], audio.shape[1]), dtype=np.float32)
+        out[:, a:a + wet.shape[1]] = wet[:, :b - a]
+    if out is None:
+        out = np.zeros_like(audio)
+    return out
+
+
+def render_effect(processor, audio, sample_rate, regions=None, automation=None, offset=0, total_frames=None):
+    """
+    Wet signal of a plugin or Pedalboard over a [C, N] array. offset and
+    total_frames place a segment within the full track so automation curves
+    line up.
+    """
+    automation = supported_automation(processor, automation)
+    if regions is not None:
+        return render_regions(processor, audio, sample_rate, regions, automation)
+    if automation:
+        # Splits only where a curve actually moves
+        return render_automated(processor, audio, sample_rate, automation, offset, total_frames)
+    # Whole track in one call; Pedalboard handles buffering internally in C++
+    return processor.process(audio, sample_rate)
+
+
+def measure_tail(process, sample_rate, num_channels=2, max_seconds=MAX_MEASURED_TAIL_SECONDS, threshold_db=-80.0):
+    """
+    Length in samples of an effect's impulse response, i.e. how long its
+    state keeps influencing the output. `process` maps a [C, N] array to the
+    wet signal. Returns the full window for effects that never decay.
+    """
+    n = int(max_seconds * sample_rate)
+    impulse = np.zeros((num_channels, n), dtype=np.float32)
+    impulse[:, 0] = 1.0
+    wet = np.abs(np.asarray(process(impulse))).max(axis=0)
+    above = np.flatnonzero(wet > 10.0 ** (threshold_db / 20.0))
+    return int(above[-1]) + 1 if above.size else 0
+
+
+def render_instrument(plugin, events, sample_rate, num_frames, out, block_size=DEFAULT_BLOCK_SIZE, num_channels=2, automation=None, progress=None):
+    """
+    Streams MIDI into an instrument one block at a time, writing each block
+    into `out` (a [num_frames, num_channels] array or memmap) as it is
+    rendered. Only one block of audio is ever held outside `out`.
+    `events` is the (times, payloads) pair from midi_to_events(). Blocks are
+    also split wherever an automated parameter changes.
+    """
+    times, payloads = events
+    block_size = max(1, int(block_size))
+    starts = np.arange(0, num_frames, block_size)
+    changes, values = None, None
+    automation = supported_automation(plugin, automation)
+    if automation:
+        names = [a[0] for a in automation]
+        changes, values = automation_plan(automation, 0, num_frames, num_frames, sample_rate)
+        starts = np.union1d(starts, changes)
+    edges = np.append(starts, num_frames)
+    # Block index boundaries into the (sorted) event list, found in one call
+    bounds = np.searchsorted(times, edges / sample_rate, side="left")
+    # Index of the automation step in effect at each block start
+    steps = np.searchsorted(changes, starts, side="right") - 1 if automation else None
+
+    for i, start in enumerate(starts):
+        n = edges[i + 1] - start
+        if automation and (i == 0 or steps[i] != steps[i - 1]):
+            set_param_values(plugin, names, values[:, steps[i]])
+        t0 = start / sample_rate
+        # Timestamps are relative to the start of the buffer being rendered
+        block_events = [(payloads[j], times[j] - t0) for j in range(bounds[i], bounds[i + 1])]
+        audio = plugin.process(block_events, n / sample_rate, sample_rate, num_channels=num_channels, buffer_size=block_size, reset=False)
+        n = min(n, audio.shape[1])
+        out[start:start + n, :audio.shape[0]] = audio[:, :n].T
+        if progress: progress(start + n, num_frames)
+    return out
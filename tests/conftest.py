@@ -0,0 +1,7 @@
+# Tests cover the pure helper modules (no ComfyUI needed). Node-level tests
+# skip themselves when ComfyUI's folder_paths is not importable.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
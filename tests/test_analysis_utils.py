@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import torch
+
+from internode.analysis.analysis_utils import (
+    ema, local_peaks, format_schedule, mono_batch, unbatch, resample_curves, normalize_rows, decimate, scaled_fft_size,
+)
+
+
+def test_resample_matches_np_interp():
+    rows = np.random.default_rng(0).random((3, 17))
+    out = resample_curves(rows, 40)
+    for row, res in zip(rows, out):
+        assert np.allclose(res, np.interp(np.linspace(0, 17, 40), np.arange(17), row))
+
+
+def test_ema_matches_the_recursion():
+    x = np.random.default_rng(1).random((2, 50))
+    ref = np.zeros_like(x)
+    prev = np.zeros(2)
+    for i in range(50):
+        prev = 0.8 * prev + 0.2 * x[:, i]
+        ref[:, i] = prev
+    assert np.allclose(ema(x, 0.8), ref)
+    assert np.array_equal(ema(x, 0.0), x)
+
+
+def test_normalize_and_peaks():
+    x = np.array([[0.0, 2.0, 1.0, 4.0, 0.0], [0.0, 0.0, 0.0, 0.0, 0.0]])
+    n = normalize_rows(x)
+    assert n[0].max() == 1.0 and np.array_equal(n[1], x[1])
+    assert local_peaks(n, 0.3).tolist() == [[0.0, 1.0, 0.0, 1.0, 0.0], [0.0] * 5]
+
+
+def test_format_schedule():
+    assert format_schedule([0.5, 0.25]) == "0:(0.500),\n1:(0.250)"
+    assert format_schedule([]) == ""
+
+
+def test_batch_helpers():
+    assert mono_batch(torch.ones(2, 2, 10)).shape == (2, 10)
+    assert mono_batch(torch.ones(2, 10)).shape == (1, 10)
+    assert unbatch([5]) == 5 and unbatch([1, 2]) == [1, 2]
+
+
+def test_decimate_and_fft_scaling():
+    y = torch.randn(2, 44100)
+    same, rate = decimate(y, 44100, "Full")
+    assert same is y and rate == 44100
+    low, rate = decimate(y, 44100, "11025")
+    assert rate == 11025 and low.shape == (2, 11025)
+    assert scaled_fft_size(2048, 44100, 11025) == 512
+    assert scaled_fft_size(2048, 44100, 44100) == 2048
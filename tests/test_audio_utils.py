@@ -0,0 +1,56 @@
+import pytest
+import torch
+
+from internode.dsp.audio_utils import plan_segments, crossfade_stitch, moving_average, detect_active_regions
+
+
+@pytest.mark.parametrize("length,segment,overlap", [
+    (1000, 300, 50), (1000, 300, 0), (1000, 300, 200), (1000, 64, 63), (1000, 2000, 10), (7, 3, 1),
+])
+def test_segments_cover_everything_with_the_requested_overlap(length, segment, overlap):
+    segs = plan_segments(length, segment, overlap)
+    assert segs[0][0] == 0 and segs[-1][1] == length
+    for (a0, a1), (b0, b1) in zip(segs, segs[1:]):
+        assert a1 - b0 == min(overlap, a1 - a0) or a1 == length
+        assert b0 > a0
+
+
+@pytest.mark.parametrize("length,segment,overlap", [
+    (1000, 300, 50), (1000, 300, 200), (1000, 64, 63), (4096, 500, 499), (1000, 2000, 10),
+])
+def test_crossfade_stitch_round_trip(length, segment, overlap):
+    x = torch.randn(2, length)
+    segs = plan_segments(length, segment, overlap)
+    out = crossfade_stitch([x[:, a:b].clone() for a, b in segs], segs, length)
+    assert torch.allclose(out, x, atol=1e-5)
+
+
+def test_crossfade_stitch_with_triple_overlap():
+    # Last segment shifted back into the one before its neighbour
+    x = torch.randn(1, 958)
+    segs = [(0, 256), (224, 480), (448, 704), (672, 928), (702, 958)]
+    out = crossfade_stitch([x[:, a:b] for a, b in segs], segs, 958)
+    assert torch.allclose(out, x, atol=1e-5)
+
+
+def test_crossfade_blends_overlaps_linearly():
+    segs = [(0, 6), (2, 8)]
+    out = crossfade_stitch([torch.zeros(6), torch.ones(6)], segs, 8)
+    assert out[:2].tolist() == [0.0, 0.0] and out[-2:].tolist() == [1.0, 1.0]
+    assert torch.all(out[2:6].diff() > 0)
+
+
+def test_moving_average_matches_avg_pool():
+    x = torch.randn(3, 500)
+    ref = torch.nn.functional.avg_pool1d(x.unsqueeze(1), 9, stride=1, padding=4, count_include_pad=True).squeeze(1)
+    assert torch.allclose(moving_average(x, 9), ref, atol=1e-6)
+
+
+def test_detect_active_regions_finds_the_burst():
+    sr = 8000
+    y = torch.zeros(1, sr * 4)
+    y[0, sr:2 * sr] = torch.randn(sr) * 0.5
+    regions = detect_active_regions(y, sr, threshold_db=-50.0, pad_ms=100.0)
+    assert len(regions) == 1
+    a, b = regions[0]
+    assert sr - 0.15 * sr <= a <= sr and 2 * sr <= b <= 2 * sr + 0.15 * sr
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import torch
+
+from internode.dsp.audio_utils import curve_to_audio_rate
+
+
+@pytest.mark.parametrize("wrap", [list, np.asarray, torch.tensor])
+def test_curve_container_types_agree(wrap):
+    curve = wrap([0.0, 1.0, 0.5])
+    out = curve_to_audio_rate(curve, 101)
+    ref = curve_to_audio_rate([0.0, 1.0, 0.5], 101)
+    assert torch.equal(out, ref)
+    assert out[0] == 0.0 and out[50] == pytest.approx(1.0) and out[-1] == pytest.approx(0.5)
+
+
+def test_curve_fps_holds_last_value():
+    # 3 frames at 10 fps span 0.2 s; the rest of the 1 s buffer holds the last value
+    out = curve_to_audio_rate([0.0, 1.0, 2.0], 1000, sample_rate=1000, fps=10.0)
+    assert out.shape == (1000,)
+    assert out[100] == pytest.approx(1.0)
+    assert torch.all(out[200:] == 2.0)
+
+
+def test_empty_curve_rejected():
+    with pytest.raises(ValueError):
+        curve_to_audio_rate([], 10)
+
+
+@pytest.mark.parametrize("curve", [None, [], np.zeros(0), torch.zeros(0)])
+def test_mixer_unautomated_channel_stays_scalar(curve):
+    pytest.importorskip("folder_paths")
+    from internode.dsp.dsp_nodes import InternodeAudioMixer
+    assert InternodeAudioMixer()._automate(curve, 0.7, 100, 44100, 0.0, None) == 0.7
+
+
+@pytest.mark.parametrize("wrap", [list, np.asarray, torch.tensor])
+def test_mixer_automates_array_curves(wrap):
+    pytest.importorskip("folder_paths")
+    from internode.dsp.dsp_nodes import InternodeAudioMixer
+    lane = InternodeAudioMixer()._automate(wrap([0.0, 1.0]), 0.7, 11, 44100, 0.0, None)
+    assert torch.allclose(lane, torch.linspace(0.0, 1.0, 11))
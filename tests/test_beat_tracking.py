@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import torch
+
+from internode.analysis.beat_tracking import detect_beats, estimate_tempo, onset_envelope, trigger_curve
+
+SR = 22050
+
+
+def click_track(bpm, seconds=20.0, start=0.5, sr=SR):
+    times = np.arange(start, seconds - 0.5, 60.0 / bpm)
+    y = torch.zeros(1, int(seconds * sr))
+    for t in times:
+        s = int(round(t * sr))
+        y[0, s:s + 64] = torch.linspace(1.0, 0.0, 64)
+    return y, times
+
+
+@pytest.mark.parametrize("signal", [torch.zeros(1, SR * 8), torch.full((1, SR * 8), 0.5)])
+def test_silence_has_no_tempo(signal):
+    res = detect_beats(signal, SR)[0]
+    assert res["bpm"] == 0.0
+    assert len(res["beat_times"]) == 0 and len(res["onset_times"]) == 0
+
+
+@pytest.mark.parametrize("bpm", [90.0, 120.0, 150.0])
+def test_click_track_tempo_and_beat_times(bpm):
+    y, times = click_track(bpm)
+    res = detect_beats(y, SR)[0]
+    assert res["bpm"] == pytest.approx(bpm, rel=0.01)
+    beats = res["beat_times"]
+    assert abs(len(beats) - len(times)) <= 1
+    err = np.array([beats[np.argmin(np.abs(beats - t))] - t for t in times])
+    hop_seconds = 512 / SR
+    # No systematic lead or lag, each beat within one envelope frame
+    assert abs(err.mean()) < 0.25 * hop_seconds
+    assert np.abs(err).max() < hop_seconds
+
+
+@pytest.mark.parametrize("min_bpm,max_bpm", [(60.0, 200.0), (100.0, 140.0), (130.0, 180.0)])
+def test_tempo_stays_in_range(min_bpm, max_bpm):
+    y = torch.cat([click_track(120.0)[0], torch.zeros(1, SR * 4), torch.randn(1, SR * 4) * 0.05], dim=-1)
+    env, frame_rate = onset_envelope(y, SR)
+    bpm, period = estimate_tempo(env, frame_rate, min_bpm, max_bpm)
+    assert min_bpm <= float(bpm[0]) <= max_bpm
+    assert float(period[0]) == pytest.approx(60.0 * frame_rate / float(bpm[0]))
+
+
+def test_batch_items_are_independent():
+    a, _ = click_track(100.0)
+    b, _ = click_track(140.0)
+    res = detect_beats(torch.cat([a, torch.zeros_like(a), b]), SR)
+    assert [round(r["bpm"]) for r in res] == [100, 0, 140]
+
+
+def test_trigger_curve_pulses_and_decay():
+    assert trigger_curve([0.0, 0.5], 4, 4).tolist() == [1.0, 0.0, 1.0, 0.0]
+    assert trigger_curve([0.25], 4, 4, decay=0.5).tolist() == [0.0, 1.0, 0.5, 0.25]
+    assert trigger_curve([], 3, 24).tolist() == [0.0, 0.0, 0.0]
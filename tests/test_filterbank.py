@@ -0,0 +1,34 @@
+import pytest
+import torch
+
+from internode.analysis.filterbank import filterbank, band_edges, band_energies, hz_to_mel, mel_to_hz
+
+
+@pytest.mark.parametrize("scale", ["Mel", "Log"])
+@pytest.mark.parametrize("bands", [3, 16, 64])
+def test_rows_are_normalized_and_ordered(scale, bands):
+    fb = filterbank(bands, 2048, 44100, 30.0, 16000.0, scale)
+    assert fb.shape == (bands, 1025)
+    assert torch.allclose(fb.sum(dim=1), torch.ones(bands))
+    centers = (fb * torch.arange(1025)).sum(dim=1)
+    assert torch.all(centers.diff() >= 0)
+
+
+def test_tone_lands_in_the_matching_band():
+    sr, n_fft = 44100, 2048
+    edges = band_edges(8, 40.0, 16000.0)
+    t = torch.arange(n_fft * 8) / sr
+    for k in range(8):
+        f = float(edges[k + 1]) # center of band k
+        spec = torch.stft(torch.sin(2 * torch.pi * f * t), n_fft, 512, window=torch.hann_window(n_fft), return_complex=True).abs()
+        energy = band_energies(spec, filterbank(8, n_fft, sr, 40.0, 16000.0)).mean(dim=-1)
+        assert int(energy.argmax()) == k
+
+
+def test_mel_conversion_round_trip():
+    assert mel_to_hz(hz_to_mel(1000.0)) == pytest.approx(1000.0)
+
+
+def test_invalid_range_rejected():
+    with pytest.raises(ValueError):
+        filterbank(8, 1024, 8000, 5000.0, 20000.0)
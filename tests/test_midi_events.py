@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+mido = pytest.importorskip("mido")
+
+from internode.vst.midi_events import load_midi_events, events_from_midi, events_to_midi, midi_messages, ticks_to_seconds
+from internode.vst.vst_render import midi_to_events
+
+
+def build_song():
+    mid = mido.MidiFile(ticks_per_beat=480)
+    conductor, keys, bass = mido.MidiTrack(), mido.MidiTrack(), mido.MidiTrack()
+    mid.tracks += [conductor, keys, bass]
+    conductor.append(mido.MetaMessage("set_tempo", tempo=500000, time=0))
+    conductor.append(mido.MetaMessage("set_tempo", tempo=250000, time=960)) # 120 -> 240 BPM at beat 2
+    keys.append(mido.Message("program_change", channel=1, program=5, time=0))
+    for i in range(8):
+        keys.append(mido.Message("note_on", channel=1, note=60 + i, velocity=100, time=0 if i == 0 else 120))
+        keys.append(mido.Message("note_off", channel=1, note=60 + i, velocity=40, time=240))
+    bass.append(mido.Message("control_change", channel=2, control=7, value=90, time=100))
+    bass.append(mido.Message("pitchwheel", channel=2, pitch=-8192, time=200))
+    bass.append(mido.Message("pitchwheel", channel=2, pitch=8191, time=10))
+    bass.append(mido.Message("aftertouch", channel=2, value=33, time=10))
+    bass.append(mido.Message("polytouch", channel=2, note=40, value=21, time=10))
+    bass.append(mido.Message("note_on", channel=2, note=40, velocity=90, time=500))
+    bass.append(mido.Message("note_off", channel=2, note=40, velocity=0, time=900))
+    return mid
+
+
+def test_messages_match_mido_timing_and_bytes():
+    mid = build_song()
+    times, payloads = midi_messages(events_from_midi(mid))
+    ref_times, ref_payloads = midi_to_events(mid)
+    assert np.allclose(times, ref_times, atol=1e-9)
+    assert payloads == ref_payloads
+
+
+def test_tempo_map_seconds():
+    mid = build_song()
+    ev = events_from_midi(mid)
+    # Beat 2 is at 1.0 s (120 BPM); after that a beat lasts 0.25 s
+    assert ticks_to_seconds(np.array([960, 1440]), ev["tempos"], 480) == pytest.approx([1.0, 1.25])
+    assert ev["length"] == pytest.approx(midi_to_events(mid)[0][-1], abs=1e-9)
+
+
+def test_note_on_zero_velocity_becomes_note_off():
+    mid = mido.MidiFile()
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+    track.append(mido.Message("note_on", note=64, velocity=80, time=0))
+    track.append(mido.Message("note_on", note=64, velocity=0, time=480))
+    _, payloads = midi_messages(events_from_midi(mid))
+    assert payloads == [bytes([0x90, 64, 80]), bytes([0x80, 64, 0])]
+
+
+def test_round_trip_through_mido():
+    ev = events_from_midi(build_song())
+    again = events_from_midi(events_to_midi(ev))
+    assert np.array_equal(again["events"]["tick"], ev["events"]["tick"])
+    assert np.allclose(again["events"]["seconds"], ev["events"]["seconds"])
+    assert midi_messages(again)[1] == midi_messages(ev)[1]
+
+
+def test_load_is_cached_per_mtime(tmp_path):
+    path = str(tmp_path / "song.mid")
+    build_song().save(path)
+    first = load_midi_events(path)
+    assert load_midi_events(path) is first
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from internode.vst.plugin_pool import VSTPluginPool
+
+
+class Param:
+    def __init__(self, value): self.raw_value = value
+
+
+class FakePlugin:
+    def __init__(self, path):
+        self.path = path
+        self.parameters = {"mix": Param(0.5)}
+        self.resets = 0
+
+    def reset(self): self.resets += 1
+
+
+class Factory:
+    def __init__(self): self.loaded = []
+
+    def __call__(self, path):
+        if path.endswith("broken.vst3"): return None
+        plugin = FakePlugin(path)
+        self.loaded.append(plugin)
+        return plugin
+
+
+def bundle(tmp_path, name="fx.vst3"):
+    path = tmp_path / name
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_instances_are_reused_and_restored(tmp_path):
+    path, factory = bundle(tmp_path), Factory()
+    pool = VSTPluginPool(factory, max_instances=2)
+    with pool.checkout(path, 44100) as plugin:
+        plugin.parameters["mix"].raw_value = 0.9
+    with pool.checkout(path, 44100) as again:
+        assert again is plugin
+        assert again.parameters["mix"].raw_value == 0.5 and again.resets == 1
+    st = pool.stats()
+    assert (st["hits"], st["instantiations"], st["instances"], st["idle"]) == (1, 1, 1, 1)
+
+
+def test_sample_rate_and_rebuilt_bundle_get_new_instances(tmp_path):
+    path, factory = bundle(tmp_path), Factory()
+    pool = VSTPluginPool(factory)
+    with pool.checkout(path, 44100) as first: pass
+    with pool.checkout(path, 48000) as other: assert other is not first
+    # A newer bundle mtime evicts every idle instance of the old build
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    with pool.checkout(path, 44100) as rebuilt: assert rebuilt is not first
+    assert len(factory.loaded) == 3
+    assert pool.stats()["instances"] == 1
+
+
+def test_max_instances_blocks_until_release(tmp_path):
+    path, factory = bundle(tmp_path), Factory()
+    pool = VSTPluginPool(factory, max_instances=1)
+    entry = pool.acquire(path)
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(path)))
+    waiter.start()
+    time.sleep(0.1)
+    assert not got and pool.stats()["waits"] == 1
+    pool.release(entry)
+    waiter.join(5)
+    assert got[0].plugin is entry.plugin
+    pool.release(got[0])
+    assert len(factory.loaded) == 1
+
+
+def test_failed_load_frees_its_slot(tmp_path):
+    broken, factory = bundle(tmp_path, "broken.vst3"), Factory()
+    pool = VSTPluginPool(factory, max_instances=1)
+    for _ in range(2):
+        with pool.checkout(broken) as plugin: assert plugin is None
+    assert pool.stats()["failures"] == 2 and pool.stats()["instances"] == 0
+    with pool.checkout(str(tmp_path / "missing.vst3")) as plugin: assert plugin is None
+
+
+def test_shrinking_drops_instances_on_release(tmp_path):
+    path, factory = bundle(tmp_path), Factory()
+    pool = VSTPluginPool(factory, max_instances=2)
+    a, b = pool.acquire(path), pool.acquire(path)
+    pool.configure(1)
+    pool.release(a)
+    pool.release(b)
+    assert pool.stats()["instances"] == 1 and pool.stats()["idle"] == 1
+    pool.clear()
+    assert pool.stats()["instances"] == 0
+
+
+def test_old_build_checked_out_during_rebuild_is_dropped(tmp_path):
+    path, factory = bundle(tmp_path), Factory()
+    pool = VSTPluginPool(factory)
+    old = pool.acquire(path, 44100)
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    with pool.checkout(path, 44100) as rebuilt: assert rebuilt is not old.plugin
+    pool.release(old)
+    st = pool.stats()
+    assert (st["instances"], st["idle"]) == (1, 1)
+    with pool.checkout(path, 44100) as again: assert again is rebuilt
+
+
+def test_binary_replaced_inside_bundle_is_a_new_build(tmp_path):
+    folder = tmp_path / "synth.vst3"
+    binary = folder / "Contents" / "x86_64-linux" / "synth.so"
+    binary.parent.mkdir(parents=True)
+    binary.write_bytes(b"v1")
+    past = time.time() - 100
+    for p in (binary, binary.parent, binary.parent.parent, folder):
+        os.utime(p, (past, past))
+    factory = Factory()
+    pool = VSTPluginPool(factory)
+    with pool.checkout(str(folder)) as first: pass
+    binary.write_bytes(b"v2")
+    with pool.checkout(str(folder)) as second: assert second is not first
+    assert os.path.getmtime(folder) == past
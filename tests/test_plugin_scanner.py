@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from internode.vst.plugin_scanner import VST3Scanner, ScanCrash, find_bundles
+
+
+def make_bundles(root, *names):
+    paths = []
+    for name in names:
+        path = root / name
+        path.mkdir(parents=True)
+        (path / "Contents").mkdir()
+        paths.append(os.path.normpath(str(path)))
+    return paths
+
+
+def description(name):
+    return {"name": name, "category": "Effect", "parameters": {"gain": {"raw_value": 0.5}}}
+
+
+def test_find_bundles_does_not_descend_into_bundles(tmp_path):
+    good, nested = make_bundles(tmp_path, "A.vst3", "Vendor/B.vst3")
+    (tmp_path / "A.vst3" / "Contents" / "Inner.vst3").mkdir()
+    assert find_bundles([str(tmp_path)]) == sorted([good, nested])
+
+
+def test_scan_indexes_and_reuses_entries(tmp_path):
+    a, b = make_bundles(tmp_path / "plugins", "A.vst3", "B.vst3")
+    index = str(tmp_path / "index.json")
+    calls = []
+
+    def describe(path):
+        calls.append(path)
+        return description(os.path.basename(path))
+
+    scanner = VST3Scanner(describe, index, [str(tmp_path / "plugins")])
+    assert scanner.scan() == 2
+    assert scanner.plugin_paths() == [a, b]
+    assert scanner.get(a)["parameters"]["gain"]["raw_value"] == 0.5
+
+    # A new process reads the index and only re-describes changed bundles
+    os.utime(b, (time.time() + 10, time.time() + 10))
+    again = VST3Scanner(describe, index, [str(tmp_path / "plugins")])
+    assert again.get(a) is not None and again.get(b) is None
+    assert again.scan() == 1
+    assert calls == [a, b, b]
+
+
+def test_failures_and_crashes_are_recorded(tmp_path):
+    ok, bad, crash = make_bundles(tmp_path / "plugins", "Ok.vst3", "Bad.vst3", "Crash.vst3")
+
+    def describe(path):
+        if path == bad: raise RuntimeError("VST Load Failed")
+        if path == crash: raise ScanCrash("VST host process died")
+        return description("Ok")
+
+    scanner = VST3Scanner(describe, str(tmp_path / "index.json"), [str(tmp_path / "plugins")])
+    scanner.scan()
+    assert scanner.plugin_paths() == [ok]
+    assert scanner.get(bad)["error"] == "VST Load Failed" and not scanner.get(bad).get("crashed")
+    assert scanner.get(crash)["crashed"]
+
+
+def test_interrupted_scan_resumes_without_blacklisting(tmp_path):
+    first, second, third = make_bundles(tmp_path / "plugins", "1.vst3", "2.vst3", "3.vst3")
+    index = tmp_path / "index.json"
+
+    class ProcessDied(BaseException):
+        pass
+
+    def describe(path):
+        if path == second:
+            # The index on disk already holds the first plugin and marks this one
+            saved = json.loads(index.read_text())["plugins"]
+            assert saved[first]["name"] == "1.vst3"
+            assert saved[second]["scanning"]
+            raise ProcessDied()
+        return description(os.path.basename(path))
+
+    with pytest.raises(ProcessDied):
+        VST3Scanner(describe, str(index), [str(tmp_path / "plugins")]).scan()
+
+    # Next start: the interrupted plugin is scanned again, not marked as crashed
+    retried = []
+    restarted = VST3Scanner(lambda p: retried.append(p) or description(os.path.basename(p)), str(index), [str(tmp_path / "plugins")])
+    assert restarted.get(second) is None
+    restarted.scan()
+    assert retried == [second, third]
+    assert restarted.plugin_paths() == [first, second, third]
+
+
+def test_isolated_scan_saves_no_marker(tmp_path):
+    first, second = make_bundles(tmp_path / "plugins", "1.vst3", "2.vst3")
+    index = tmp_path / "index.json"
+
+    def describe(path):
+        if index.exists():
+            assert path not in json.loads(index.read_text())["plugins"]
+        return description(os.path.basename(path))
+
+    VST3Scanner(describe, str(index), [str(tmp_path / "plugins")], isolated=True).scan()
+    assert sorted(json.loads(index.read_text())["plugins"]) == [first, second]
+
+
+def test_concurrent_records_keep_the_index_valid(tmp_path):
+    paths = make_bundles(tmp_path / "plugins", *[f"{i}.vst3" for i in range(24)])
+    index = tmp_path / "index.json"
+    scanner = VST3Scanner(None, str(index), [str(tmp_path / "plugins")])
+
+    class Plugin:
+        name, category, parameters = "P", "Effect", {}
+
+    threads = [threading.Thread(target=scanner.record, args=(p, Plugin(), 0.1)) for p in paths]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert sorted(json.loads(index.read_text())["plugins"]) == sorted(paths)
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".tmp")] == []
+
+
+def test_binary_replaced_inside_bundle_is_rescanned(tmp_path):
+    (path,) = make_bundles(tmp_path / "plugins", "A.vst3")
+    binary = tmp_path / "plugins" / "A.vst3" / "Contents" / "a.so"
+    binary.write_bytes(b"v1")
+    past = time.time() - 100
+    for p in (binary, binary.parent, path):
+        os.utime(p, (past, past))
+    scanner = VST3Scanner(lambda p: description("A"), str(tmp_path / "index.json"), [str(tmp_path / "plugins")])
+    assert scanner.scan() == 1
+    binary.write_bytes(b"v2")
+    assert scanner.get(path) is None
+    assert scanner.scan() == 1
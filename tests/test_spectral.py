@@ -0,0 +1,101 @@
+import pytest
+import torch
+
+from internode.analysis import spectral_cache
+from internode.analysis.spectral_cache import compute_stft, iter_stft, reduce_stft, stft, num_frames
+from internode.analysis.spectral_inverse import fast_griffin_lim, inverse_stft
+from internode.analysis.analysis_nodes import InternodeSpectrogram, InternodeImageToAudio
+
+SR = 22050
+
+
+@pytest.fixture
+def noise():
+    torch.manual_seed(0)
+    return torch.randn(2, 1, SR * 3) * 0.3
+
+
+def test_cached_stft_matches_and_is_shared(noise):
+    spectral_cache.clear_cache()
+    y = noise[:, 0]
+    ref = compute_stft(y, 1024, 256, power=None)
+    assert ref.shape[-1] == num_frames(y.shape[-1], 1024, 256)
+    assert stft(y, 1024, 256, power=None) is stft(y, 1024, 256, power=None)
+    # The cached complex spectrum also serves magnitude requests
+    assert torch.allclose(stft(y, 1024, 256, power=1.0), ref.abs())
+
+
+def test_streamed_blocks_tile_the_full_transform(noise):
+    y = noise[:, 0]
+    ref = compute_stft(y, 1024, 256, power=None)
+    blocks = list(iter_stft(y, 1024, 256, power=None, block_frames=37))
+    assert [f0 for f0, _ in blocks] == list(range(0, ref.shape[-1], 37))
+    assert torch.allclose(torch.cat([b for _, b in blocks], dim=-1), ref, atol=1e-5)
+
+    reduce = lambda s: s.abs().mean(dim=-2)
+    assert torch.allclose(reduce_stft(y, 1024, 256, reduce, power=None, block_frames=37), reduce(ref), atol=1e-5)
+
+
+def test_fast_griffin_lim_warm_start_beats_random(noise):
+    y = noise[0, 0]
+    spec = compute_stft(y, 1024, 256, power=None)
+    exact = inverse_stft(spec.abs(), spec / spec.abs().clamp(min=1e-16), 1024, 256, length=y.shape[-1])
+    assert torch.allclose(exact, y, atol=1e-4)
+    warm = fast_griffin_lim(spec.abs(), 1024, 256, n_iter=2, init_phase=spec, length=y.shape[-1])
+    cold = fast_griffin_lim(spec.abs(), 1024, 256, n_iter=2, length=y.shape[-1])
+    assert (warm - y).abs().mean() < (cold - y).abs().mean()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_phase_is_opt_in_and_inverts_exactly(noise, monkeypatch, stream):
+    spectral_cache.clear_cache()
+    # STREAM_THRESHOLD_BYTES = 0 forces the block-by-block path
+    if stream: monkeypatch.setattr(spectral_cache, "STREAM_THRESHOLD_BYTES", 0)
+    audio = {"waveform": noise, "sample_rate": SR}
+    img, phase, _ = InternodeSpectrogram().to_spectrogram(audio, 1024, 256)
+    assert phase is None
+    img_kept, phase, _ = InternodeSpectrogram().to_spectrogram(audio, 1024, 256, keep_phase=True)
+    assert torch.equal(img, img_kept)
+    assert phase["phase"].shape == (2, 513, img.shape[2])
+
+    out = InternodeImageToAudio().from_spectrogram(img, 44100, 0, 999, 100.0, spectral_phase=phase)[0]
+    assert out["sample_rate"] == SR
+    assert (out["waveform"] - noise).abs().max() < 1e-5
+    spectral_cache.clear_cache()
+
+
+@pytest.mark.parametrize("frames,width,overlap", [(958, 256, 32), (958, 64, 32), (958, 48, 32), (958, 256, 200), (300, 256, 32)])
+def test_tiled_round_trip_is_exact(frames, width, overlap):
+    spectral_cache.clear_cache()
+    torch.manual_seed(1)
+    y = torch.randn(2, 1, (frames - 1) * 256 + 100) * 0.3
+    audio = {"waveform": y, "sample_rate": SR}
+    img, phase, tiles = InternodeSpectrogram().to_spectrogram(audio, 1024, 256, tile_width=width, tile_overlap=overlap, keep_phase=True)
+    assert tiles["frames"] == frames
+    assert img.shape == (2 * len(tiles["segments"]), 513, width, 3)
+
+    # Every tile is a slice of the untiled image
+    full, _, _ = InternodeSpectrogram().to_spectrogram(audio, 1024, 256)
+    grid = img.unflatten(0, (2, len(tiles["segments"])))
+    for i, (start, end) in enumerate(tiles["segments"]):
+        assert torch.equal(grid[:, i], full[:, :, start:end])
+
+    out = InternodeImageToAudio().from_spectrogram(img, SR, 0, 256, 100.0, spectral_phase=phase, tile_info=tiles)[0]
+    assert out["waveform"].shape == y.shape
+    assert (out["waveform"] - y).abs().max() < 1e-5
+    spectral_cache.clear_cache()
+
+
+def test_tiled_griffin_lim_stitches_full_length(noise):
+    audio = {"waveform": noise, "sample_rate": SR}
+    img, _, tiles = InternodeSpectrogram().to_spectrogram(audio, 1024, 256, tile_width=64, tile_overlap=16)
+    out = InternodeImageToAudio().from_spectrogram(img, SR, 2, 256, 100.0, tile_info=tiles)[0]
+    assert out["waveform"].shape == noise.shape
+
+
+@pytest.mark.parametrize("width,overlap", [(1, 0), (32, 32), (32, 40)])
+def test_degenerate_tiles_are_rejected(noise, width, overlap):
+    assert isinstance(InternodeSpectrogram.VALIDATE_INPUTS(tile_width=width, tile_overlap=overlap), str)
+    with pytest.raises(ValueError):
+        InternodeSpectrogram().to_spectrogram({"waveform": noise, "sample_rate": SR}, 1024, 256, tile_width=width, tile_overlap=overlap)
+    assert InternodeSpectrogram.VALIDATE_INPUTS(tile_width=0, tile_overlap=overlap) is True
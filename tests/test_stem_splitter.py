@@ -0,0 +1,22 @@
+import pytest
+import torch
+
+pytest.importorskip("folder_paths")
+from internode.dsp import audio_tools_nodes as atn
+
+
+def test_parallel_path_is_refused_once_cuda_is_initialized(monkeypatch):
+    monkeypatch.setattr(atn, "FORK_AVAILABLE", True)
+    monkeypatch.setattr(torch.cuda, "is_initialized", lambda: True)
+    assert not atn.fork_is_safe()
+
+    node = atn.InternodeStemSplitter()
+    batched = []
+    monkeypatch.setattr(node, "_separate_parallel", lambda *a: pytest.fail("forked with CUDA initialized"))
+    monkeypatch.setattr(node, "_separate_batched", lambda model, mix, device, batch_size: batched.append(mix.shape) or mix)
+    sr = 100
+    node._separate(None, torch.zeros(1, 2, 100 * atn.DEMUCS_MIN_SEGMENT * sr), sr, "cpu", 4, 4)
+    assert len(batched) == 1
+
+    monkeypatch.setattr(torch.cuda, "is_initialized", lambda: False)
+    assert atn.fork_is_safe()
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pytest
+
+from internode.vst.vst_host import VSTHostPool, HostWorkerCrashed, HostWorkerTimeout
+
+# Stand-in for pedalboard inside the worker process: its plugins halve the
+# signal and, like native code calling printf, write straight to fd 1.
+# Loading "crash.vst3" kills the process like a segfaulting plugin would.
+FAKE_PEDALBOARD = '''
+import os, time
+
+class Param:
+    raw_value = 0.25
+
+class FakePlugin:
+    name = "Fake"
+    category = "Effect"
+
+    def __init__(self, path):
+        self.path = path
+        self.parameters = {"gain": Param()}
+
+    def process(self, audio, sample_rate, reset=True):
+        os.write(1, b"native plugin output\\n" * 200)
+        if self.path.endswith("hang.vst3"): time.sleep(60)
+        return audio * 0.5
+
+    def reset(self): pass
+
+def load_plugin(path):
+    if path.endswith("crash.vst3"): os._exit(139)
+    return FakePlugin(path)
+
+class Pedalboard:
+    def __init__(self, plugins): self.plugins = plugins
+'''
+
+
+@pytest.fixture
+def fake_host(tmp_path, monkeypatch):
+    (tmp_path / "pedalboard.py").write_text(FAKE_PEDALBOARD)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    for name in ("fx.vst3", "hang.vst3", "crash.vst3"):
+        (tmp_path / name).write_bytes(b"")
+    pools = []
+
+    def make(**kwargs):
+        pools.append(VSTHostPool(size=1, **kwargs))
+        return pools[-1]
+
+    yield tmp_path, make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_native_stdout_does_not_corrupt_replies(fake_host):
+    tmp_path, make = fake_host
+    pool = make()
+    audio = np.random.default_rng(0).standard_normal((2, 4096)).astype(np.float32)
+    for _ in range(2):
+        wet = pool.render_effect([{"path": str(tmp_path / "fx.vst3"), "params": {}}], 44100, audio)
+        assert np.allclose(wet, audio * 0.5)
+    assert pool.crashes == 0
+
+
+def test_hung_plugin_times_out_and_worker_recovers(fake_host):
+    tmp_path, make = fake_host
+    pool = make(timeout=3.0)
+    audio = np.ones((2, 256), dtype=np.float32)
+    start = time.perf_counter()
+    with pytest.raises(HostWorkerTimeout):
+        pool.render_effect([{"path": str(tmp_path / "hang.vst3"), "params": {}}], 44100, audio)
+    assert time.perf_counter() - start < 30
+    # The killed worker is replaced on the next request
+    wet = pool.render_effect([{"path": str(tmp_path / "fx.vst3"), "params": {}}], 44100, audio)
+    assert np.allclose(wet, 0.5)
+
+
+def test_describe_runs_in_the_worker(fake_host):
+    tmp_path, make = fake_host
+    pool = make()
+    info = pool.describe(str(tmp_path / "fx.vst3"))
+    assert info["name"] == "Fake" and info["parameters"]["gain"]["raw_value"] == 0.25
+    with pytest.raises(HostWorkerCrashed):
+        pool.describe(str(tmp_path / "crash.vst3"))
+    # Only the worker died
+    assert pool.describe(str(tmp_path / "fx.vst3"))["name"] == "Fake"
@@ -0,0 +1,137 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from internode.vst.vst_render import automation_plan, curve_at, render_automated, open_float_wav, map_float_wav, WAV_HEADER_BYTES
+
+
+class FakeParam:
+    def __init__(self): self.raw_value = 0.0
+
+
+class FakePlugin:
+    """Passes audio through and records (block length, gain) for each process call."""
+    def __init__(self):
+        self.parameters = {"gain": FakeParam()}
+        self.calls = []
+
+    def process(self, audio, sample_rate, reset=True):
+        self.calls.append((audio.shape[1], self.parameters["gain"].raw_value))
+        return audio * self.parameters["gain"].raw_value
+
+
+def test_curve_at_fps_and_stretch():
+    assert np.allclose(curve_at([0.0, 1.0], 10.0, [0, 50, 100, 500], 1000, 1000), [0.0, 0.5, 1.0, 1.0])
+    assert np.allclose(curve_at([0.0, 1.0], 0.0, [0, 999], 1000, 1000), [0.0, 1.0])
+
+
+def test_flat_curve_is_one_block():
+    starts, values = automation_plan([("gain", [0.5, 0.5, 0.5], 0.0, 0.01)], 0, 10000, 10000, 1000)
+    assert list(starts) == [0]
+    assert np.allclose(values, 0.5)
+
+
+def test_step_curve_splits_at_the_step():
+    # 10 fps at 1 kHz: frame k lands on sample 100 * k
+    curve = [0.0, 0.0, 1.0, 1.0]
+    starts, values = automation_plan([("gain", curve, 10.0, 0.01)], 0, 400, 400, 1000, resolution=1)
+    assert starts[0] == 0
+    # The linear ramp between frames 1 and 2 is the only moving stretch
+    assert np.all((starts[1:] > 100) & (starts[1:] <= 200))
+    assert values[0, 0] == 0.0 and values[0, -1] == 1.0
+
+
+def test_tolerance_bounds_block_count():
+    ramp = [("gain", [0.0, 1.0], 0.0, 0.1)]
+    starts, _ = automation_plan(ramp, 0, 100000, 100000, 44100)
+    assert 10 <= len(starts) <= 12
+    fine, _ = automation_plan([("gain", [0.0, 1.0], 0.0, 0.01)], 0, 100000, 100000, 44100)
+    assert len(fine) > 5 * len(starts)
+
+
+def test_values_are_clipped():
+    _, values = automation_plan([("gain", [-1.0, 2.0], 0.0, 0.01)], 0, 1000, 1000, 1000)
+    assert values.min() >= 0.0 and values.max() <= 1.0
+
+
+def test_segment_offset_matches_full_plan():
+    auto = [("gain", [0.0, 1.0, 0.0], 0.0, 0.05)]
+    full_starts, full_values = automation_plan(auto, 0, 9600, 9600, 48000)
+    seg_starts, seg_values = automation_plan(auto, 4800, 9600, 9600, 48000)
+    # Values at the shared block starts agree, so segments line up with the full render
+    common = np.intersect1d(full_starts, seg_starts)
+    assert len(common) > 1
+    assert np.allclose(full_values[:, np.searchsorted(full_starts, common)], seg_values[:, np.searchsorted(seg_starts, common)])
+
+
+def test_render_automated_applies_values_per_block():
+    plugin = FakePlugin()
+    audio = np.ones((2, 400), dtype=np.float32)
+    out = render_automated(plugin, audio, 1000, [("gain", [0.0, 0.0, 1.0, 1.0], 10.0, 0.01)], resolution=1)
+    assert out.shape == audio.shape
+    assert sum(n for n, _ in plugin.calls) == 400
+    assert np.all(out[:, :100] == 0.0) and np.allclose(out[:, 200:], 1.0)
+
+
+def chunks(path):
+    with open(path, "rb") as f:
+        head = f.read(WAV_HEADER_BYTES)
+    out, pos = {}, 12
+    while pos < len(head):
+        cid, size = head[pos:pos + 4], struct.unpack("<I", head[pos + 4:pos + 8])[0]
+        out[cid] = (pos + 8, head[pos + 8:pos + 8 + min(size, 64)])
+        pos += 8 + (size if cid != b"data" else 0)
+        if cid == b"data": break
+    return head[:4], out
+
+
+def test_float_wav_header_and_data(tmp_path):
+    path = str(tmp_path / "out.wav")
+    data = np.random.default_rng(0).standard_normal((1000, 2)).astype(np.float32)
+    out = open_float_wav(path, 2, 1000, 48000)
+    out[:] = data
+    out.flush()
+    del out
+    magic, found = chunks(path)
+    assert magic == b"RIFF" and list(found) == [b"JUNK", b"fmt ", b"fact", b"data"]
+    assert struct.unpack("<HHIIHHH", found[b"fmt "][1]) == (3, 2, 48000, 48000 * 8, 8, 32, 0)
+    assert struct.unpack("<I", found[b"fact"][1][:4])[0] == 1000
+    assert found[b"data"][0] == WAV_HEADER_BYTES
+    assert os.path.getsize(path) == WAV_HEADER_BYTES + data.nbytes
+    assert np.array_equal(map_float_wav(path, 2, 1000, mode="r"), data)
+
+    wavfile = pytest.importorskip("scipy.io.wavfile")
+    rate, read = wavfile.read(path)
+    assert rate == 48000 and np.array_equal(read, data)
+
+
+def test_float_wav_over_4gb_is_rf64(tmp_path):
+    path = str(tmp_path / "long.wav")
+    frames = (1 << 29) + 7 # 4 GB + 56 bytes of stereo float
+    try:
+        out = open_float_wav(path, 2, frames, 44100)
+    except OSError:
+        pytest.skip("no room for a sparse 4 GB file")
+    out[-1] = [0.25, -0.5]
+    out.flush()
+    del out
+    magic, found = chunks(path)
+    assert magic == b"RF64" and list(found) == [b"ds64", b"fmt ", b"fact", b"data"]
+    riff, data, count, _ = struct.unpack("<QQQI", found[b"ds64"][1])
+    assert (data, count) == (frames * 8, frames) and riff == os.path.getsize(path) - 8
+    assert np.array_equal(map_float_wav(path, 2, frames, mode="r")[-1], [0.25, -0.5])
+
+
+def test_copy_on_write_map_leaves_the_file_alone(tmp_path):
+    path = str(tmp_path / "out.wav")
+    out = open_float_wav(path, 2, 64, 44100)
+    out[:] = 0.5
+    out.flush()
+    del out
+    view = map_float_wav(path, 2, 64, mode="c")
+    view *= 2.0
+    view.flush()
+    assert np.all(view == 1.0)
+    assert np.all(map_float_wav(path, 2, 64, mode="r") == 0.5)
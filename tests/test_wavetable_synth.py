@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import torch
+
+from internode.vst.midi_events import EVENT_DTYPE, NOTE_ON, NOTE_OFF
+from internode.generative.audio_gen_nodes import InternodeWavetableSynth, midi_notes, octave_harmonics
+
+
+def make_events(rows, tpb=480, tempo=500000):
+    """rows: (tick, type, note) with one fixed tempo."""
+    ev = np.zeros(len(rows), dtype=EVENT_DTYPE)
+    ev["tick"] = [r[0] for r in rows]
+    ev["type"] = [r[1] for r in rows]
+    ev["note"] = [r[2] for r in rows]
+    ev["velocity"] = 100
+    ev["seconds"] = ev["tick"] * tempo / (tpb * 1e6)
+    ev = ev[np.argsort(ev["tick"], kind="stable")]
+    return {"events": ev, "ticks_per_beat": tpb, "tempos": None, "length": float(ev["seconds"][-1])}
+
+
+@pytest.mark.parametrize("on_first", [True, False])
+def test_retrigger_at_the_same_tick(on_first):
+    same_tick = [(480, NOTE_ON, 60), (480, NOTE_OFF, 60)] if on_first else [(480, NOTE_OFF, 60), (480, NOTE_ON, 60)]
+    ev = make_events([(0, NOTE_ON, 60)] + same_tick + [(960, NOTE_OFF, 60)])
+    starts, durs, pitch, _ = midi_notes(ev["events"], ev["length"])
+    assert starts.tolist() == [0.0, 0.5]
+    assert durs.tolist() == [0.5, 0.5]
+    assert pitch.tolist() == [60, 60]
+
+
+def test_zero_length_note_does_not_hang():
+    ev = make_events([(0, NOTE_ON, 60), (0, NOTE_OFF, 60), (480, NOTE_ON, 62), (960, NOTE_OFF, 62), (1920, NOTE_ON, 64), (1920, NOTE_OFF, 64)])
+    starts, durs, pitch, _ = midi_notes(ev["events"], ev["length"])
+    notes = sorted(zip(pitch.tolist(), starts.tolist(), durs.tolist()))
+    assert notes == [(60, 0.0, 0.0), (62, 0.5, 0.5), (64, 2.0, 0.0)]
+
+
+def test_octave_tables_stay_below_nyquist():
+    sr = 44100
+    h = octave_harmonics(sr)
+    top = 440.0 * 2.0 ** ((np.arange(len(h)) * 12 + 11 - 69) / 12.0)
+    assert np.all(h * top <= sr / 2)
+    assert h[0] == 48 and h[-1] == 1
+
+
+@pytest.mark.parametrize("note", [84, 96, 105])
+def test_high_saw_has_no_aliased_partials(note):
+    sr = 44100
+    ev = make_events([(0, NOTE_ON, note), (1920, NOTE_OFF, note)]) # 2 s
+    out = InternodeWavetableSynth().render("Saw", str(sr), 0.0, 0.0, 1.0, 0.0, 0.5, midi_events=ev)[0]["waveform"][0, 0]
+    x = out[sr // 4: sr // 4 + sr].double()
+    spec = torch.fft.rfft(x * torch.hann_window(len(x), dtype=torch.float64)).abs() ** 2
+    freqs = torch.fft.rfftfreq(len(x), 1.0 / sr)
+    f0 = 440.0 * 2.0 ** ((note - 69) / 12.0)
+    # Everything more than a few bins from an exact harmonic of f0 is aliasing
+    near = torch.remainder(freqs + 4.0, f0) < 8.0
+    assert spec[~near].sum() / spec.sum() < 1e-4